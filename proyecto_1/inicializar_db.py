@@ -2,11 +2,54 @@ from modules.factoria import crear_repositorio_usuarios, crear_repositorio_recla
 from modules.usuario import Usuario
 from modules.roles import JefeDepartamento, SecretarioTecnico
 from modules.sistema import SubsistemaGestionReclamos # Para crear reclamos
+from modules.modelos_db import Base, ModeloVersionDatos
+from modules.config_db import engine
+from sqlalchemy import text
 
 # Importamos los datos de los archivos
 from modules.inicializacion import DATOS_PERSONAL
 from data.datos_iniciales import USUARIOS_INICIALES, RECLAMOS_INICIALES
 
+# Triggers (de SQLite) que suman 1 a version_datos con cada cambio en los reclamos o en sus
+# adherentes, los haga este proceso, otro o una herramienta externa
+TRIGGERS_VERSION_DATOS = [
+    f"CREATE TRIGGER IF NOT EXISTS version_datos_{tabla}_{evento.lower()} AFTER {evento} ON {tabla} "
+    "BEGIN UPDATE version_datos SET cambios = cambios + 1 WHERE id = 1; END"
+    for tabla in ("reclamos", "reclamos_adherentes")
+    for evento in ("INSERT", "UPDATE", "DELETE")
+]
+
+def migrar_esquema(motor=engine):
+    """
+    Deja el esquema de la BD al día: crea las tablas y los índices que falten, la fila de
+    version_datos y sus triggers. Se llama una vez al arrancar el servidor (y desde este
+    script); repetirla no cambia nada.
+    """
+    Base.metadata.create_all(bind=motor)
+    migrar_indices(motor)
+    migrar_version_datos(motor)
+
+def migrar_indices(motor=engine):
+    """
+    Crea en una base de datos ya existente los índices declarados en los modelos.
+    'create_all' sólo crea los índices junto con tablas nuevas, por eso las BD
+    creadas antes de agregarlos necesitan este paso. Los que ya existen se omiten.
+    """
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(bind=motor, checkfirst=True)
+
+def migrar_version_datos(motor=engine):
+    """
+    Crea la fila de version_datos y los triggers que la mantienen (ver
+    RepositorioReclamosSQLAlchemy.obtener_version_datos). Lo que ya existe se omite.
+    """
+    ModeloVersionDatos.__table__.create(bind=motor, checkfirst=True)
+    with motor.begin() as conexion:
+        conexion.execute(text("INSERT OR IGNORE INTO version_datos (id, cambios) VALUES (1, 0)"))
+        for sentencia in TRIGGERS_VERSION_DATOS:
+            conexion.execute(text(sentencia))
+
 def inicializar_base_de_datos():
     """
     Script para crear y poblar la base de datos con datos iniciales.
@@ -17,6 +60,10 @@ def inicializar_base_de_datos():
     # 1. Crear los repositorios
     repo_usuarios = crear_repositorio_usuarios()
     repo_reclamos = crear_repositorio_reclamos()
+
+    # Aseguramos los índices y la versión de los datos en BD creadas con versiones anteriores
+    print("\n[PASO 0/3] Actualizando el esquema de la BD...")
+    migrar_esquema()
     
     # Creamos una instancia del sistema para usar la lógica de 'crear_reclamo'
     # (que incluye la clasificación automática)
@@ -0,0 +1,109 @@
+import math
+import random
+
+from modules.calculadora_mediana import cuantil_de_conteos
+
+# Capacidad del compactor más alto. Con k=200 el error de rango es de alrededor de 1,7%
+# (ver BosquejoCuantiles) y se guardan a lo sumo unos 3*k valores.
+K_POR_DEFECTO = 200
+# Cuánto se achica la capacidad de cada nivel respecto del de arriba
+FACTOR_CAPACIDAD = 2 / 3
+
+
+class BosquejoCuantiles:
+    """
+    Estimador de cuantiles en una sola pasada y con memoria acotada (bosquejo KLL, de
+    Karnin, Lang y Liberty). Sirve para valores de cualquier rango, a diferencia de
+    CalculadoraMedianaConteo, que necesita enteros en un rango conocido.
+
+    Los valores se guardan en niveles ("compactores"). Cada valor del nivel h representa
+    2**h valores originales. Cuando un nivel se llena se ordena y se queda con uno de cada
+    dos valores (los pares o los impares, al azar), que suben al nivel siguiente.
+
+    - Memoria: a lo sumo unos 3*k valores, sin importar cuántos se agreguen.
+    - Error: el cuantil devuelto tiene un rango a menos de ~1,7/k * n del pedido (con
+      k=200, el p90 estimado está entre el p88 y el p92 reales), con alta probabilidad.
+      Mientras no haya compactado (menos de k valores) el resultado es exacto e igual al
+      de MonticuloMediana / cuantil_de_conteos.
+    - Combinable: dos bosquejos del mismo k se pueden sumar (por ejemplo, los de cada
+      departamento para obtener el total) con el mismo error.
+    'semilla' fija la elección al azar, para que los resultados sean reproducibles.
+    """
+    def __init__(self, k: int = K_POR_DEFECTO, semilla: int | None = 0):
+        if k < 2:
+            raise ValueError("k debe ser al menos 2.")
+        self.__k = k
+        self.__aleatorio = random.Random(semilla)
+        self.__niveles = [[]]
+        self.__retenidos = 0 # Valores guardados (suma de los largos de los niveles)
+        self.__tamano = 0 # Valores agregados
+        self.__capacidad_total = self.__capacidad(0)
+
+    def __capacidad(self, nivel: int) -> int:
+        profundidad = len(self.__niveles) - nivel - 1
+        return int(math.ceil(self.__k * FACTOR_CAPACIDAD ** profundidad)) + 1
+
+    def __agregar_nivel(self):
+        self.__niveles.append([])
+        self.__capacidad_total = sum(self.__capacidad(nivel) for nivel in range(len(self.__niveles)))
+
+    def __compactar(self):
+        # Compacta de abajo hacia arriba hasta volver a estar por debajo de la capacidad
+        for nivel in range(len(self.__niveles)):
+            valores = self.__niveles[nivel]
+            if len(valores) < self.__capacidad(nivel):
+                continue
+            if nivel + 1 == len(self.__niveles):
+                self.__agregar_nivel()
+            valores.sort()
+            # Si la cantidad es impar, el último se queda en este nivel
+            sobrante = [valores.pop()] if len(valores) % 2 else []
+            desplazamiento = self.__aleatorio.randint(0, 1)
+            self.__niveles[nivel + 1].extend(valores[desplazamiento::2])
+            self.__niveles[nivel] = sobrante
+            self.__retenidos = sum(len(valores) for valores in self.__niveles)
+            if self.__retenidos < self.__capacidad_total:
+                break
+
+    def agregar_numero(self, num: float):
+        self.__niveles[0].append(num)
+        self.__retenidos += 1
+        self.__tamano += 1
+        if self.__retenidos >= self.__capacidad_total:
+            self.__compactar()
+
+    def combinar(self, otro: "BosquejoCuantiles"):
+        """Suma los valores de otro bosquejo (del mismo k) a este."""
+        if otro.__k != self.__k:
+            raise ValueError("Sólo se pueden combinar bosquejos con el mismo k.")
+        while len(self.__niveles) < len(otro.__niveles):
+            self.__agregar_nivel()
+        for nivel, valores in enumerate(otro.__niveles):
+            self.__niveles[nivel].extend(valores)
+        self.__tamano += otro.__tamano
+        self.__retenidos = sum(len(valores) for valores in self.__niveles)
+        while self.__retenidos >= self.__capacidad_total:
+            self.__compactar()
+
+    def tamano(self) -> int:
+        """Cantidad de valores agregados (no de valores guardados)."""
+        return self.__tamano
+
+    def retenidos(self) -> int:
+        """Cantidad de valores guardados en memoria."""
+        return self.__retenidos
+
+    def __conteos(self) -> list[tuple[float, int]]:
+        return sorted((valor, 2 ** nivel) for nivel, valores in enumerate(self.__niveles) for valor in valores)
+
+    def obtener_cuantil(self, q: float) -> float | None:
+        """Devuelve el cuantil q (entre 0 y 1) estimado, o None si no hay números."""
+        return cuantil_de_conteos(self.__conteos(), q)
+
+    def obtener_cuantiles(self, cuantiles) -> list[float | None]:
+        """Igual que obtener_cuantil para varios q, ordenando los valores una sola vez."""
+        conteos = self.__conteos()
+        return [cuantil_de_conteos(conteos, q) for q in cuantiles]
+
+    def obtener_mediana(self) -> float | None:
+        return self.obtener_cuantil(0.5)
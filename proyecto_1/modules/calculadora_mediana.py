@@ -1,39 +1,71 @@
-from modules.monticulo import MonticuloMinimos, MonticuloMaximos
+import datetime
+from collections import Counter
+from modules.monticulo import MonticuloMinimos, MonticuloMaximos, MonticuloMinimosRapido, MonticuloMaximosRapido
 
 class MonticuloMediana:
-    def __init__(self):
+    def __init__(self, rapido: bool = False):
+        """
+        Con rapido=True usa los montículos basados en heapq (MonticuloMaximosRapido y
+        MonticuloMinimosRapido), que dan el mismo resultado en menos tiempo.
+        """
         # Montículo de máximos para la mitad inferior de los datos 
-        self.__mitad_inferior_max = MonticuloMaximos()
+        self.__mitad_inferior_max = MonticuloMaximosRapido() if rapido else MonticuloMaximos()
         # Montículo de mínimos para la mitad superior de los datos 
-        self.__mitad_superior_min = MonticuloMinimos()
+        self.__mitad_superior_min = MonticuloMinimosRapido() if rapido else MonticuloMinimos()
         self.__mediana_actual = None
+        # Borrado perezoso: los números eliminados siguen en los montículos hasta que llegan
+        # a la raíz. Cada mitad tiene su mapa de pendientes (valor -> cantidad a borrar) y
+        # su tamaño "real" (sin contar los pendientes).
+        self.__pendientes_inferior = Counter()
+        self.__pendientes_superior = Counter()
+        self.__tam_inferior = 0
+        self.__tam_superior = 0
+        self.__conteo_valores = Counter() # Para saber si un número se puede eliminar
+
+    def __podar(self, monticulo, pendientes: Counter):
+        """Saca de la raíz los números que estaban marcados para borrar."""
+        while not monticulo.esta_vacio() and pendientes[monticulo.obtener_raiz()] > 0:
+            pendientes[monticulo.eliminar_raiz()] -= 1
+
+    def __podar_raices(self):
+        self.__podar(self.__mitad_inferior_max, self.__pendientes_inferior)
+        self.__podar(self.__mitad_superior_min, self.__pendientes_superior)
 
     def __balancear(self):
         """
         Asegura que la diferencia de tamaño entre los dos montículos
         no sea mayor a 1. 
         """
-        tam_inf = self.__mitad_inferior_max.tamano()
-        tam_sup = self.__mitad_superior_min.tamano()
+        tam_inf = self.__tam_inferior
+        tam_sup = self.__tam_superior
         
         if abs(tam_inf - tam_sup) > 1:
             if tam_inf > tam_sup:
                 # Mover la raíz del max-heap (el más grande de la mitad inf) al min-heap
                 valor_a_mover = self.__mitad_inferior_max.eliminar_raiz()
                 self.__mitad_superior_min.insertar(valor_a_mover)
+                self.__tam_inferior -= 1
+                self.__tam_superior += 1
             else:
                 # Mover la raíz del min-heap (el más pequeño de la mitad sup) al max-heap
                 valor_a_mover = self.__mitad_superior_min.eliminar_raiz()
                 self.__mitad_inferior_max.insertar(valor_a_mover)
+                self.__tam_superior -= 1
+                self.__tam_inferior += 1
+            # La raíz que quedó puede ser un número pendiente de borrar
+            self.__podar_raices()
     
     def __actualizar_mediana(self):
         """
         Recalcula la mediana basándose en las raíces de los montículos. 
         """
-        tam_inf = self.__mitad_inferior_max.tamano()
-        tam_sup = self.__mitad_superior_min.tamano()
+        tam_inf = self.__tam_inferior
+        tam_sup = self.__tam_superior
 
-        if tam_inf == tam_sup:
+        if tam_inf == 0 and tam_sup == 0:
+            # Se eliminaron todos los números
+            self.__mediana_actual = None
+        elif tam_inf == tam_sup:
             # Si tienen el mismo tamaño, la mediana es el promedio de ambas raíces 
             self.__mediana_actual = (self.__mitad_inferior_max.obtener_raiz() + self.__mitad_superior_min.obtener_raiz()) / 2.0
         elif tam_inf > tam_sup:
@@ -48,11 +80,20 @@ class MonticuloMediana:
         Agrega un nuevo número al cálculo y re-calcula la mediana.
         """
         # Paso 1: Insertar el número
-        # Si el max-heap está vacío o el número es menor que su raíz, va a la mitad inferior
-        if self.__mitad_inferior_max.esta_vacio() or num < self.__mitad_inferior_max.obtener_raiz():
+        # Si el número es menor que la raíz del max-heap, va a la mitad inferior.
+        # Si el max-heap está vacío (al principio, o porque se eliminaron sus números), va a
+        # la mitad inferior salvo que supere a la raíz de la superior.
+        if self.__tam_inferior > 0:
+            va_a_inferior = num < self.__mitad_inferior_max.obtener_raiz()
+        else:
+            va_a_inferior = self.__tam_superior == 0 or num <= self.__mitad_superior_min.obtener_raiz()
+        if va_a_inferior:
             self.__mitad_inferior_max.insertar(num)
+            self.__tam_inferior += 1
         else:
             self.__mitad_superior_min.insertar(num)
+            self.__tam_superior += 1
+        self.__conteo_valores[num] += 1
         
         # Paso 2: Balancear los montículos
         self.__balancear()
@@ -60,6 +101,164 @@ class MonticuloMediana:
         # Paso 3: Calcular la nueva mediana
         self.__actualizar_mediana()
 
+    def eliminar_numero(self, num: int):
+        """
+        Quita una aparición de un número agregado antes y re-calcula la mediana.
+        El número se marca como pendiente y sale del montículo cuando llega a la raíz,
+        así que cuesta O(log n) amortizado. Lanza ValueError si el número no está.
+        """
+        if self.__conteo_valores[num] == 0:
+            raise ValueError(f"El número {num} no fue agregado.")
+        self.__conteo_valores[num] -= 1
+
+        # Las raíces siempre son números válidos: si num no supera la raíz de la mitad
+        # inferior, hay una aparición de num en esa mitad; si la supera, está en la superior.
+        if self.__tam_inferior > 0 and num <= self.__mitad_inferior_max.obtener_raiz():
+            self.__pendientes_inferior[num] += 1
+            self.__tam_inferior -= 1
+        else:
+            self.__pendientes_superior[num] += 1
+            self.__tam_superior -= 1
+
+        self.__podar_raices()
+        self.__balancear()
+        self.__actualizar_mediana()
+
+    def tamano(self) -> int:
+        """Cantidad de números considerados (sin los eliminados)."""
+        return self.__tam_inferior + self.__tam_superior
+
     def obtener_mediana(self) -> float:
         """Devuelve la mediana calculada."""
-        return self.__mediana_actual
\ No newline at end of file
+        return self.__mediana_actual
+
+
+class MedianaVentanaTemporal:
+    """
+    Mediana de los números agregados en los últimos 'ventana' (un datetime.timedelta).
+    Cada número se guarda con su instante; al consultar (o agregar) se eliminan del
+    MonticuloMediana los que quedaron fuera de la ventana, sin recorrer los demás.
+    Los instantes no tienen por qué llegar ordenados.
+    """
+    def __init__(self, ventana: datetime.timedelta):
+        if ventana <= datetime.timedelta(0):
+            raise ValueError("La ventana de tiempo debe ser positiva.")
+        self.__ventana = ventana
+        self.__mediana = MonticuloMediana()
+        # Montículo de mínimos de (instante, número): la raíz es la muestra más vieja
+        self.__muestras = MonticuloMinimos()
+
+    def agregar_numero(self, num: int, instante: datetime.datetime | None = None):
+        instante = instante or datetime.datetime.now()
+        self.__muestras.insertar((instante, num))
+        self.__mediana.agregar_numero(num)
+        # Lo que quedó fuera de la ventana que termina en este instante ya no sirve
+        self.expirar(instante)
+
+    def expirar(self, ahora: datetime.datetime | None = None):
+        """Elimina los números agregados antes de 'ahora - ventana'."""
+        limite = (ahora or datetime.datetime.now()) - self.__ventana
+        while not self.__muestras.esta_vacio() and self.__muestras.obtener_raiz()[0] < limite:
+            _, num = self.__muestras.eliminar_raiz()
+            self.__mediana.eliminar_numero(num)
+
+    def tamano(self) -> int:
+        return self.__mediana.tamano()
+
+    def obtener_mediana(self, ahora: datetime.datetime | None = None) -> float | None:
+        """Mediana de los números dentro de la ventana que termina en 'ahora' (por defecto, ahora mismo)."""
+        self.expirar(ahora)
+        return self.__mediana.obtener_mediana()
+
+
+# Dominio de los tiempos de resolución (Reclamo.cambiar_estado acepta de 1 a 15 días)
+TIEMPO_MINIMO = 1
+TIEMPO_MAXIMO = 15
+
+
+def cuantil_de_conteos(conteos, q: float) -> float | None:
+    """
+    Calcula el cuantil q (entre 0 y 1) a partir de pares (valor, cantidad) ordenados por valor.
+    Interpola linealmente entre los dos elementos vecinos, así que con q=0.5 da lo mismo
+    que MonticuloMediana (el promedio de los dos centrales si la cantidad es par).
+    Devuelve None si no hay elementos.
+    """
+    if not 0 <= q <= 1:
+        raise ValueError("El cuantil debe estar entre 0 y 1.")
+    conteos = [(valor, cantidad) for valor, cantidad in conteos if cantidad > 0]
+    total = sum(cantidad for _, cantidad in conteos)
+    if total == 0:
+        return None
+
+    posicion = q * (total - 1)
+    rango_inferior = int(posicion)
+    fraccion = posicion - rango_inferior
+    rango_superior = rango_inferior + 1 if fraccion > 0 else rango_inferior
+
+    inferior = None
+    acumulado = 0
+    for valor, cantidad in conteos:
+        acumulado += cantidad
+        if inferior is None and acumulado > rango_inferior:
+            inferior = valor
+        if acumulado > rango_superior:
+            return float(inferior + (valor - inferior) * fraccion)
+    return float(inferior) # No se llega: rango_superior siempre es menor que total
+
+
+class CalculadoraMedianaConteo:
+    """
+    Mediana (y cuantiles) exacta para números enteros en un rango acotado [minimo, maximo].
+    En lugar de montículos guarda cuántas veces apareció cada valor: agregar es O(1) y
+    consultar es O(k), con k = cantidad de valores posibles (15 para los tiempos de resolución).
+    Dos calculadoras del mismo rango se pueden combinar (por ejemplo, varios departamentos).
+    Tiene la misma interfaz que MonticuloMediana (agregar_numero / obtener_mediana).
+    """
+    def __init__(self, minimo: int = TIEMPO_MINIMO, maximo: int = TIEMPO_MAXIMO):
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo.")
+        self.__minimo = minimo
+        self.__maximo = maximo
+        self.__conteos = [0] * (maximo - minimo + 1)
+        self.__tamano = 0
+
+    def __indice(self, num: int) -> int:
+        if num != int(num) or not self.__minimo <= num <= self.__maximo:
+            raise ValueError(f"El valor {num} no es un entero entre {self.__minimo} y {self.__maximo}.")
+        return int(num) - self.__minimo
+
+    def agregar_numero(self, num: int, cantidad: int = 1):
+        """Agrega 'cantidad' apariciones del número."""
+        self.__conteos[self.__indice(num)] += cantidad
+        self.__tamano += cantidad
+
+    def eliminar_numero(self, num: int, cantidad: int = 1):
+        """Quita 'cantidad' apariciones del número (deben existir)."""
+        indice = self.__indice(num)
+        if self.__conteos[indice] < cantidad:
+            raise ValueError(f"El valor {num} no fue agregado {cantidad} vez/veces.")
+        self.__conteos[indice] -= cantidad
+        self.__tamano -= cantidad
+
+    def combinar(self, otra: "CalculadoraMedianaConteo"):
+        """Suma los valores de otra calculadora del mismo rango a esta."""
+        if (otra.__minimo, otra.__maximo) != (self.__minimo, self.__maximo):
+            raise ValueError("Sólo se pueden combinar calculadoras del mismo rango.")
+        for indice, cantidad in enumerate(otra.__conteos):
+            self.__conteos[indice] += cantidad
+        self.__tamano += otra.__tamano
+
+    def tamano(self) -> int:
+        return self.__tamano
+
+    def histograma(self) -> dict[int, int]:
+        """Devuelve {valor: cantidad} con los valores que aparecieron al menos una vez."""
+        return {self.__minimo + indice: cantidad for indice, cantidad in enumerate(self.__conteos) if cantidad}
+
+    def obtener_cuantil(self, q: float) -> float | None:
+        """Devuelve el cuantil q (entre 0 y 1), o None si no hay números."""
+        return cuantil_de_conteos(((self.__minimo + indice, cantidad) for indice, cantidad in enumerate(self.__conteos)), q)
+
+    def obtener_mediana(self) -> float | None:
+        """Devuelve la mediana, o None si no hay números (igual que MonticuloMediana)."""
+        return self.obtener_cuantil(0.5)
@@ -1,25 +1,77 @@
 import pickle
+import threading
+
+RUTA_MODELO = './data/claims_clf.pkl'
+
+# Registro de modelos del proceso: ruta del pickle -> clasificador ya cargado.
+# Todos los ClasificadorReclamo del proceso comparten el mismo modelo, así que
+# spacy.load (dentro de TextVectorizer) se paga una sola vez.
+_modelos = {}
+_lock_modelos = threading.Lock()
+
+
+def obtener_modelo(ruta: str = RUTA_MODELO):
+    """
+    Devuelve el modelo guardado en 'ruta', cargándolo la primera vez que se pide.
+    """
+    modelo = _modelos.get(ruta)
+    if modelo is None:
+        with _lock_modelos:
+            modelo = _modelos.get(ruta) # Otro hilo pudo cargarlo mientras esperábamos
+            if modelo is None:
+                with open(ruta, 'rb') as archivo:
+                    modelo = pickle.load(archivo)
+                _modelos[ruta] = modelo
+    return modelo
+
+
+def precargar_modelo(ruta: str = RUTA_MODELO):
+    """
+    Carga el modelo y hace una clasificación de prueba para que spaCy termine de inicializarse.
+    Se llama al arrancar el servidor, así el primer reclamo no paga la carga del modelo.
+    """
+    modelo = obtener_modelo(ruta)
+    modelo.classify(["reclamo de prueba"])
+    return modelo
+
+
+def descargar_modelos():
+    """Vacía el registro (el próximo pedido vuelve a leer el pickle)."""
+    with _lock_modelos:
+        _modelos.clear()
+
 
 class ClasificadorReclamo:
-    def __init__(self):
-        self.__clf = None 
-        with open('./data/claims_clf.pkl', 'rb') as archivo:
-                self.__clf = pickle.load(archivo)
-        
+    def __init__(self, ruta_modelo: str = RUTA_MODELO):
+        # El modelo no se carga acá: se pide al registro la primera vez que se clasifica
+        self.__ruta_modelo = ruta_modelo
 
     def clasificar(self, p_reclamo: str) -> str:
-        if self.__clf is None:
-            print("Error: El clasificador no está cargado.")
+        try:
+            clf = obtener_modelo(self.__ruta_modelo)
+        except Exception as e:
+            print(f"Error: El clasificador no está cargado: {e}")
             return "indefinido" # El clasificador no se pudo cargar
-        
+
         try:
 
-            respuesta_lista = self.__clf.classify([p_reclamo])
+            respuesta_lista = clf.classify([p_reclamo])
             return respuesta_lista[0]
-        
+
         except Exception as e:
             print(f"Error al clasificar el reclamo: {e}")
             return "indefinido"
-        
-    
-    
\ No newline at end of file
+
+    def clasificar_lote(self, p_reclamos: list) -> list:
+        """
+        Clasifica varios reclamos con una sola llamada al modelo (un departamento por reclamo).
+        Si el modelo falla, todos quedan como "indefinido".
+        """
+        if not p_reclamos:
+            return []
+        try:
+            clf = obtener_modelo(self.__ruta_modelo)
+            return list(clf.classify(list(p_reclamos)))
+        except Exception as e:
+            print(f"Error al clasificar los reclamos: {e}")
+            return ["indefinido"] * len(p_reclamos)
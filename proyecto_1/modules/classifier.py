@@ -17,7 +17,9 @@ class ClaimsClassifier(ClassifierMixin, BaseEstimator):
         y = self.__encoder.fit_transform(y)
         pipe = Pipeline([
             ('vectorizer', TextVectorizer()),
-            ('scaler', StandardScaler()),
+            # with_mean=False: centrar la matriz dispersa del vectorizador la volvería densa.
+            # El bosque aleatorio no depende del centrado, así que las predicciones no cambian.
+            ('scaler', StandardScaler(with_mean=False)),
             ('classifier', RandomForestClassifier(max_depth=20, max_features='log2', n_estimators=10))
         ])
         self.__clf = pipe.fit(X, y)
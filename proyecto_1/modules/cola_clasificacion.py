@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from modules.factoria import crear_repositorio_reclamos
+
+# Departamento con el que se guarda un reclamo mientras espera su clasificación.
+# La secretaría técnica es la que deriva reclamos, así que si el clasificador falla
+# ("indefinido") el reclamo queda donde alguien puede reasignarlo a mano.
+DEPARTAMENTO_PROVISIONAL = "secretaría técnica"
+
+# Marca que se encola para pedirle a un hilo que termine
+_FIN = object()
+
+
+class ColaClasificacion:
+    """
+    Clasifica reclamos en segundo plano, sin hacer esperar al que los crea.
+    Los reclamos se guardan con DEPARTAMENTO_PROVISIONAL y se encolan; los hilos de la cola
+    los juntan en lotes (hasta 'tamano_lote' reclamos o 'espera_maxima' segundos), los
+    clasifican con una sola llamada al modelo y actualizan el departamento en la BD.
+    Cada hilo usa su propio repositorio (su propia sesión de SQLAlchemy), porque las
+    sesiones no se pueden compartir entre hilos.
+    'al_actualizar' (opcional) se llama con cada reclamo al que se le cambió el departamento.
+    """
+    def __init__(self, clasificador, crear_repositorio: Callable = crear_repositorio_reclamos,
+                 tamano_lote: int = 32, espera_maxima: float = 0.05, cantidad_hilos: int = 1,
+                 al_actualizar: Optional[Callable] = None):
+        if tamano_lote < 1 or cantidad_hilos < 1 or espera_maxima < 0:
+            raise ValueError("El tamaño de lote y la cantidad de hilos deben ser al menos 1, y la espera no puede ser negativa.")
+        self.__clasificador = clasificador
+        self.__crear_repositorio = crear_repositorio
+        self.__tamano_lote = tamano_lote
+        self.__espera_maxima = espera_maxima
+        self.__al_actualizar = al_actualizar
+        self.__cola = queue.Queue()
+        self.__hilos = [
+            threading.Thread(target=self.__trabajar, name=f"clasificacion-{i}", daemon=True)
+            for i in range(cantidad_hilos)
+        ]
+        for hilo in self.__hilos:
+            hilo.start()
+
+    def encolar(self, id_reclamo: int, contenido: str):
+        """Agrega un reclamo ya guardado a la cola de clasificación."""
+        self.__cola.put((id_reclamo, contenido))
+
+    def pendientes(self) -> int:
+        """Cantidad aproximada de reclamos que todavía esperan ser clasificados."""
+        return self.__cola.qsize()
+
+    def esperar(self):
+        """Bloquea hasta que se hayan clasificado todos los reclamos encolados."""
+        self.__cola.join()
+
+    def detener(self, timeout: Optional[float] = None):
+        """Termina los hilos después de clasificar lo que ya estaba encolado."""
+        for _ in self.__hilos:
+            self.__cola.put(_FIN)
+        for hilo in self.__hilos:
+            hilo.join(timeout)
+
+    def __tomar_lote(self):
+        """
+        Espera el primer reclamo y después junta los que lleguen dentro de la ventana de espera.
+        Devuelve (lote, terminar).
+        """
+        primero = self.__cola.get()
+        if primero is _FIN:
+            self.__cola.task_done()
+            return [], True
+        lote = [primero]
+        terminar = False
+        hasta = time.monotonic() + self.__espera_maxima
+        while len(lote) < self.__tamano_lote:
+            restante = hasta - time.monotonic()
+            try:
+                elemento = self.__cola.get(timeout=restante) if restante > 0 else self.__cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is _FIN:
+                self.__cola.task_done()
+                terminar = True
+                break
+            lote.append(elemento)
+        return lote, terminar
+
+    def __trabajar(self):
+        repo_reclamos = self.__crear_repositorio()
+        terminar = False
+        while not terminar:
+            lote, terminar = self.__tomar_lote()
+            if not lote:
+                continue
+            try:
+                departamentos = self.__clasificador.clasificar_lote([contenido for _, contenido in lote])
+                for (id_reclamo, _), departamento in zip(lote, departamentos):
+                    self.__actualizar_departamento(repo_reclamos, id_reclamo, departamento)
+            except Exception as e:
+                print(f"Error al clasificar reclamos en segundo plano: {e}")
+            finally:
+                for _ in lote:
+                    self.__cola.task_done()
+
+    def __actualizar_departamento(self, repo_reclamos, id_reclamo: int, departamento: str):
+        if departamento == "indefinido":
+            return # Se queda en el departamento provisional
+        reclamo = repo_reclamos.obtener_por_id(id_reclamo)
+        # Si mientras tanto alguien lo derivó a mano, respetamos esa decisión
+        if reclamo is None or reclamo.departamento != DEPARTAMENTO_PROVISIONAL:
+            return
+        reclamo.departamento = departamento
+        repo_reclamos.actualizar(reclamo)
+        if self.__al_actualizar is not None:
+            self.__al_actualizar(reclamo)
+
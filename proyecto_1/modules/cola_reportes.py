@@ -0,0 +1,156 @@
+import os
+import socket
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from modules.factoria import crear_repositorio_trabajos_reportes
+from modules.trabajo_reporte import TrabajoReporte, PENDIENTE, EN_PROCESO, TERMINADO
+
+
+def propietario_actual() -> str:
+    """Identifica a este proceso como propietario de los trabajos que genera ("equipo:pid")."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _proceso_activo(pid: int) -> bool:
+    if os.name == "nt":
+        # En Windows os.kill(pid, 0) terminaría el proceso: se intenta abrirlo
+        import ctypes
+        manejador = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+        if not manejador:
+            return False
+        ctypes.windll.kernel32.CloseHandle(manejador)
+        return True
+    try:
+        os.kill(pid, 0) # La señal 0 sólo comprueba que el proceso exista
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Existe, pero es de otro usuario
+    return True
+
+
+def _propietario_terminado(propietario: Optional[str]) -> bool:
+    """True si el proceso propietario era de este equipo y ya no está corriendo."""
+    if not propietario:
+        return True
+    equipo, _, pid = propietario.rpartition(":")
+    if equipo != socket.gethostname() or not pid.isdigit():
+        return False # De otro equipo no se puede saber: se deja como está
+    return not _proceso_activo(int(pid))
+
+
+class ColaReportes:
+    """
+    Genera los reportes en segundo plano. solicitar() guarda el trabajo en la tabla
+    trabajos_reportes y vuelve enseguida; un pool de hilos llama a 'generar(trabajo)', que
+    debe crear el archivo y devolver su ruta. El estado se consulta con obtener(id_trabajo).
+    Los pedidos iguales (mismo rol, departamento, formato y versión de los datos) comparten
+    el trabajo: mientras se genera y también después, si su archivo todavía existe.
+    Cada hilo usa su propio repositorio (su propia sesión de SQLAlchemy), como ColaClasificacion.
+    Crear la cola no toca la BD: los trabajos que dejó a medias un servidor anterior se
+    marcan con interrumpir_inconclusos(), que se llama al arrancar el servidor.
+    'ejecutor' permite usar otro pool (por ejemplo, uno que se controle en las pruebas).
+    """
+    def __init__(self, generar: Callable[[TrabajoReporte], str],
+                 crear_repositorio: Callable = crear_repositorio_trabajos_reportes,
+                 cantidad_hilos: int = 1, ejecutor: Optional[Executor] = None):
+        if ejecutor is None and cantidad_hilos < 1:
+            raise ValueError("La cantidad de hilos debe ser al menos 1.")
+        self.__generar = generar
+        self.__crear_repositorio = crear_repositorio
+        self.__ejecutor = ejecutor or ThreadPoolExecutor(cantidad_hilos, thread_name_prefix="reportes")
+        self.__lock = threading.Lock()
+        self.__activos = {} # clave_pedido -> TrabajoReporte pendiente o en proceso
+        self.__repositorios = threading.local()
+        self.__propietario = propietario_actual()
+
+    def __repositorio(self):
+        repositorio = getattr(self.__repositorios, "repositorio", None)
+        if repositorio is None:
+            repositorio = self.__repositorios.repositorio = self.__crear_repositorio()
+        return repositorio
+
+    def interrumpir_inconclusos(self) -> int:
+        """
+        Marca como error los trabajos pendientes o en proceso cuyo proceso propietario ya
+        terminó (nadie los va a generar). Los de procesos que siguen corriendo, y los de otros
+        equipos, no se tocan. Devuelve cuántos se marcaron.
+        """
+        repositorio = self.__repositorio()
+        interrumpidos = 0
+        for estado in (PENDIENTE, EN_PROCESO):
+            for trabajo in repositorio.obtener_todos_por_filtro(estado=estado):
+                if _propietario_terminado(trabajo.propietario):
+                    trabajo.fallar("El servidor se detuvo antes de terminar el reporte.")
+                    repositorio.actualizar(trabajo)
+                    interrumpidos += 1
+        return interrumpidos
+
+    def solicitar(self, rol: str, departamento: Optional[str], formato: str, version_datos: str) -> TrabajoReporte:
+        """
+        Pide un reporte y devuelve su trabajo, sin esperar a que se genere. Si ya hay uno
+        igual en curso o terminado (con su archivo), devuelve ese en lugar de crear otro.
+        """
+        clave = (rol, departamento, formato, version_datos)
+        repositorio = self.__repositorio()
+        with self.__lock:
+            trabajo = self.__activos.get(clave)
+            if trabajo is not None:
+                return trabajo
+            anterior = repositorio.obtener_por_filtro(rol=rol, departamento=departamento, formato=formato,
+                                                      version_datos=version_datos, estado=TERMINADO)
+            if anterior is not None and os.path.exists(anterior.ruta_archivo):
+                return anterior
+            trabajo = TrabajoReporte(rol, departamento, formato, version_datos, self.__propietario)
+            repositorio.guardar(trabajo)
+            self.__activos[clave] = trabajo
+        # Fuera del lock: con un ejecutor que corre en el mismo hilo, __ejecutar vuelve a tomarlo
+        try:
+            self.__ejecutor.submit(self.__ejecutar, trabajo)
+        except Exception as e:
+            self.__finalizar(trabajo, repositorio, f"No se pudo encolar el reporte: {e}")
+            raise
+        return trabajo
+
+    def obtener(self, id_trabajo: str) -> Optional[TrabajoReporte]:
+        """Devuelve el trabajo con su estado actual (leído de la BD), o None si no existe."""
+        return self.__repositorio().obtener_por_id(id_trabajo)
+
+    def en_curso(self) -> int:
+        """Cantidad de trabajos pendientes o en proceso."""
+        with self.__lock:
+            return len(self.__activos)
+
+    def detener(self, esperar: bool = True):
+        """Cierra el pool (por defecto, esperando los reportes en curso)."""
+        self.__ejecutor.shutdown(wait=esperar)
+
+    def __ejecutar(self, trabajo: TrabajoReporte):
+        # Se ejecuta en un hilo del pool
+        repositorio = self.__repositorio()
+        mensaje_error = None
+        try:
+            trabajo.iniciar()
+            repositorio.actualizar(trabajo)
+            ruta = self.__generar(trabajo)
+            # Las estrategias lanzan una excepción si fallan; si igual no hay archivo, también es un error
+            if not ruta or not os.path.exists(ruta):
+                raise RuntimeError(ruta or "No se generó el archivo del reporte.")
+            trabajo.terminar(ruta)
+        except Exception as e:
+            print(f"Error al generar el reporte {trabajo.id_trabajo}: {e}")
+            mensaje_error = str(e) or type(e).__name__
+        self.__finalizar(trabajo, repositorio, mensaje_error)
+
+    def __finalizar(self, trabajo: TrabajoReporte, repositorio, mensaje_error: Optional[str]):
+        if mensaje_error is not None:
+            trabajo.fallar(mensaje_error)
+        try:
+            repositorio.actualizar(trabajo)
+        finally:
+            # Se quita de los activos después de guardar el estado final: un pedido igual que
+            # llegue ahora encuentra el trabajo terminado en la BD
+            with self.__lock:
+                self.__activos.pop(trabajo.clave_pedido, None)
@@ -1,84 +1,407 @@
+import re
+import threading
 from modules.reclamo import Reclamo
 from collections import Counter #modulo para evitar usar diccionarios
-from modules.calculadora_mediana import MonticuloMediana 
+from modules.calculadora_mediana import MonticuloMediana, CalculadoraMedianaConteo, cuantil_de_conteos
+from modules.bosquejo_cuantiles import BosquejoCuantiles
+from modules.repositorio_abstracto import Consulta
 
-# Lista simple de "stopwords" en español 
-STOPWORDS = [
+# Conjunto simple de "stopwords" en español (frozenset: la búsqueda es O(1))
+STOPWORDS = frozenset([
     "de", "la", "que", "el", "en", "y", "a", "los", "del", "se", "con", "por", "un",
     "para", "una", "su", "al", "lo", "como", "más", "pero", "sus", "le", "ya", "o",
     "este", "ha", "me", "si", "sin", "sobre", "este", "es", "porque", "cuando",
     "muy", "ante", "bajo", "cabe", "contra", "desde", "durante", "entre", "hacia",
     "hasta", "mediante", "para", "por", "segun", "sin", "so", "sobre", "tras", "via"
-]
+])
+
+# Una palabra es una secuencia de los caracteres que SÍ queremos conservar;
+# cualquier otro caracter (puntos, comas, números) separa palabras.
+PATRON_PALABRA = re.compile(r"[a-záéíóúñ]+")
+
+# Estados cuyos reclamos tienen un tiempo de resolución asignado (los que pide la consigna)
+ESTADOS_CON_TIEMPO = ["en proceso", "resuelto"]
+
+# Percentiles de los tiempos de resolución que se muestran además de la mediana
+PERCENTILES_TIEMPOS = (90, 95)
+# Clave del total cuando el reporte de percentiles abarca más de un departamento
+TODOS_LOS_DEPARTAMENTOS = "todos los departamentos"
+
+# Calculadoras de mediana disponibles. "monticulo_rapido" usa montículos basados en heapq.
+# "conteo" es todavía más rápida, pero sólo acepta tiempos enteros de 1 a 15 días
+# (los que permite Reclamo.cambiar_estado).
+MOTORES_MEDIANA = {
+    "monticulo": MonticuloMediana,
+    "monticulo_rapido": lambda: MonticuloMediana(rapido=True),
+    "conteo": CalculadoraMedianaConteo,
+}
+
+
+def _reporte_porcentajes(conteo_estados, total_reclamos: int) -> dict[str, float]:
+    """Arma el reporte de porcentajes a partir de la cantidad de reclamos por estado."""
+    if total_reclamos == 0:
+        return {"total": 0, "pendientes": 0, "en_proceso": 0, "resueltos": 0}
+
+    #Porque es una estructura auto-descriptiva.
+    #Cada valor que devuelve va acompañado de una "etiqueta" (la clave) que explica qué es.
+    return {
+        "total": total_reclamos,
+        "pendientes": (conteo_estados.get("pendiente", 0) / total_reclamos) * 100,
+        "en_proceso": (conteo_estados.get("en proceso", 0) / total_reclamos) * 100,
+        "resueltos": (conteo_estados.get("resuelto", 0) / total_reclamos) * 100,
+    }
+
+
+def _palabras_de(texto: str) -> list[str]:
+    """Separa un texto en palabras en minúsculas, sin stopwords ni palabras cortas."""
+    return [
+        palabra for palabra in PATRON_PALABRA.findall(texto.lower())
+        if len(palabra) > 2 and palabra not in STOPWORDS
+    ]
+
+
+def _palabras_frecuentes(textos, cantidad: int) -> list[tuple[str, int]]:
+    """
+    Cuenta las palabras de un conjunto de textos y devuelve las 'cantidad' más comunes.
+    Procesa los textos de a uno (no arma un único texto con todos), así que sirve
+    para recorrer los reclamos directamente desde la BD.
+    """
+    contador = Counter()
+    for texto in textos:
+        contador.update(_palabras_de(texto))
+
+    #Devolvemos las 'cantidad' más comunes.
+    return contador.most_common(cantidad) #a partir del diccionario de Counter, se ordenan las palabras y se determina la mas y menos comun
+
+
+def _validar_motor_mediana(motor: str):
+    if motor not in MOTORES_MEDIANA:
+        raise ValueError(f"El motor de mediana '{motor}' no existe. Opciones: {', '.join(MOTORES_MEDIANA)}.")
+
+
+def _mediana(tiempos, motor: str = "monticulo") -> float:
+    """Calcula la mediana de los tiempos recibidos, ignorando los None. Devuelve 0.0 si no hay ninguno."""
+    _validar_motor_mediana(motor)
+    calculadora = MOTORES_MEDIANA[motor]()
+    reclamos_validos_contados = 0
+
+    for tiempo_asignado in tiempos:
+        # Nos aseguramos que el reclamo tenga un tiempo asignado
+        if tiempo_asignado is not None:
+            calculadora.agregar_numero(tiempo_asignado)
+            reclamos_validos_contados += 1
+
+    if reclamos_validos_contados == 0:
+        return 0.0 # Evitamos errores si no hay reclamos con tiempo
+
+    return calculadora.obtener_mediana()
+
+
+def _reporte_percentiles(cuantiles_por_departamento: dict, percentiles) -> dict[str, dict[int, float]]:
+    """
+    Arma {departamento: {percentil: valor}} a partir de {departamento: lista de cuantiles},
+    con los cuantiles en el orden de 'percentiles'. Los None (sin tiempos) pasan a 0.0.
+    """
+    return {
+        departamento: {p: (0.0 if valor is None else valor) for p, valor in zip(percentiles, valores)}
+        for departamento, valores in cuantiles_por_departamento.items()
+    }
+
+
+def _bosquejo_de_histograma(histograma) -> BosquejoCuantiles:
+    """
+    Arma el BosquejoCuantiles de un histograma (valor -> cantidad), agregando los valores
+    de menor a mayor. Todos los generadores de estadísticas pasan por acá, así que el
+    resultado depende sólo de los tiempos y no del orden en que se leyeron.
+    """
+    bosquejo = BosquejoCuantiles()
+    for valor, cantidad in sorted(histograma.items()):
+        for _ in range(cantidad):
+            bosquejo.agregar_numero(valor)
+    return bosquejo
+
+
+def _percentiles_histogramas(histogramas: dict, percentiles) -> dict[str, dict[int, float]]:
+    """
+    Percentiles de cada departamento a partir de sus histogramas de tiempos, estimados con
+    un BosquejoCuantiles por departamento. Si hay más de un departamento, los bosquejos se
+    combinan para agregar el total (TODOS_LOS_DEPARTAMENTOS).
+    """
+    cuantiles = [p / 100 for p in percentiles]
+    bosquejos = {departamento: _bosquejo_de_histograma(histograma)
+                 for departamento, histograma in sorted(histogramas.items()) if histograma}
+    resultado = {departamento: bosquejo.obtener_cuantiles(cuantiles) for departamento, bosquejo in bosquejos.items()}
+    if len(bosquejos) > 1:
+        total = BosquejoCuantiles()
+        for bosquejo in bosquejos.values():
+            total.combinar(bosquejo)
+        resultado[TODOS_LOS_DEPARTAMENTOS] = total.obtener_cuantiles(cuantiles)
+    return _reporte_percentiles(resultado, percentiles)
+
 
 class GeneradorEstadisticas:
-    def __init__(self, reclamos: list[Reclamo]):
+    """
+    Calcula las estadísticas a partir de una lista de reclamos ya cargados en memoria.
+    'motor_mediana' elige la calculadora de la mediana (ver MOTORES_MEDIANA).
+    """
+
+    def __init__(self, reclamos: list[Reclamo], motor_mediana: str = "monticulo"):
+        _validar_motor_mediana(motor_mediana)
         self.__reclamos = reclamos
+        self.__motor_mediana = motor_mediana
 
     def calcular_porcentajes_estado(self) -> dict[str, float]:
         """
         Calcula el número total de reclamos y los porcentajes por estado.
         """
-        total_reclamos = len(self.__reclamos)
-        if total_reclamos == 0:
-            return {"total": 0, "pendientes": 0, "en_proceso": 0, "resueltos": 0}
-
         conteo_estados = Counter(r.estado for r in self.__reclamos) #cuenta cuántas veces aparece cada elemento único.
+        return _reporte_porcentajes(conteo_estados, len(self.__reclamos))
+
+    def calcular_palabras_frecuentes(self, cantidad: int = 15) -> list[tuple[str, int]]:
+        return _palabras_frecuentes((r.contenido for r in self.__reclamos), cantidad)
+    
+    def calcular_mediana_tiempos_resolucion(self) -> float:
+        # Filtramos solo los estados que pide la consigna 
+        return _mediana(
+            (r.tiempo_resolucion_asignado for r in self.__reclamos if r.estado in ESTADOS_CON_TIEMPO),
+            self.__motor_mediana
+        )
+
+    def calcular_percentiles_tiempos_resolucion(self, percentiles=PERCENTILES_TIEMPOS) -> dict[str, dict[int, float]]:
+        """
+        Devuelve {departamento: {percentil: días}} para los tiempos de resolución, con un
+        BosquejoCuantiles por departamento (más el total si hay varios departamentos).
+        """
+        histogramas = {}
+        for r in self.__reclamos:
+            if r.estado in ESTADOS_CON_TIEMPO and r.tiempo_resolucion_asignado is not None:
+                histogramas.setdefault(r.departamento, Counter())[r.tiempo_resolucion_asignado] += 1
+        return _percentiles_histogramas(histogramas, percentiles)
+
+
+class GeneradorEstadisticasSQL:
+    """
+    Calcula las mismas estadísticas que GeneradorEstadisticas pero le pide a la BD sólo
+    lo necesario: los conteos por estado con GROUP BY y las columnas 'tiempo_resolucion_asignado'
+    y 'contenido' recorridas por lotes. No se construye ninguna entidad Reclamo.
+    'departamento' en None significa todos los departamentos.
+    """
 
-        #Porque es una estructura auto-descriptiva.
-        #Cada valor que devuelve va acompañado de una "etiqueta" (la clave) que explica qué es.
-        reporte = {
-            "total": total_reclamos,
-            "pendientes": (conteo_estados.get("pendiente", 0) / total_reclamos) * 100,
-            "en_proceso": (conteo_estados.get("en proceso", 0) / total_reclamos) * 100,
-            "resueltos": (conteo_estados.get("resuelto", 0) / total_reclamos) * 100,
-        }
-        return reporte
+    def __init__(self, repo_reclamos, departamento: str | None = None, motor_mediana: str = "monticulo"):
+        _validar_motor_mediana(motor_mediana)
+        self.__repo_reclamos = repo_reclamos
+        self.__departamento = departamento
+        self.__motor_mediana = motor_mediana
+
+    def __consulta(self) -> Consulta:
+        if self.__departamento:
+            return Consulta(departamento=self.__departamento)
+        return Consulta()
+
+    def calcular_porcentajes_estado(self) -> dict[str, float]:
+        conteo_estados = self.__repo_reclamos.contar_por("estado", self.__consulta())
+        return _reporte_porcentajes(conteo_estados, sum(conteo_estados.values()))
 
     def calcular_palabras_frecuentes(self, cantidad: int = 15) -> list[tuple[str, int]]:
-        #Unimos el contenido de todos los reclamos en un solo texto.
-        texto_completo = " ".join(r.contenido for r in self.__reclamos).lower()
-
-        # Definimos los caracteres que SÍ queremos conservar.
-        caracteres_permitidos = "abcdefghijklmnopqrstuvwxyzáéíóúñ "
-        
-        # Usamos una lista para construir el nuevo string limpio eficientemente.
-        lista_caracteres_limpios = []
-        for caracter in texto_completo:
-            if caracter in caracteres_permitidos:
-                lista_caracteres_limpios.append(caracter)
+        return _palabras_frecuentes(self.__repo_reclamos.iterar_columna("contenido", self.__consulta()), cantidad)
+
+    def calcular_mediana_tiempos_resolucion(self) -> float:
+        consulta = self.__consulta().en("estado", ESTADOS_CON_TIEMPO)
+        return _mediana(self.__repo_reclamos.iterar_columna("tiempo_resolucion_asignado", consulta), self.__motor_mediana)
+
+    def calcular_percentiles_tiempos_resolucion(self, percentiles=PERCENTILES_TIEMPOS) -> dict[str, dict[int, float]]:
+        """Igual que en GeneradorEstadisticas, con el histograma de cada departamento contado en la BD (GROUP BY)."""
+        consulta = self.__consulta().en("estado", ESTADOS_CON_TIEMPO)
+        histogramas = {}
+        for departamento in self.__repo_reclamos.contar_por("departamento", consulta):
+            consulta_departamento = Consulta(departamento=departamento).en("estado", ESTADOS_CON_TIEMPO)
+            conteo = self.__repo_reclamos.contar_por("tiempo_resolucion_asignado", consulta_departamento)
+            histogramas[departamento] = Counter({tiempo: cantidad for tiempo, cantidad in conteo.items() if tiempo is not None})
+        return _percentiles_histogramas(histogramas, percentiles)
+
+
+# Columnas de los reclamos que usa la instantánea, en el orden de _fila_instantanea
+COLUMNAS_INSTANTANEA = ["id", "departamento", "estado", "tiempo_resolucion_asignado", "contenido"]
+
+
+def _fila_instantanea(reclamo: Reclamo) -> tuple:
+    """Los valores de COLUMNAS_INSTANTANEA de una entidad Reclamo."""
+    return (reclamo.id_reclamo, reclamo.departamento, reclamo.estado,
+            reclamo.tiempo_resolucion_asignado, reclamo.contenido)
+
+
+def _mediana_histograma(histograma: Counter) -> float:
+    """Mediana de los valores de un histograma (valor -> cantidad). Devuelve 0.0 si está vacío."""
+    mediana = cuantil_de_conteos(sorted(histograma.items()), 0.5)
+    return 0.0 if mediana is None else mediana
+
+
+class InstantaneaEstadisticas:
+    """
+    Estadísticas materializadas de los reclamos, que se mantienen al día con cada cambio
+    (SubsistemaGestionReclamos avisa al crear, cambiar de estado o derivar un reclamo) en
+    lugar de recalcularse en cada visita a /analitica.
+    Por departamento (y en total, con la clave None) guarda:
+    - la cantidad de reclamos por estado,
+    - un Counter de las palabras de sus contenidos,
+    - un histograma de los tiempos de resolución (días -> cantidad de reclamos).
+    Mientras no se construya con reconstruir() ignora los avisos: no tiene una base
+    sobre la cual aplicarlos.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__construida = False
+        self.__limpiar()
+
+    def __limpiar(self):
+        self.__estados = {None: Counter()}
+        self.__palabras = {None: Counter()}
+        self.__tiempos = {None: Counter()}
+        # id_reclamo -> (departamento, estado, tiempo): lo necesario para deshacer su aporte
+        self.__aportes = {}
+
+    @property
+    def construida(self) -> bool:
+        return self.__construida
+
+    def reconstruir(self, reclamos):
+        """Vuelve a calcular todo a partir de una lista de entidades Reclamo."""
+        self.reconstruir_desde_filas(_fila_instantanea(reclamo) for reclamo in reclamos)
+
+    def reconstruir_desde_bd(self, repo_reclamos):
+        """
+        Vuelve a calcular todo leyendo de la BD sólo las columnas que usa (COLUMNAS_INSTANTANEA),
+        por lotes: no se construyen entidades ni se cargan creadores y adherentes.
+        """
+        self.reconstruir_desde_filas(repo_reclamos.iterar_columnas(COLUMNAS_INSTANTANEA))
+
+    def reconstruir_desde_filas(self, filas):
+        """Vuelve a calcular todo a partir de tuplas con los valores de COLUMNAS_INSTANTANEA."""
+        with self.__lock:
+            self.__limpiar()
+            for fila in filas:
+                self.__sumar(*fila)
+            self.__construida = True
+
+    def registrar(self, reclamo: Reclamo):
+        """Agrega un reclamo recién creado."""
+        with self.__lock:
+            if self.__construida:
+                self.__restar(reclamo) # Por si ya estaba registrado
+                self.__sumar(*_fila_instantanea(reclamo))
+
+    def actualizar(self, reclamo: Reclamo):
+        """Refleja el nuevo estado, tiempo o departamento de un reclamo ya registrado."""
+        self.registrar(reclamo)
+
+    def __sumar(self, id_reclamo: int, departamento: str, estado: str, tiempo, contenido: str):
+        self.__aportes[id_reclamo] = (departamento, estado, tiempo)
+        palabras = _palabras_de(contenido)
+        for clave in (None, departamento):
+            self.__estados.setdefault(clave, Counter())[estado] += 1
+            self.__palabras.setdefault(clave, Counter()).update(palabras)
+            if estado in ESTADOS_CON_TIEMPO and tiempo is not None:
+                self.__tiempos.setdefault(clave, Counter())[tiempo] += 1
+
+    def __restar(self, reclamo: Reclamo):
+        aporte = self.__aportes.pop(reclamo.id_reclamo, None)
+        if aporte is None:
+            return
+        departamento, estado, tiempo = aporte
+        palabras = _palabras_de(reclamo.contenido) # El contenido de un reclamo no cambia
+        for clave in (None, departamento):
+            _descontar(self.__estados[clave], [estado])
+            _descontar(self.__palabras[clave], palabras)
+            if estado in ESTADOS_CON_TIEMPO and tiempo is not None:
+                _descontar(self.__tiempos[clave], [tiempo])
+
+    # --- Lecturas (no recorren reclamos) ---
+
+    def conteo_estados(self, departamento: str | None = None) -> Counter:
+        with self.__lock:
+            return Counter(self.__estados.get(departamento, {}))
+
+    def contador_palabras(self, departamento: str | None = None) -> Counter:
+        with self.__lock:
+            return Counter(self.__palabras.get(departamento, {}))
+
+    def histograma_tiempos(self, departamento: str | None = None) -> Counter:
+        with self.__lock:
+            return Counter(self.__tiempos.get(departamento, {}))
+
+    def porcentajes_estado(self, departamento: str | None = None) -> dict[str, float]:
+        with self.__lock:
+            conteo = self.__estados.get(departamento, Counter())
+            return _reporte_porcentajes(conteo, sum(conteo.values()))
+
+    def palabras_frecuentes(self, cantidad: int = 15, departamento: str | None = None) -> list[tuple[str, int]]:
+        with self.__lock:
+            return self.__palabras.get(departamento, Counter()).most_common(cantidad)
+
+    def mediana_tiempos(self, departamento: str | None = None) -> float:
+        with self.__lock:
+            return _mediana_histograma(self.__tiempos.get(departamento, Counter()))
+
+    def percentiles_tiempos(self, percentiles=PERCENTILES_TIEMPOS, departamento: str | None = None) -> dict[str, dict[int, float]]:
+        """
+        Mismo formato y mismo cálculo que GeneradorEstadisticas.calcular_percentiles_tiempos_resolucion
+        (un BosquejoCuantiles por departamento), así /analitica muestra los mismos valores
+        lea de la instantánea o de la BD.
+        """
+        with self.__lock:
+            if departamento is not None:
+                histogramas = {departamento: Counter(self.__tiempos.get(departamento, {}))}
             else:
-                # Si el caracter no es una letra (ej. un punto, coma, número),
-                # lo reemplazamos por un espacio para separar palabras.
-                lista_caracteres_limpios.append(' ')
-        
-        # Unimos la lista de caracteres para formar nuestro texto limpio.
-        texto_limpio = "".join(lista_caracteres_limpios)
-
-        #Separamos en palabras y filtramos las stopwords y palabras cortas.
-        palabras = [
-            palabra for palabra in texto_limpio.split()
-            if palabra not in STOPWORDS and len(palabra) > 2
-        ]
-
-        #Contamos las frecuencias y devolvemos las 'cantidad' más comunes.
-        return Counter(palabras).most_common(cantidad) #a partir del diccionario de Counter, se ordenan las palabras y se determina la mas y menos comun
-    
+                histogramas = {clave: Counter(histograma) for clave, histograma in self.__tiempos.items() if clave is not None}
+        return _percentiles_histogramas(histogramas, percentiles)
+
+
+def _descontar(contador: Counter, elementos):
+    """Resta los elementos del contador y elimina los que quedan en cero."""
+    contador.subtract(elementos)
+    for elemento in set(elementos):
+        if contador[elemento] <= 0:
+            del contador[elemento]
+
+
+class GeneradorEstadisticasInstantanea:
+    """Misma interfaz que GeneradorEstadisticas, leyendo de una InstantaneaEstadisticas."""
+
+    def __init__(self, instantanea: InstantaneaEstadisticas, departamento: str | None = None):
+        self.__instantanea = instantanea
+        self.__departamento = departamento
+
+    def calcular_porcentajes_estado(self) -> dict[str, float]:
+        return self.__instantanea.porcentajes_estado(self.__departamento)
+
+    def calcular_palabras_frecuentes(self, cantidad: int = 15) -> list[tuple[str, int]]:
+        return self.__instantanea.palabras_frecuentes(cantidad, self.__departamento)
+
     def calcular_mediana_tiempos_resolucion(self) -> float:
-        calculadora = MonticuloMediana()
-        reclamos_validos_contados = 0
-        
-        for reclamo in self.__reclamos:
-            # Filtramos solo los estados que pide la consigna 
-            if reclamo.estado in ["en proceso", "resuelto"]:
-                tiempo_asignado = reclamo.tiempo_resolucion_asignado
-                
-                # Nos aseguramos que el reclamo tenga un tiempo asignado
-                if tiempo_asignado is not None:
-                    calculadora.agregar_numero(tiempo_asignado)
-                    reclamos_validos_contados += 1
-        
-        if reclamos_validos_contados == 0:
-            return 0.0 # Evitamos errores si no hay reclamos con tiempo
-        
-        return calculadora.obtener_mediana()
\ No newline at end of file
+        return self.__instantanea.mediana_tiempos(self.__departamento)
+
+    def calcular_percentiles_tiempos_resolucion(self, percentiles=PERCENTILES_TIEMPOS) -> dict[str, dict[int, float]]:
+        return self.__instantanea.percentiles_tiempos(percentiles, self.__departamento)
+
+
+def crear_generador_estadisticas(repo_reclamos, departamento: str | None = None,
+                                 instantanea: InstantaneaEstadisticas | None = None, motor_mediana: str = "monticulo"):
+    """
+    Devuelve el generador de estadísticas adecuado para el repositorio.
+    Si hay una instantánea construida se lee de ella. Si no, y el repositorio sabe
+    agregar en la BD, se usa GeneradorEstadisticasSQL; si tampoco, se cargan los
+    reclamos y se usa el GeneradorEstadisticas en memoria. 'motor_mediana' se usa en
+    estos dos últimos casos (la instantánea ya guarda un histograma de los tiempos).
+    """
+    if instantanea is not None and instantanea.construida:
+        return GeneradorEstadisticasInstantanea(instantanea, departamento)
+
+    if hasattr(repo_reclamos, "contar_por") and hasattr(repo_reclamos, "iterar_columna"):
+        return GeneradorEstadisticasSQL(repo_reclamos, departamento, motor_mediana)
+
+    if departamento:
+        reclamos = repo_reclamos.obtener_todos_por_filtro(departamento=departamento)
+    else:
+        reclamos = repo_reclamos.obtener_todos()
+    return GeneradorEstadisticas(reclamos, motor_mediana)
@@ -1,4 +1,4 @@
-from modules.repositorio_concreto import RepositorioUsuariosSQLAlchemy, RepositorioReclamosSQLAlchemy
+from modules.repositorio_concreto import RepositorioUsuariosSQLAlchemy, RepositorioReclamosSQLAlchemy, RepositorioTrabajosReportesSQLAlchemy
 from modules.config_db import crear_sesion
 
 def crear_repositorio_usuarios() -> RepositorioUsuariosSQLAlchemy:
@@ -18,3 +18,9 @@ def crear_repositorio_reclamos() -> RepositorioReclamosSQLAlchemy:
     # Para una aplicación web, generalmente se gestiona una sesión por solicitud (request).
     return RepositorioReclamosSQLAlchemy(sesion)
 
+def crear_repositorio_trabajos_reportes() -> RepositorioTrabajosReportesSQLAlchemy:
+    """
+    Función factoría que crea y devuelve una instancia del repositorio de trabajos de reportes.
+    """
+    sesion = crear_sesion() # Cada hilo que genera reportes usa su propia sesión
+    return RepositorioTrabajosReportesSQLAlchemy(sesion)
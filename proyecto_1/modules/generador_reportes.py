@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-import os
-import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from html import escape
+import io
+import base64
+import uuid
+import zipfile
 
 # Importamos las bibliotecas que SÍ necesitamos (y que causaron el error)
 import os         # Para crear carpetas y unir rutas de archivos
-import datetime   # Para crear nombres de archivo únicos con fecha/hora
 
 # Importamos la biblioteca para crear PDF (asegúrate de instalarla: pip install fpdf2)
 from fpdf import FPDF 
@@ -17,6 +19,26 @@ from modules.usuario import Usuario # Necesario para los datos del reclamo
 
 # Carpeta donde se guardarán los reportes (relativa a la raíz del proyecto)
 CARPETA_REPORTES = "reportes"
+# Cantidad de filas de reclamos que ReporteHTML junta antes de escribirlas en el archivo
+FILAS_POR_PARTE_HTML = 500
+# Cantidad máxima de reclamos en cada archivo PDF (los reportes más grandes se dividen)
+MAXIMO_FILAS_POR_PARTE_PDF = 5000
+
+
+def _a_latin1(texto: str) -> str:
+    """Reemplaza los caracteres que las fuentes básicas de fpdf (latin-1) no pueden escribir."""
+    return texto.encode('latin-1', 'replace').decode('latin-1')
+
+
+def nombre_archivo_reporte(departamento: str, extension: str, identificador: Optional[str] = None) -> str:
+    """
+    Nombre del archivo del reporte de un departamento. 'identificador' lo hace único (el
+    servidor usa el id del trabajo); sin él se usa uno al azar, así dos reportes del mismo
+    departamento pedidos a la vez nunca comparten el archivo.
+    """
+    if identificador is None:
+        identificador = uuid.uuid4().hex
+    return f"reporte_{departamento.replace(' ', '_')}_{identificador}.{extension}"
 
 
 # --- 2. INTERFAZ ABSTRACTA (Estrategia) ---
@@ -28,10 +50,12 @@ class ReporteEstrategiaAbstracta(ABC):
     """
     
     @abstractmethod
-    def generar(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str) -> str:
+    def generar(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str,
+                identificador: Optional[str] = None) -> str:
         """
         Método abstracto para generar el reporte.
-        Devolverá la ruta (string) al archivo generado.
+        Devolverá la ruta (string) al archivo generado; si no lo puede crear, lanza la excepción.
+        'identificador' va en el nombre del archivo (ver nombre_archivo_reporte).
         """
         raise NotImplementedError
 
@@ -49,9 +73,10 @@ class GeneradorReportes:
     def set_estrategia(self, estrategia: ReporteEstrategiaAbstracta):
         self.__estrategia = estrategia
 
-    def generar_reporte(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str) -> str:
+    def generar_reporte(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str,
+                        identificador: Optional[str] = None) -> str:
         # Delega la creación del reporte a la estrategia seleccionada
-        return self.__estrategia.generar(lista_reclamos, estadisticas, departamento)
+        return self.__estrategia.generar(lista_reclamos, estadisticas, departamento, identificador)
 
 
 # --- 4. IMPLEMENTACIONES CONCRETAS (HTML y PDF) ---
@@ -59,23 +84,40 @@ class GeneradorReportes:
 class ReporteHTML(ReporteEstrategiaAbstracta):
     """
     Implementación concreta para generar el reporte en formato HTML.
-   
+    El documento se escribe por partes: las filas van al archivo a medida que llegan los
+    reclamos, así un reporte de muchos reclamos ocupa poca memoria.
     """
     
-    def generar(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str) -> str:
+    def generar(self, lista_reclamos: Iterable[Reclamo], estadisticas: Dict[str, Any], departamento: str,
+                identificador: Optional[str] = None) -> str:
         
         # Usamos 'os' para asegurarnos de que la carpeta de reportes exista
         os.makedirs(CARPETA_REPORTES, exist_ok=True)
         
-        # Usamos 'datetime' para generar un nombre de archivo único
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        nombre_archivo = f"reporte_{departamento.replace(' ', '_')}_{timestamp}.html"
         # Usamos 'os.path.join' para crear la ruta de forma segura
-        ruta_completa = os.path.join(CARPETA_REPORTES, nombre_archivo)
+        ruta_completa = os.path.join(CARPETA_REPORTES, nombre_archivo_reporte(departamento, "html", identificador))
+
+        # Escribir el HTML en el archivo a medida que se genera. Si falla (por ejemplo, al
+        # leer los reclamos) se borra el archivo a medio escribir y la excepción sigue.
+        try:
+            with open(ruta_completa, "w", encoding="utf-8") as f:
+                for parte in self.__partes(lista_reclamos, estadisticas, departamento):
+                    f.write(parte)
+        except Exception:
+            if os.path.exists(ruta_completa):
+                os.remove(ruta_completa)
+            raise
+        return ruta_completa # Devolvemos la ruta al archivo creado
 
-        # Construir el contenido del HTML
-        html = "<html><head><title>Reporte de Reclamos</title>"
-        html += """
+    def __partes(self, lista_reclamos: Iterable[Reclamo], estadisticas: Dict[str, Any], departamento: str) -> Iterator[str]:
+        """
+        Devuelve el HTML en partes: primero el encabezado y las estadísticas, después las
+        filas de a FILAS_POR_PARTE_HTML. 'lista_reclamos' puede ser cualquier iterable (por
+        ejemplo, IRepositorio.iterar_por_filtro) y se recorre una sola vez.
+        """
+        # Construir el encabezado del HTML
+        html = ["<html><head><meta charset=\"utf-8\"><title>Reporte de Reclamos</title>"]
+        html.append("""
         <style>
             body { font-family: sans-serif; margin: 20px; }
             h1 { color: #333; }
@@ -86,86 +128,164 @@ class ReporteHTML(ReporteEstrategiaAbstracta):
             th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
             th { background-color: #f0f0f0; }
         </style>
-        """
-        html += f"</head><body>"
-        html += f"<h1>Reporte de Reclamos - Departamento: {departamento}</h1>"
+        """)
+        html.append("</head><body>")
+        html.append(f"<h1>Reporte de Reclamos - Departamento: {escape(departamento)}</h1>")
         
         # --- Sección de Estadísticas ---
-        html += "<h2>Estadísticas Generales</h2>"
-        html += "<ul>"
-        html += f"<li><b>Total de Reclamos:</b> {estadisticas.get('total', 0)}</li>"
-        html += f"<li><b>Pendientes:</b> {estadisticas.get('pendientes', 0):.2f}%</li>"
-        html += f"<li><b>En Proceso:</b> {estadisticas.get('en_proceso', 0):.2f}%</li>"
-        html += f"<li><b>Resueltos:</b> {estadisticas.get('resueltos', 0):.2f}%</li>"
-        html += f"<li><b>Mediana Tiempos Resolución:</b> {estadisticas.get('mediana_tiempos', 0)} días</li>"
-        html += "</ul>"
+        html.append("<h2>Estadísticas Generales</h2>")
+        html.append("<ul>")
+        html.append(f"<li><b>Total de Reclamos:</b> {estadisticas.get('total', 0)}</li>")
+        html.append(f"<li><b>Pendientes:</b> {estadisticas.get('pendientes', 0):.2f}%</li>")
+        html.append(f"<li><b>En Proceso:</b> {estadisticas.get('en_proceso', 0):.2f}%</li>")
+        html.append(f"<li><b>Resueltos:</b> {estadisticas.get('resueltos', 0):.2f}%</li>")
+        html.append(f"<li><b>Mediana Tiempos Resolución:</b> {estadisticas.get('mediana_tiempos', 0)} días</li>")
+        html.append("</ul>")
+
+        # --- Percentiles de tiempos de resolución (por departamento) ---
+        percentiles_tiempos = estadisticas.get("percentiles_tiempos", {})
+        if percentiles_tiempos:
+            percentiles = list(next(iter(percentiles_tiempos.values())))
+            html.append("<h3>Percentiles de Tiempos de Resolución (días)</h3>")
+            html.append("<table>")
+            html.append("<tr><th>Departamento</th>" + "".join(f"<th>p{p}</th>" for p in percentiles) + "</tr>")
+            for nombre_departamento, valores in percentiles_tiempos.items():
+                html.append(f"<tr><td>{escape(nombre_departamento)}</td>" + "".join(f"<td>{valores[p]:.2f}</td>" for p in percentiles) + "</tr>")
+            html.append("</table>")
 
         # --- NUEVO: Gráfico Circular en HTML ---
         ruta_grafico = estadisticas.get("ruta_grafico", None)
-        if ruta_grafico:
-            html += "<h3>Distribución de Estados</h3>"
+        grafico_bytes = estadisticas.get("grafico_bytes", None)
+        if grafico_bytes:
+            # El PNG va dentro del HTML (data URI): el reporte descargado se ve sin la carpeta de gráficos
+            html.append("<h3>Distribución de Estados</h3>")
+            html.append(f'<img src="data:image/png;base64,{base64.b64encode(grafico_bytes).decode("ascii")}" '
+                        'alt="Diagrama Circular de Estados" style="max-width: 500px; height: auto;">')
+        elif ruta_grafico:
+            html.append("<h3>Distribución de Estados</h3>")
             # La ruta es relativa desde el archivo HTML ('reportes/') al gráfico ('reportes/graficos/')
-            html += f'<img src="{ruta_grafico}" alt="Diagrama Circular de Estados" style="max-width: 500px; height: auto;">'
+            html.append(f'<img src="{ruta_grafico}" alt="Diagrama Circular de Estados" style="max-width: 500px; height: auto;">')
         
         # --- Sección de Lista de Reclamos ---
-        html += "<h2>Detalle de Reclamos</h2>"
-        html += "<table>"
-        html += "<tr><th>ID</th><th>Estado</th><th>Contenido</th><th>Creador (Usuario)</th><th>Fecha</th><th>Adherentes</th></tr>"
-        
+        html.append("<h2>Detalle de Reclamos</h2>")
+        html.append("<table>")
+        html.append("<tr><th>ID</th><th>Estado</th><th>Contenido</th><th>Creador (Usuario)</th><th>Fecha</th><th>Adherentes</th></tr>")
+        yield "".join(html)
+
+        # Las filas se juntan en una lista y se unen una vez por parte (sumar strings en el
+        # bucle copiaría todo lo acumulado en cada fila)
+        filas = []
         for reclamo in lista_reclamos:
-            html += "<tr>"
-            html += f"<td>{reclamo.id_reclamo}</td>"
-            html += f"<td>{reclamo.estado}</td>"
-            html += f"<td>{reclamo.contenido}</td>"
-            html += f"<td>{reclamo.usuario_creador.nombre_usuario}</td>"
             # Formateamos el timestamp (que es un objeto datetime)
             fecha_str = reclamo.timestamp.strftime('%Y-%m-%d %H:%M') if reclamo.timestamp else 'N/A'
-            html += f"<td>{fecha_str}</td>"
-            html += f"<td>{reclamo.numero_adherentes}</td>"
-            html += "</tr>"
-            
-        html += "</table>"
-        html += "</body></html>"
-        
-        # Escribir el string HTML en un archivo
-        try:
-            with open(ruta_completa, "w", encoding="utf-8") as f:
-                f.write(html)
-            return ruta_completa # Devolvemos la ruta al archivo creado
-        except Exception as e:
-            return f"Error al crear HTML: {e}"
+            filas.append(
+                f"<tr><td>{reclamo.id_reclamo}</td>"
+                f"<td>{escape(reclamo.estado)}</td>"
+                f"<td>{escape(reclamo.contenido)}</td>"
+                f"<td>{escape(reclamo.usuario_creador.nombre_usuario)}</td>"
+                f"<td>{fecha_str}</td>"
+                f"<td>{reclamo.numero_adherentes}</td></tr>"
+            )
+            if len(filas) == FILAS_POR_PARTE_HTML:
+                yield "".join(filas)
+                filas = []
+
+        filas.append("</table>")
+        filas.append("</body></html>")
+        yield "".join(filas)
 
 
 class ReportePDF(ReporteEstrategiaAbstracta):
     """
     Implementación concreta para generar el reporte en formato PDF.
-   
+    Los reclamos se recorren una sola vez (pueden venir de IRepositorio.iterar_por_filtro).
+    La altura de cada fila se calcula antes de dibujarla (_partir_en_renglones): así la fila
+    no se corta entre dos páginas y cada celda se dibuja una sola vez. fpdf2 arma el documento entero en memoria,
+    así que cada MAXIMO_FILAS_POR_PARTE_PDF filas se cierra un archivo y se empieza otro;
+    si hubo más de una parte, se entregan todas juntas en un .zip.
     """
+    # Columnas de la tabla de reclamos: (título, ancho en mm). El contenido es la única de alto variable.
+    COLUMNAS = [("ID", 10), ("Estado", 25), ("Contenido", 95), ("Creador", 30), ("Fecha", 20), ("Adh.", 10)]
+    ALTO_CELDA = 6
+    ANCHO_CELDA = 190 # Ancho A4 menos márgenes
+
+    def __init__(self, maximo_filas_por_parte: int = MAXIMO_FILAS_POR_PARTE_PDF):
+        if maximo_filas_por_parte < 1:
+            raise ValueError("La cantidad de filas por parte debe ser al menos 1.")
+        self.__maximo_filas_por_parte = maximo_filas_por_parte
     
-    def generar(self, lista_reclamos: List[Reclamo], estadisticas: Dict[str, Any], departamento: str) -> str:
+    def generar(self, lista_reclamos: Iterable[Reclamo], estadisticas: Dict[str, Any], departamento: str,
+                identificador: Optional[str] = None) -> str:
         
         os.makedirs(CARPETA_REPORTES, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        nombre_archivo = f"reporte_{departamento.replace(' ', '_')}_{timestamp}.pdf"
-        ruta_completa = os.path.join(CARPETA_REPORTES, nombre_archivo)
+        ruta_completa = os.path.join(CARPETA_REPORTES, nombre_archivo_reporte(departamento, "pdf", identificador))
+        base_ruta, _ = os.path.splitext(ruta_completa)
+
+        rutas_partes = []
+        try:
+            reclamos = iter(lista_reclamos)
+            siguiente = next(reclamos, None)
+            # Siempre hay al menos una parte (con las estadísticas), aunque no haya reclamos
+            while siguiente is not None or not rutas_partes:
+                numero_parte = len(rutas_partes) + 1
+                pdf = self.__nuevo_documento(estadisticas, departamento, numero_parte)
+                anchos_palabras = {} # palabra -> ancho con la fuente de las filas (uno por parte)
+                filas = 0
+                while siguiente is not None and filas < self.__maximo_filas_por_parte:
+                    self.__dibujar_fila(pdf, siguiente, anchos_palabras)
+                    filas += 1
+                    siguiente = next(reclamos, None)
+                ruta_parte = f"{base_ruta}_parte{numero_parte}.pdf"
+                pdf.output(ruta_parte)
+                rutas_partes.append(ruta_parte)
+                del pdf # Liberamos la parte antes de armar la siguiente
+
+            if len(rutas_partes) == 1:
+                os.replace(rutas_partes[0], ruta_completa)
+                return ruta_completa # Devolvemos la ruta al archivo creado
 
+            # Varias partes: las juntamos en un .zip (los PDF ya vienen comprimidos)
+            ruta_zip = f"{base_ruta}.zip"
+            with zipfile.ZipFile(ruta_zip, "w", compression=zipfile.ZIP_STORED) as archivo_zip:
+                for ruta_parte in rutas_partes:
+                    archivo_zip.write(ruta_parte, arcname=os.path.basename(ruta_parte))
+            return ruta_zip
+        finally:
+            # Las partes sueltas no quedan nunca: ya están en el archivo final, o el reporte falló
+            for ruta_parte in rutas_partes:
+                if os.path.exists(ruta_parte):
+                    os.remove(ruta_parte)
+
+    def __nuevo_documento(self, estadisticas: Dict[str, Any], departamento: str, numero_parte: int) -> FPDF:
+        """Crea el PDF de una parte con su título; la primera lleva además estadísticas y gráfico."""
         # Configuración básica del PDF
         pdf = FPDF(orientation='P', unit='mm', format='A4')
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
         
         # --- Título ---
+        titulo = f"Reporte de Reclamos - Depto: {departamento}"
+        if numero_parte > 1:
+            titulo += f" (parte {numero_parte})"
         pdf.set_font("Helvetica", 'B', 16)
-        pdf.cell(0, 10, f"Reporte de Reclamos - Depto: {departamento}", ln=True, align='C')
+        pdf.cell(0, 10, _a_latin1(titulo), ln=True, align='C')
         pdf.ln(5) # Salto de línea
 
+        if numero_parte == 1:
+            self.__escribir_estadisticas(pdf, estadisticas)
+
+        # --- Detalle de Reclamos ---
+        pdf.set_font("Helvetica", 'B', 12)
+        pdf.cell(0, 10, "Detalle de Reclamos", ln=True)
+        self.__encabezado_tabla(pdf)
+        return pdf
+
+    def __escribir_estadisticas(self, pdf: FPDF, estadisticas: Dict[str, Any]):
         # --- Estadísticas ---
         pdf.set_font("Helvetica", 'B', 12)
         pdf.cell(0, 10, "Estadisticas Generales", ln=True)
         
         pdf.set_font("Helvetica", '', 10)
-        ancho_celda = 190 # Ancho A4 menos márgenes
-        alto_celda = 6
         
         stats_texto = f"""
 - Total de Reclamos: {estadisticas.get('total', 0)}
@@ -174,13 +294,24 @@ class ReportePDF(ReporteEstrategiaAbstracta):
 - Resueltos: {estadisticas.get('resueltos', 0):.2f}%
 - Mediana Tiempos Resolucion: {estadisticas.get('mediana_tiempos', 0)} dias
 """
+        # Percentiles de tiempos de resolución, una línea por departamento
+        for nombre_departamento, valores in estadisticas.get("percentiles_tiempos", {}).items():
+            detalle = ", ".join(f"p{p}: {valor:.2f}" for p, valor in valores.items())
+            stats_texto += f"- Percentiles Tiempos ({nombre_departamento}): {detalle} dias\n"
         # Usamos multi_cell para texto que puede ser largo
-        pdf.multi_cell(ancho_celda, alto_celda, stats_texto, border=1)
+        pdf.multi_cell(self.ANCHO_CELDA, self.ALTO_CELDA, _a_latin1(stats_texto), border=1)
         pdf.ln(5)
 
         # --- NUEVO: Gráfico Circular en PDF ---
         ruta_grafico_relativa = estadisticas.get("ruta_grafico", None)
-        if ruta_grafico_relativa:
+        grafico_bytes = estadisticas.get("grafico_bytes", None)
+        if grafico_bytes:
+            # fpdf2 acepta la imagen como archivo en memoria: no hace falta guardarla en el disco
+            pdf.set_font("Helvetica", 'B', 12)
+            pdf.cell(0, 10, "Distribución de Estados", ln=True)
+            pdf.image(io.BytesIO(grafico_bytes), x=55, w=100)
+            pdf.ln(5)
+        elif ruta_grafico_relativa:
             # Necesitamos la ruta ABSOLUTA/completa para fpdf.
             ruta_absoluta_grafico = os.path.abspath(os.path.join(CARPETA_REPORTES, ruta_grafico_relativa))
             
@@ -198,70 +329,88 @@ class ReportePDF(ReporteEstrategiaAbstracta):
 
             pdf.ln(5)
         # --- FIN Gráfico Circular en PDF ---
-        
-        # --- Detalle de Reclamos ---
-        pdf.set_font("Helvetica", 'B', 12)
-        pdf.cell(0, 10, "Detalle de Reclamos", ln=True)
+
+    def __encabezado_tabla(self, pdf: FPDF):
+        """Encabezado de la "tabla"; se repite en cada página."""
         pdf.set_font("Helvetica", '', 9)
-        
-        # Encabezado de la "tabla"
         pdf.set_fill_color(240, 240, 240)
-        ancho_id = 10
-        ancho_estado = 25
-        ancho_contenido = 95 # Más pequeño para que quepa todo
-        ancho_creador = 30
-        ancho_fecha = 20
-        ancho_adh = 10
-        
-        pdf.cell(ancho_id, alto_celda, "ID", border=1, fill=True)
-        pdf.cell(ancho_estado, alto_celda, "Estado", border=1, fill=True)
-        pdf.cell(ancho_contenido, alto_celda, "Contenido", border=1, fill=True)
-        pdf.cell(ancho_creador, alto_celda, "Creador", border=1, fill=True)
-        pdf.cell(ancho_fecha, alto_celda, "Fecha", border=1, fill=True)
-        pdf.cell(ancho_adh, alto_celda, "Adh.", border=1, fill=True, ln=True)
-        
-        # Filas de reclamos
+        for titulo, ancho in self.COLUMNAS:
+            pdf.cell(ancho, self.ALTO_CELDA, titulo, border=1, fill=True)
+        pdf.ln(self.ALTO_CELDA)
         pdf.set_font("Helvetica", '', 8) # Letra más chica para los datos
-        
-        for reclamo in lista_reclamos:
-            # Codificar texto a 'latin-1' para fpdf
-            contenido = reclamo.contenido.encode('latin-1', 'replace').decode('latin-1')
-            creador = reclamo.usuario_creador.nombre_usuario.encode('latin-1', 'replace').decode('latin-1')
-            estado = reclamo.estado.encode('latin-1', 'replace').decode('latin-1')
-            fecha = reclamo.timestamp.strftime('%Y-%m-%d') if reclamo.timestamp else 'N/A'
-            
-            # Guardamos la posición Y actual
-            y_inicial_fila = pdf.get_y()
-            
-            # Celda ID (altura fija)
-            pdf.cell(ancho_id, alto_celda, str(reclamo.id_reclamo), border='LR')
-            
-            # Celda Estado (altura fija)
-            x_actual = pdf.get_x()
-            pdf.cell(ancho_estado, alto_celda, estado, border='R')
-            
-            # Celda Contenido (altura variable)
-            x_actual += ancho_estado
-            pdf.multi_cell(ancho_contenido, alto_celda, contenido, border='R')
-            
-            # Guardamos la altura máxima que alcanzó la celda de contenido
-            y_final_fila = pdf.get_y()
-            altura_fila_real = y_final_fila - y_inicial_fila
-            
-            # Volvemos al inicio de la fila (en Y) y dibujamos las celdas restantes
-            # con la altura calculada
-            pdf.set_xy(x_actual + ancho_contenido, y_inicial_fila)
-            
-            pdf.cell(ancho_creador, altura_fila_real, creador, border='R')
-            pdf.cell(ancho_fecha, altura_fila_real, fecha, border='R')
-            pdf.cell(ancho_adh, altura_fila_real, str(reclamo.numero_adherentes), border='R', ln=True)
-            
-            # Dibujar la línea inferior de la fila
-            pdf.cell(ancho_celda, 0, '', border='T', ln=True)
-            
-        # Guardar el archivo PDF
-        try:
-            pdf.output(ruta_completa)
-            return ruta_completa # Devolvemos la ruta al archivo creado
-        except Exception as e:
-            return f"Error al crear PDF: {e}"
\ No newline at end of file
+
+    def __dibujar_fila(self, pdf: FPDF, reclamo: Reclamo, anchos_palabras: Dict[str, float]):
+        # Codificar texto a 'latin-1' para fpdf
+        fecha = reclamo.timestamp.strftime('%Y-%m-%d') if reclamo.timestamp else 'N/A'
+        valores = [str(reclamo.id_reclamo), _a_latin1(reclamo.estado), None,
+                   _a_latin1(reclamo.usuario_creador.nombre_usuario), fecha, str(reclamo.numero_adherentes)]
+        ancho_contenido = self.COLUMNAS[2][1]
+
+        # Partimos el contenido en renglones antes de dibujar: con eso sabemos la altura de la fila
+        renglones = _partir_en_renglones(_a_latin1(reclamo.contenido), ancho_contenido - 2 * pdf.c_margin,
+                                         lambda palabra: _ancho_palabra(pdf, palabra, anchos_palabras))
+        altura_fila = max(len(renglones), 1) * self.ALTO_CELDA
+
+        # Si la fila no entra en lo que queda de la página, pasa entera a la siguiente
+        if pdf.will_page_break(altura_fila):
+            pdf.add_page()
+            self.__encabezado_tabla(pdf)
+
+        # Con el tamaño de cada celda ya conocido se dibujan rectángulos y textos sueltos,
+        # mucho más baratos que cell/multi_cell (que vuelven a medir y a partir el texto)
+        x = pdf.l_margin
+        y = pdf.get_y()
+        desplazamiento_linea_base = 0.5 * self.ALTO_CELDA + 0.3 * pdf.font_size # Como lo centra cell()
+        for (_, ancho), valor in zip(self.COLUMNAS, valores):
+            pdf.rect(x, y, ancho, altura_fila)
+            if valor is None:
+                for numero_renglon, renglon in enumerate(renglones):
+                    pdf.text(x + pdf.c_margin, y + numero_renglon * self.ALTO_CELDA + desplazamiento_linea_base, renglon)
+            elif valor:
+                pdf.text(x + pdf.c_margin, y + 0.5 * altura_fila + 0.3 * pdf.font_size, valor)
+            x += ancho
+        pdf.set_xy(pdf.l_margin, y + altura_fila)
+
+
+def _ancho_palabra(pdf: FPDF, palabra: str, anchos_palabras: Dict[str, float]) -> float:
+    """Ancho de una palabra con la fuente actual, guardándolo en 'anchos_palabras' (se repiten mucho)."""
+    ancho = anchos_palabras.get(palabra)
+    if ancho is None:
+        ancho = anchos_palabras[palabra] = pdf.get_string_width(palabra)
+    return ancho
+
+
+def _partir_en_renglones(texto: str, ancho_maximo: float, ancho_de) -> List[str]:
+    """
+    Corta el texto en renglones de a lo sumo 'ancho_maximo' (cortando entre palabras, y
+    dentro de la palabra sólo si no entra sola). 'ancho_de' mide una palabra.
+    Mide cada palabra una vez: el corte de multi_cell vuelve a medir el renglón entero con
+    cada caracter que agrega, y en reportes de miles de filas es lo que más tarda.
+    """
+    ancho_espacio = ancho_de(" ")
+    renglones = []
+    for parrafo in texto.split("\n"):
+        actual, ancho_actual = [], 0.0
+        for palabra in parrafo.split():
+            ancho = ancho_de(palabra)
+            if ancho > ancho_maximo:
+                # Palabra más larga que la columna: se corta por caracteres
+                if actual:
+                    renglones.append(" ".join(actual))
+                    actual, ancho_actual = [], 0.0
+                pedazo = ""
+                for caracter in palabra:
+                    if pedazo and ancho_de(pedazo + caracter) > ancho_maximo:
+                        renglones.append(pedazo)
+                        pedazo = ""
+                    pedazo += caracter
+                actual, ancho_actual = [pedazo], ancho_de(pedazo)
+                continue
+            nuevo_ancho = ancho_actual + ancho_espacio + ancho if actual else ancho
+            if nuevo_ancho > ancho_maximo:
+                renglones.append(" ".join(actual))
+                actual, nuevo_ancho = [], ancho
+            actual.append(palabra)
+            ancho_actual = nuevo_ancho
+        renglones.append(" ".join(actual))
+    return renglones
@@ -34,8 +34,10 @@ class UsuarioLogin(UserMixin):
 class GestorDeLogin:
     """
     Clase que gestiona la sesión de usuario usando Flask-Login.
+    El repositorio de usuarios se puede asignar después (ver asignar_repositorio), así el
+    gestor y sus decoradores existen antes de abrir la BD.
     """
-    def __init__(self, login_manager: LoginManager, repo_usuarios):
+    def __init__(self, login_manager: LoginManager, repo_usuarios=None):
         self.__login_manager = login_manager
         self.__repo_usuarios = repo_usuarios
         
@@ -61,6 +63,10 @@ class GestorDeLogin:
             else:
                 return None
 
+    def asignar_repositorio(self, repo_usuarios):
+        """Asigna el repositorio con el que se cargan los usuarios de la sesión."""
+        self.__repo_usuarios = repo_usuarios
+
     @property
     def usuario_actual(self) -> UsuarioLogin | None:
         """Devuelve el objeto UsuarioLogin del usuario conectado."""
@@ -1,15 +1,37 @@
-import matplotlib.pyplot as plt
 import os
-import io 
+import io
+import json
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+from matplotlib.figure import Figure
 from wordcloud import WordCloud 
 
+# Se incluye en la huella de cada gráfico: subirla invalida los gráficos ya guardados
+# (por ejemplo, si se cambian los colores o el tamaño)
+VERSION_GRAFICOS = 2
+# Límites de cada carpeta de gráficos: al superarlos se borran los menos usados
+MAXIMO_ARCHIVOS_GRAFICOS = 200
+MAXIMO_BYTES_GRAFICOS = 50 * 1024 * 1024
+# Formatos en los que se pueden pedir los gráficos en memoria, con su tipo MIME
+FORMATOS_GRAFICOS = {"png": "image/png", "svg": "image/svg+xml"}
+
 class Graficador:
+    """
+    Dibuja los gráficos con la API orientada a objetos de Matplotlib (Figure), sin pyplot:
+    no hay estado global, así que se puede usar desde varios hilos o en un proceso aparte
+    (ver RenderizadorGraficos).
+    """
     
     @staticmethod
-    def generar_grafico_estados(stats_porcentaje: dict[str, float], ruta_guardado_completa: str):
+    def generar_grafico_estados(stats_porcentaje: dict[str, float], ruta_guardado_completa, formato: Optional[str] = None):
         """
         Genera un gráfico circular de estados de reclamos y lo guarda.
         stats_porcentaje debe contener 'pendientes', 'en_proceso', 'resueltos' (en porcentaje).
+        ruta_guardado_completa también puede ser un archivo en memoria (io.BytesIO); en ese
+        caso hay que indicar el formato ("png" o "svg"). Ver grafico_en_memoria.
         """
         
         # 1. Preparar datos
@@ -34,10 +56,12 @@ class Graficador:
         labels, sizes, colors, explode = zip(*data) # Desempaquetar los datos filtrados
 
         # 2. Crear carpetas si no existen
-        os.makedirs(os.path.dirname(ruta_guardado_completa), exist_ok=True)
+        if isinstance(ruta_guardado_completa, str):
+            os.makedirs(os.path.dirname(ruta_guardado_completa), exist_ok=True)
 
-        # 3. Crear el gráfico
-        fig1, ax1 = plt.subplots(figsize=(6, 6)) # Se crea la figura AHORA
+        # 3. Crear el gráfico (la figura no queda registrada en pyplot, así que no hay que cerrarla)
+        fig1 = Figure(figsize=(6, 6))
+        ax1 = fig1.subplots()
         
         try:
             # Crear el gráfico circular 
@@ -58,21 +82,20 @@ class Graficador:
             ax1.axis('equal')  
 
             # 4. Guardar la figura
-            plt.savefig(ruta_guardado_completa, bbox_inches='tight', dpi=100)
+            opciones_formato = {"format": formato} if formato else {}
+            fig1.savefig(ruta_guardado_completa, bbox_inches='tight', dpi=100, **opciones_formato)
             return ruta_guardado_completa # Devolvemos la ruta en caso de éxito
             
         except Exception as e:
             print(f"Error al guardar gráfico de estados: {e}")
             return None
-        finally:
-            # Cerrar la figura SIEMPRE que se haya abierto
-            plt.close(fig1) 
     
     @staticmethod
-    def generar_wordcloud(stats_palabras: list[tuple[str, int]], ruta_guardado_completa: str):
+    def generar_wordcloud(stats_palabras: list[tuple[str, int]], ruta_guardado_completa, formato: Optional[str] = None):
         """
         Genera una nube de palabras a partir de las frecuencias y la guarda.
         stats_palabras es una lista de tuplas (palabra, frecuencia).
+        Igual que generar_grafico_estados, acepta un archivo en memoria y un formato.
         """
         if not stats_palabras:
             return None
@@ -81,32 +104,295 @@ class Graficador:
         frecuencias = dict(stats_palabras) 
 
         # 1. Crear carpetas si no existen
-        os.makedirs(os.path.dirname(ruta_guardado_completa), exist_ok=True)
-
-        # 2. Configurar y generar la nube de palabras
-        wordcloud = WordCloud(
-            width=800, 
-            height=400, 
-            background_color='white', 
-            collocations=False, 
-            colormap='viridis', 
-            max_words=100 
-        ).generate_from_frequencies(frecuencias) 
-
-        # 3. Visualizar y guardar la imagen (usando Matplotlib)
-        # Se genera la figura ANTES del bloque try
-        fig = plt.figure(figsize=(8, 4), facecolor=None)
-        
+        if isinstance(ruta_guardado_completa, str):
+            os.makedirs(os.path.dirname(ruta_guardado_completa), exist_ok=True)
+
         try:
-            plt.imshow(wordcloud, interpolation='bilinear') 
-            plt.axis("off") 
-            plt.tight_layout(pad=0)
+            # 2. Configurar y generar la nube de palabras
+            wordcloud = WordCloud(
+                width=800, 
+                height=400, 
+                background_color='white', 
+                collocations=False, 
+                colormap='viridis', 
+                max_words=100 
+            ).generate_from_frequencies(frecuencias) 
 
-            plt.savefig(ruta_guardado_completa, dpi=100)
+            # 3. Guardar la imagen (800x400, sin pasar por Matplotlib)
+            if formato == "svg":
+                contenido_svg = wordcloud.to_svg().encode("utf-8")
+                if isinstance(ruta_guardado_completa, str):
+                    with open(ruta_guardado_completa, "wb") as archivo:
+                        archivo.write(contenido_svg)
+                else:
+                    ruta_guardado_completa.write(contenido_svg)
+            elif isinstance(ruta_guardado_completa, str):
+                wordcloud.to_file(ruta_guardado_completa)
+            else:
+                wordcloud.to_image().save(ruta_guardado_completa, format="PNG")
             return ruta_guardado_completa 
             
         except Exception as e:
             print(f"Error al guardar Word Cloud: {e}")
             return None
+
+
+def datos_grafico_estados(stats_porcentaje: dict[str, float]) -> dict[str, float]:
+    """Sólo los valores que usa el gráfico de estados (los demás no deben cambiar su huella)."""
+    return {clave: stats_porcentaje.get(clave, 0) for clave in ("total", "pendientes", "en_proceso", "resueltos")}
+
+
+def datos_wordcloud(stats_palabras: list[tuple[str, int]]) -> list[list]:
+    return [list(par) for par in stats_palabras]
+
+
+# Por cada tipo de gráfico: cómo extraer sus datos, si hay algo para dibujar y qué método
+# de Graficador lo dibuja
+GRAFICOS = {
+    "estados": (datos_grafico_estados, lambda datos: any(datos[clave] > 0 for clave in ("pendientes", "en_proceso", "resueltos")),
+                "generar_grafico_estados"),
+    "wordcloud": (datos_wordcloud, bool, "generar_wordcloud"),
+}
+
+
+def grafico_en_memoria(tipo: str, datos, formato: str = "png") -> Optional[bytes]:
+    """
+    Dibuja el gráfico 'tipo' (con datos ya extraídos) y devuelve el PNG o SVG como bytes, sin
+    tocar el disco. Es una función de módulo para poder enviarla a otro proceso.
+    """
+    if formato not in FORMATOS_GRAFICOS:
+        raise ValueError(f"El formato '{formato}' no es válido. Opciones: {', '.join(FORMATOS_GRAFICOS)}.")
+    destino = io.BytesIO()
+    if getattr(Graficador, GRAFICOS[tipo][2])(datos, destino, formato) is None:
+        return None
+    return destino.getvalue()
+
+
+def huella_grafico(tipo: str, datos) -> str:
+    """Hash de los datos de un gráfico: mismos datos, misma huella (y mismo archivo)."""
+    contenido = json.dumps([VERSION_GRAFICOS, tipo, datos], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:32]
+
+
+class CacheGraficos:
+    """
+    Guarda los gráficos en 'carpeta' con un nombre que sale de sus datos (tipo_huella.png).
+    Si se pide un gráfico con los mismos datos, se devuelve el archivo que ya existe en lugar
+    de volver a dibujarlo. Cuando la carpeta supera 'maximo_archivos' o 'maximo_bytes' se
+    borran los PNG usados hace más tiempo (cada uso actualiza la fecha de modificación).
+    Las referencias que devuelve son las rutas de los archivos.
+    """
+    formato = "png"
+
+    def __init__(self, carpeta: str, maximo_archivos: int = MAXIMO_ARCHIVOS_GRAFICOS,
+                 maximo_bytes: int = MAXIMO_BYTES_GRAFICOS):
+        if maximo_archivos < 1 or maximo_bytes < 1:
+            raise ValueError("Los límites de la cache de gráficos deben ser positivos.")
+        self.__carpeta = carpeta
+        self.__maximo_archivos = maximo_archivos
+        self.__maximo_bytes = maximo_bytes
+        self.__lock = threading.Lock()
+        self.__aciertos = 0
+        self.__fallos = 0
+
+    @property
+    def carpeta(self) -> str:
+        return self.__carpeta
+
+    def ruta_para(self, tipo: str, datos) -> str:
+        return os.path.join(self.__carpeta, f"{tipo}_{huella_grafico(tipo, datos)}.png")
+
+    def referencia(self, tipo: str, datos) -> str:
+        return self.ruta_para(tipo, datos)
+
+    def referencia_de_nombre(self, nombre: str) -> str:
+        """Referencia a partir del nombre del archivo (el que aparece en las URLs)."""
+        return os.path.join(self.__carpeta, nombre)
+
+    def existe(self, referencia: str) -> bool:
+        return os.path.exists(referencia)
+
+    def buscar(self, tipo: str, datos) -> Optional[str]:
+        """Devuelve la ruta del gráfico si ya está guardado (y lo marca como recién usado), o None."""
+        ruta = self.ruta_para(tipo, datos)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            with self.__lock:
+                self.__fallos += 1
+            return None
+        with self.__lock:
+            self.__aciertos += 1
+        return ruta
+
+    def guardar(self, tipo: str, datos, contenido: bytes) -> str:
+        """
+        Escribe el gráfico recién dibujado y aplica los límites de la carpeta. Se escribe en un
+        archivo temporal que después se renombra, así nadie lee un PNG a medio escribir (los
+        temporales empiezan con "." para que el desalojo no los toque).
+        """
+        ruta = self.ruta_para(tipo, datos)
+        os.makedirs(self.__carpeta, exist_ok=True)
+        ruta_temporal = os.path.join(self.__carpeta, f".{uuid.uuid4().hex}.png")
+        try:
+            with open(ruta_temporal, "wb") as archivo:
+                archivo.write(contenido)
+            os.replace(ruta_temporal, ruta)
         finally:
-            plt.close(fig) # Cerrar la figura de la nube de palabras
\ No newline at end of file
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+        with self.__lock:
+            self.__desalojar(conservar=ruta)
+        return ruta
+
+    def obtener_contenido(self, referencia: str) -> Optional[bytes]:
+        try:
+            with open(referencia, "rb") as archivo:
+                return archivo.read()
+        except FileNotFoundError:
+            return None
+
+    def obtener_o_generar(self, tipo: str, datos, generar: Callable[[], Optional[bytes]]) -> Optional[str]:
+        """
+        Devuelve la ruta del gráfico de 'datos'. Si no existe, llama a generar() para que lo
+        dibuje en este mismo hilo. Devuelve None si 'generar' no produjo el gráfico.
+        """
+        ruta = self.buscar(tipo, datos)
+        if ruta is not None:
+            return ruta
+        contenido = generar()
+        if contenido is None:
+            return None
+        return self.guardar(tipo, datos, contenido)
+
+    def grafico(self, tipo: str, stats) -> Optional[str]:
+        """Dibuja (o reutiliza) el gráfico 'tipo' de GRAFICOS para las estadísticas recibidas."""
+        extraer_datos, hay_datos, _ = GRAFICOS[tipo]
+        datos = extraer_datos(stats)
+        if not hay_datos(datos):
+            return None
+        return self.obtener_o_generar(tipo, datos, lambda: grafico_en_memoria(tipo, datos, self.formato))
+
+    def grafico_estados(self, stats_porcentaje: dict[str, float]) -> Optional[str]:
+        """Graficador.generar_grafico_estados, reutilizando el PNG si los números no cambiaron."""
+        return self.grafico("estados", stats_porcentaje)
+
+    def wordcloud(self, stats_palabras: list[tuple[str, int]]) -> Optional[str]:
+        """Graficador.generar_wordcloud, reutilizando el PNG si las frecuencias no cambiaron."""
+        return self.grafico("wordcloud", stats_palabras)
+
+    def estadisticas(self) -> dict[str, int]:
+        with self.__lock:
+            return {"aciertos": self.__aciertos, "fallos": self.__fallos}
+
+    def __desalojar(self, conservar: str):
+        archivos = []
+        for entrada in os.scandir(self.__carpeta):
+            if entrada.is_file() and entrada.name.endswith(".png") and not entrada.name.startswith("."):
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue # Otro proceso lo borró
+                archivos.append((info.st_mtime, info.st_size, entrada.path))
+        archivos.sort() # Los usados hace más tiempo primero
+        total_bytes = sum(tamano for _, tamano, _ in archivos)
+        cantidad = len(archivos)
+        for _, tamano, ruta in archivos:
+            if cantidad <= self.__maximo_archivos and total_bytes <= self.__maximo_bytes:
+                break
+            if os.path.abspath(ruta) == os.path.abspath(conservar):
+                continue # Nunca borramos el que estamos por devolver
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            cantidad -= 1
+            total_bytes -= tamano
+
+
+class CacheGraficosMemoria:
+    """
+    Igual que CacheGraficos pero en memoria: guarda los bytes de cada gráfico (PNG o SVG)
+    con el nombre tipo_huella.formato como referencia, y no escribe nada en el disco (sirve
+    con un sistema de archivos de sólo lectura). Al superar 'maximo_bytes' descarta los
+    gráficos usados hace más tiempo.
+    """
+    def __init__(self, maximo_bytes: int = MAXIMO_BYTES_GRAFICOS, formato: str = "png"):
+        if maximo_bytes < 1:
+            raise ValueError("Los límites de la cache de gráficos deben ser positivos.")
+        if formato not in FORMATOS_GRAFICOS:
+            raise ValueError(f"El formato '{formato}' no es válido. Opciones: {', '.join(FORMATOS_GRAFICOS)}.")
+        self.formato = formato
+        self.__maximo_bytes = maximo_bytes
+        self.__graficos = OrderedDict() # nombre -> bytes, del menos al más recientemente usado
+        self.__total_bytes = 0
+        self.__lock = threading.Lock()
+        self.__aciertos = 0
+        self.__fallos = 0
+
+    @property
+    def tipo_mime(self) -> str:
+        return FORMATOS_GRAFICOS[self.formato]
+
+    def referencia(self, tipo: str, datos) -> str:
+        return f"{tipo}_{huella_grafico(tipo, datos)}.{self.formato}"
+
+    def referencia_de_nombre(self, nombre: str) -> str:
+        return nombre
+
+    def existe(self, referencia: str) -> bool:
+        with self.__lock:
+            return referencia in self.__graficos
+
+    def buscar(self, tipo: str, datos) -> Optional[str]:
+        nombre = self.referencia(tipo, datos)
+        with self.__lock:
+            if nombre not in self.__graficos:
+                self.__fallos += 1
+                return None
+            self.__graficos.move_to_end(nombre)
+            self.__aciertos += 1
+        return nombre
+
+    def guardar(self, tipo: str, datos, contenido: bytes) -> str:
+        nombre = self.referencia(tipo, datos)
+        with self.__lock:
+            anterior = self.__graficos.pop(nombre, None)
+            if anterior is not None:
+                self.__total_bytes -= len(anterior)
+            self.__graficos[nombre] = contenido
+            self.__total_bytes += len(contenido)
+            # Descartamos los menos usados, pero nunca el que se acaba de guardar
+            while self.__total_bytes > self.__maximo_bytes and len(self.__graficos) > 1:
+                _, descartado = self.__graficos.popitem(last=False)
+                self.__total_bytes -= len(descartado)
+        return nombre
+
+    def obtener_contenido(self, referencia: str) -> Optional[bytes]:
+        with self.__lock:
+            contenido = self.__graficos.get(referencia)
+            if contenido is not None:
+                self.__graficos.move_to_end(referencia)
+            return contenido
+
+    def obtener_o_generar(self, tipo: str, datos, generar: Callable[[], Optional[bytes]]) -> Optional[str]:
+        nombre = self.buscar(tipo, datos)
+        if nombre is not None:
+            return nombre
+        contenido = generar()
+        if contenido is None:
+            return None
+        return self.guardar(tipo, datos, contenido)
+
+    def grafico(self, tipo: str, stats) -> Optional[bytes]:
+        """Los bytes del gráfico 'tipo' para las estadísticas recibidas (dibujándolo si hace falta)."""
+        extraer_datos, hay_datos, _ = GRAFICOS[tipo]
+        datos = extraer_datos(stats)
+        if not hay_datos(datos):
+            return None
+        nombre = self.obtener_o_generar(tipo, datos, lambda: grafico_en_memoria(tipo, datos, self.formato))
+        return None if nombre is None else self.obtener_contenido(nombre)
+
+    def estadisticas(self) -> dict[str, int]:
+        with self.__lock:
+            return {"aciertos": self.__aciertos, "fallos": self.__fallos, "bytes": self.__total_bytes}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import declarative_base, relationship # relationship para definir relaciones
 
 # Paso 1: Crear una 'Base' declarativa. Todas nuestras tablas heredarán de ella.
@@ -6,7 +6,10 @@ Base = declarative_base()
 
 asociacion_reclamos_adherentes = Table('reclamos_adherentes', Base.metadata,
     Column('usuario_id', Integer, ForeignKey('usuarios.id'), primary_key=True),
-    Column('reclamo_id', Integer, ForeignKey('reclamos.id'), primary_key=True)
+    Column('reclamo_id', Integer, ForeignKey('reclamos.id'), primary_key=True),
+    # La clave primaria empieza por usuario_id, así que buscar los adherentes de un reclamo
+    # recorría toda la tabla. Este índice cubre la búsqueda por reclamo_id.
+    Index('ix_reclamos_adherentes_reclamo', 'reclamo_id', 'usuario_id')
 )
 
 # Paso 2: Definir el modelo para la tabla de Usuarios.
@@ -44,6 +47,16 @@ class ModeloUsuario(Base):
 class ModeloReclamo(Base):
     __tablename__ = 'reclamos' # Nombre de la tabla en la BD
 
+    # Índices compuestos según cómo se listan los reclamos (ver sistema.py y server.py):
+    # por departamento y estado, sólo por estado, o por usuario creador. Todos terminan en
+    # (estado, timestamp) para que SQLite devuelva las páginas ya ordenadas sin ordenar en memoria
+    # (el id viene implícito en cada entrada del índice).
+    __table_args__ = (
+        Index('ix_reclamos_departamento_estado_timestamp', 'departamento', 'estado', 'timestamp'),
+        Index('ix_reclamos_estado_timestamp', 'estado', 'timestamp'),
+        Index('ix_reclamos_creador_estado_timestamp', 'id_usuario_creador', 'estado', 'timestamp'),
+    )
+
     id = Column(Integer, primary_key=True)
     contenido = Column(String(1000), nullable=False)
     departamento = Column(String(100), nullable=False)
@@ -61,4 +74,33 @@ class ModeloReclamo(Base):
         "ModeloUsuario",
         secondary=asociacion_reclamos_adherentes,
         back_populates="reclamos_adheridos"
-    )
\ No newline at end of file
+    )
+
+# Paso 4: Trabajos de generación de reportes (ver cola_reportes.py)
+class ModeloTrabajoReporte(Base):
+    __tablename__ = 'trabajos_reportes'
+
+    # Los pedidos iguales se buscan por (rol, departamento, formato, version_datos)
+    __table_args__ = (
+        Index('ix_trabajos_reportes_pedido', 'rol', 'departamento', 'formato', 'version_datos'),
+    )
+
+    id = Column(String(32), primary_key=True) # uuid4 en hexadecimal: no se puede adivinar el de otro
+    rol = Column(String(20), nullable=False)
+    departamento = Column(String(100), nullable=True) # None = todos los departamentos
+    formato = Column(String(10), nullable=False)
+    version_datos = Column(String(64), nullable=False)
+    estado = Column(String(20), nullable=False)
+    ruta_archivo = Column(String(255), nullable=True) # Se completa al terminar
+    mensaje_error = Column(String(1000), nullable=True)
+    creado = Column(DateTime, nullable=False)
+    terminado = Column(DateTime, nullable=True)
+    propietario = Column(String(100), nullable=True) # "equipo:pid" del proceso que lo genera
+
+# Paso 5: Versión de los datos de los reclamos (una sola fila). Los triggers que crea
+# RepositorioReclamosSQLAlchemy suman 1 con cada cambio en reclamos o en sus adherentes.
+class ModeloVersionDatos(Base):
+    __tablename__ = 'version_datos'
+
+    id = Column(Integer, primary_key=True) # Siempre 1
+    cambios = Column(Integer, nullable=False, default=0)
@@ -1,3 +1,4 @@
+import heapq
 from abc import ABC, abstractmethod 
 
 class MonticuloBinario(ABC):
@@ -46,6 +47,20 @@ class MonticuloBinario(ABC):
             else:
                 return hijo_der_idx
 
+    @classmethod
+    def desde_lista(cls, valores):
+        """
+        Construye un montículo con todos los valores de una vez, en O(n): los copia tal cual
+        y hace infiltrar hacia abajo a cada nodo interno, desde el último hasta la raíz.
+        Insertarlos de a uno costaría O(n log n).
+        """
+        monticulo = cls()
+        monticulo.__lista_monticulo = [0] + list(valores)
+        monticulo.__tamano_actual = len(monticulo.__lista_monticulo) - 1
+        for i in range(monticulo.__tamano_actual // 2, 0, -1):
+            monticulo.__infiltrar_abajo(i)
+        return monticulo
+
     def insertar(self, valor):
         self.__lista_monticulo.append(valor)
         self.__tamano_actual += 1
@@ -80,4 +95,208 @@ class MonticuloMinimos(MonticuloBinario):
 class MonticuloMaximos(MonticuloBinario):
     def _comparar(self, a, b) -> bool:
         # La raíz es el MÁXIMO
-        return a > b
\ No newline at end of file
+        return a > b
+
+
+class MonticuloHeapq(ABC):
+    """
+    Misma interfaz que MonticuloBinario, pero las operaciones las hace el módulo heapq
+    (escrito en C) sobre una lista común, sin una llamada a _comparar por comparación.
+    heapq sólo arma montículos de mínimos: las subclases definen cómo se guarda cada
+    valor (_a_clave) y cómo se recupera (_a_valor).
+    """
+    def __init__(self):
+        self.__claves = []
+
+    @abstractmethod
+    def _a_clave(self, valor):
+        pass
+
+    @abstractmethod
+    def _a_valor(self, clave):
+        pass
+
+    @classmethod
+    def desde_lista(cls, valores):
+        """Construye el montículo en O(n) con heapq.heapify."""
+        monticulo = cls()
+        monticulo.__claves = [monticulo._a_clave(valor) for valor in valores]
+        heapq.heapify(monticulo.__claves)
+        return monticulo
+
+    def insertar(self, valor):
+        heapq.heappush(self.__claves, self._a_clave(valor))
+
+    def eliminar_raiz(self):
+        if self.esta_vacio():
+            return None
+        return self._a_valor(heapq.heappop(self.__claves))
+
+    def obtener_raiz(self):
+        return self._a_valor(self.__claves[0]) if not self.esta_vacio() else None
+
+    def tamano(self) -> int:
+        return len(self.__claves)
+
+    def esta_vacio(self) -> bool:
+        return not self.__claves
+
+
+class MonticuloMinimosRapido(MonticuloHeapq):
+    """Montículo de mínimos sobre heapq: acepta cualquier valor comparable."""
+    def _a_clave(self, valor):
+        return valor
+
+    def _a_valor(self, clave):
+        return clave
+
+
+class MonticuloMaximosRapido(MonticuloHeapq):
+    """
+    Montículo de máximos sobre heapq: guarda los valores con el signo cambiado, así que
+    el mínimo guardado es el máximo real. Sólo acepta números.
+    """
+    def _a_clave(self, valor):
+        return -valor
+
+    def _a_valor(self, clave):
+        return -clave
+
+
+class MonticuloIndexado(ABC):
+    """
+    Montículo de elementos (clave, prioridad) que además sabe en qué posición está cada
+    clave (por ejemplo, un id_reclamo). Eso permite cambiar la prioridad de un elemento
+    o quitarlo en O(log n), sin buscarlo recorriendo la lista.
+    Cada clave aparece a lo sumo una vez.
+    """
+    def __init__(self):
+        self.__elementos = [] # Lista de [clave, prioridad]; la raíz es el índice 0
+        self.__posiciones = {} # clave -> índice en __elementos
+
+    @abstractmethod
+    def _comparar(self, a, b) -> bool:
+        """True si la prioridad a debe quedar más arriba que la prioridad b."""
+        pass
+
+    def __intercambiar(self, i: int, j: int):
+        self.__elementos[i], self.__elementos[j] = self.__elementos[j], self.__elementos[i]
+        self.__posiciones[self.__elementos[i][0]] = i
+        self.__posiciones[self.__elementos[j][0]] = j
+
+    def __infiltrar_arriba(self, i: int):
+        while i > 0:
+            padre_idx = (i - 1) // 2
+            if not self._comparar(self.__elementos[i][1], self.__elementos[padre_idx][1]):
+                break
+            self.__intercambiar(i, padre_idx)
+            i = padre_idx
+
+    def __infiltrar_abajo(self, i: int):
+        tamano = len(self.__elementos)
+        while 2 * i + 1 < tamano:
+            hijo_idx = 2 * i + 1
+            if hijo_idx + 1 < tamano and self._comparar(self.__elementos[hijo_idx + 1][1], self.__elementos[hijo_idx][1]):
+                hijo_idx += 1
+            if not self._comparar(self.__elementos[hijo_idx][1], self.__elementos[i][1]):
+                break
+            self.__intercambiar(i, hijo_idx)
+            i = hijo_idx
+
+    @classmethod
+    def desde_pares(cls, pares):
+        """Construye el montículo en O(n) a partir de pares (clave, prioridad) con claves distintas."""
+        monticulo = cls()
+        for clave, prioridad in pares:
+            if clave in monticulo.__posiciones:
+                raise ValueError(f"La clave {clave} está repetida.")
+            monticulo.__posiciones[clave] = len(monticulo.__elementos)
+            monticulo.__elementos.append([clave, prioridad])
+        for i in range(len(monticulo.__elementos) // 2 - 1, -1, -1):
+            monticulo.__infiltrar_abajo(i)
+        return monticulo
+
+    def insertar(self, clave, prioridad):
+        if clave in self.__posiciones:
+            raise ValueError(f"La clave {clave} ya está en el montículo.")
+        self.__elementos.append([clave, prioridad])
+        self.__posiciones[clave] = len(self.__elementos) - 1
+        self.__infiltrar_arriba(len(self.__elementos) - 1)
+
+    def actualizar_prioridad(self, clave, prioridad):
+        """Cambia la prioridad de una clave que ya está en el montículo."""
+        if clave not in self.__posiciones:
+            raise KeyError(clave)
+        i = self.__posiciones[clave]
+        self.__elementos[i][1] = prioridad
+        self.__infiltrar_arriba(i)
+        self.__infiltrar_abajo(self.__posiciones[clave])
+
+    def eliminar(self, clave):
+        """Quita la clave del montículo y devuelve su prioridad."""
+        if clave not in self.__posiciones:
+            raise KeyError(clave)
+        i = self.__posiciones[clave]
+        ultimo = len(self.__elementos) - 1
+        if i != ultimo:
+            self.__intercambiar(i, ultimo)
+        _, prioridad = self.__elementos.pop()
+        del self.__posiciones[clave]
+        if i < len(self.__elementos):
+            # El que ocupó su lugar puede tener que subir o bajar
+            movido = self.__elementos[i][0]
+            self.__infiltrar_arriba(i)
+            self.__infiltrar_abajo(self.__posiciones[movido])
+        return prioridad
+
+    def eliminar_raiz(self):
+        """Quita y devuelve el par (clave, prioridad) de la raíz, o None si está vacío."""
+        if self.esta_vacio():
+            return None
+        clave = self.__elementos[0][0]
+        return clave, self.eliminar(clave)
+
+    def obtener_raiz(self):
+        """Devuelve el par (clave, prioridad) de la raíz, o None si está vacío."""
+        return tuple(self.__elementos[0]) if not self.esta_vacio() else None
+
+    def primeros(self, cantidad: int) -> list:
+        """
+        Devuelve los 'cantidad' pares de mayor prioridad, en orden, sin modificar el montículo.
+        Recorre el árbol con un montículo auxiliar de candidatos: O(cantidad log cantidad).
+        """
+        resultado = []
+        candidatos = type(self)()
+        if not self.esta_vacio():
+            candidatos.insertar(0, self.__elementos[0][1]) # Las claves auxiliares son índices
+        while not candidatos.esta_vacio() and len(resultado) < cantidad:
+            i, _ = candidatos.eliminar_raiz()
+            resultado.append(tuple(self.__elementos[i]))
+            for hijo_idx in (2 * i + 1, 2 * i + 2):
+                if hijo_idx < len(self.__elementos):
+                    candidatos.insertar(hijo_idx, self.__elementos[hijo_idx][1])
+        return resultado
+
+    def prioridad(self, clave):
+        return self.__elementos[self.__posiciones[clave]][1]
+
+    def __contains__(self, clave) -> bool:
+        return clave in self.__posiciones
+
+    def tamano(self) -> int:
+        return len(self.__elementos)
+
+    def esta_vacio(self) -> bool:
+        return not self.__elementos
+
+
+class MonticuloIndexadoMaximos(MonticuloIndexado):
+    def _comparar(self, a, b) -> bool:
+        # La raíz es la MAYOR prioridad
+        return a > b
+
+
+class MonticuloIndexadoMinimos(MonticuloIndexado):
+    def _comparar(self, a, b) -> bool:
+        # La raíz es la MENOR prioridad
+        return a < b
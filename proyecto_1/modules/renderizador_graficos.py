@@ -0,0 +1,136 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from modules.graficador import GRAFICOS, MAXIMO_ARCHIVOS_GRAFICOS, grafico_en_memoria
+
+# Estados de un gráfico pedido al renderizador
+LISTO = "listo"
+PENDIENTE = "pendiente"
+SIN_GRAFICO = "sin_grafico" # No había datos para dibujar, falló o nadie lo pidió
+
+# Cuántas referencias sin gráfico se recuerdan, como mucho (se olvidan las más viejas)
+MAXIMO_SIN_GRAFICO = MAXIMO_ARCHIVOS_GRAFICOS
+
+
+class RenderizadorGraficos:
+    """
+    Dibuja los gráficos fuera del pedido HTTP, en un pool de procesos. El pedido que necesita
+    un gráfico llama a solicitar(): si ya está en la cache recibe su referencia enseguida, y
+    si no, el dibujo se encola y el pedido sigue sin esperar (la página muestra un marcador y
+    consulta estado() hasta que el gráfico esté listo).
+    Sirve con CacheGraficos (archivos) y con CacheGraficosMemoria: el proceso devuelve los
+    bytes del gráfico y la cache los guarda, sin archivos temporales de por medio.
+    Los procesos se crean con "spawn": hacer fork de un servidor con varios hilos puede
+    dejar locks tomados en el hijo. Un mismo gráfico pedido varias veces mientras se dibuja
+    genera un solo trabajo.
+    'ejecutor' permite usar otro pool (por ejemplo, uno de hilos en las pruebas).
+    De los dibujos que no produjeron un gráfico se recuerdan los últimos 'maximo_sin_grafico':
+    olvidar uno no cambia su estado, porque tampoco está en la cache.
+    """
+    def __init__(self, cantidad_procesos: int = 1, ejecutor: Optional[Executor] = None,
+                 maximo_sin_grafico: int = MAXIMO_SIN_GRAFICO):
+        if ejecutor is None and cantidad_procesos < 1:
+            raise ValueError("La cantidad de procesos debe ser al menos 1.")
+        if maximo_sin_grafico < 1:
+            raise ValueError("La cantidad de referencias sin gráfico debe ser al menos 1.")
+        self.__cantidad_procesos = cantidad_procesos
+        self.__ejecutor = ejecutor # El pool de procesos se crea con el primer pedido
+        self.__lock = threading.Lock()
+        self.__pendientes = {} # referencia en la cache -> Event que se marca cuando el dibujo termina
+        self.__sin_grafico = OrderedDict() # referencias cuyo dibujo no produjo un gráfico, de la más vieja a la más nueva
+        self.__maximo_sin_grafico = maximo_sin_grafico
+
+    def __obtener_ejecutor(self) -> Executor:
+        with self.__lock:
+            if self.__ejecutor is None:
+                self.__ejecutor = ProcessPoolExecutor(self.__cantidad_procesos, mp_context=multiprocessing.get_context("spawn"))
+            return self.__ejecutor
+
+    def solicitar(self, cache, tipo: str, stats) -> Optional[tuple[str, bool]]:
+        """
+        Pide el gráfico 'tipo' (ver GRAFICOS) de las estadísticas recibidas.
+        Devuelve (referencia, listo): con listo=False el gráfico todavía no está en la cache y
+        se puede consultar con estado(). Devuelve None si no hay nada para dibujar.
+        """
+        extraer_datos, hay_datos, _ = GRAFICOS[tipo]
+        datos = extraer_datos(stats)
+        if not hay_datos(datos):
+            return None
+        referencia = cache.buscar(tipo, datos)
+        if referencia is not None:
+            return referencia, True
+
+        referencia = cache.referencia(tipo, datos)
+        with self.__lock:
+            nuevo = referencia not in self.__pendientes
+            if nuevo:
+                self.__sin_grafico.pop(referencia, None)
+                self.__pendientes[referencia] = threading.Event()
+        if nuevo:
+            # Fuera del lock: si el dibujo ya terminó, add_done_callback llama a __terminar en este hilo
+            try:
+                futuro = self.__obtener_ejecutor().submit(grafico_en_memoria, tipo, datos, cache.formato)
+            except Exception:
+                self.__finalizar(referencia, sin_grafico=True)
+                raise
+            futuro.add_done_callback(lambda f: self.__terminar(f, cache, tipo, datos, referencia))
+        return referencia, False
+
+    def obtener(self, cache, tipo: str, stats, timeout: Optional[float] = None) -> Optional[str]:
+        """Como solicitar, pero espera a que el gráfico esté listo. Devuelve su referencia o None."""
+        pedido = self.solicitar(cache, tipo, stats)
+        if pedido is None:
+            return None
+        referencia, listo = pedido
+        if not listo:
+            with self.__lock:
+                terminado = self.__pendientes.get(referencia)
+            # El Event se marca después de guardar el gráfico (el Future termina antes)
+            if terminado is not None and not terminado.wait(timeout):
+                return None
+        return referencia if cache.existe(referencia) else None
+
+    def obtener_contenido(self, cache, tipo: str, stats, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Como obtener, pero devuelve los bytes del gráfico (para incrustarlos en un reporte)."""
+        referencia = self.obtener(cache, tipo, stats, timeout)
+        return None if referencia is None else cache.obtener_contenido(referencia)
+
+    def estado(self, cache, referencia: str) -> str:
+        """LISTO, PENDIENTE o SIN_GRAFICO para una referencia devuelta por solicitar()."""
+        with self.__lock:
+            if referencia in self.__pendientes:
+                return PENDIENTE
+            if referencia in self.__sin_grafico:
+                return SIN_GRAFICO
+        return LISTO if cache.existe(referencia) else SIN_GRAFICO
+
+    def detener(self):
+        """Espera los dibujos en curso y cierra el pool."""
+        if self.__ejecutor is not None:
+            self.__ejecutor.shutdown(wait=True)
+
+    def __terminar(self, futuro, cache, tipo: str, datos, referencia: str):
+        # Se ejecuta en un hilo del proceso principal cuando el dibujo termina
+        sin_grafico = True
+        try:
+            if futuro.exception() is not None:
+                print(f"Error al dibujar el gráfico '{tipo}': {futuro.exception()}")
+            elif futuro.result() is not None:
+                cache.guardar(tipo, datos, futuro.result())
+                sin_grafico = False
+        finally:
+            self.__finalizar(referencia, sin_grafico)
+
+    def __finalizar(self, referencia: str, sin_grafico: bool):
+        with self.__lock:
+            terminado = self.__pendientes.pop(referencia, None)
+            if sin_grafico:
+                self.__sin_grafico[referencia] = True
+                self.__sin_grafico.move_to_end(referencia)
+                if len(self.__sin_grafico) > self.__maximo_sin_grafico:
+                    self.__sin_grafico.popitem(last=False)
+        if terminado is not None:
+            terminado.set()
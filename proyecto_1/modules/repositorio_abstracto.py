@@ -1,6 +1,74 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional # Mantenemos Optional y List para claridad
 
+# Cantidad de elementos por página cuando no se indica otra
+TAMANO_PAGINA_POR_DEFECTO = 50
+
+
+class PaginaResultados:
+    """
+    Resultado de una consulta paginada.
+    Contiene los elementos de la página y el cursor (opaco) para pedir la siguiente,
+    que es None cuando ya no quedan más elementos.
+    """
+    def __init__(self, elementos: list, cursor_siguiente: Optional[str] = None):
+        self.elementos = elementos
+        self.cursor_siguiente = cursor_siguiente
+
+    @property
+    def hay_siguiente(self) -> bool:
+        return self.cursor_siguiente is not None
+
+
+class Consulta:
+    """
+    Especificación de una consulta más rica que los filtros por igualdad (**kwargs).
+    Permite filtros IN, rangos, orden y límite/desplazamiento. Los métodos devuelven
+    la misma consulta para poder encadenarlos:
+
+        Consulta(departamento="maestranza").entre("timestamp", desde, hasta).ordenar_por("timestamp", descendente=True)
+
+    Cada repositorio concreto la traduce a su propio lenguaje de consulta (ej. SQL).
+    """
+    def __init__(self, **igualdades):
+        self.igualdades = dict(igualdades) # campo -> valor
+        self.valores_en = {} # campo -> lista de valores permitidos
+        self.rangos = {} # campo -> (desde, hasta), ambos inclusivos y opcionales
+        self.orden = [] # lista de (campo, descendente)
+        self.limite = None
+        self.desplazamiento = None
+
+    def donde(self, **igualdades):
+        """Agrega filtros por igualdad."""
+        self.igualdades.update(igualdades)
+        return self
+
+    def en(self, campo: str, valores):
+        """Filtra los elementos cuyo campo tenga alguno de los valores dados."""
+        self.valores_en[campo] = list(valores)
+        return self
+
+    def entre(self, campo: str, desde=None, hasta=None):
+        """Filtra por rango [desde, hasta]. Un extremo en None deja ese lado abierto."""
+        if desde is None and hasta is None:
+            raise ValueError("El rango debe tener al menos un extremo.")
+        self.rangos[campo] = (desde, hasta)
+        return self
+
+    def ordenar_por(self, campo: str, descendente: bool = False):
+        """Agrega un criterio de orden (se aplican en el orden en que se agregan)."""
+        self.orden.append((campo, descendente))
+        return self
+
+    def limitar(self, limite: int, desplazamiento: int = 0):
+        """Devuelve como máximo 'limite' elementos, salteando los primeros 'desplazamiento'."""
+        if limite < 0 or desplazamiento < 0:
+            raise ValueError("El límite y el desplazamiento no pueden ser negativos.")
+        self.limite = limite
+        self.desplazamiento = desplazamiento
+        return self
+
+
 class IRepositorio(ABC):
     """
     Interfaz abstracta para un Repositorio.
@@ -47,4 +115,35 @@ class IRepositorio(ABC):
         Obtiene todas las entidades que coinciden con los filtros especificados.
         Ejemplo: obtener_todos_por_filtro(estado="pendiente")
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def obtener_pagina_por_filtro(self, tamano_pagina: int = TAMANO_PAGINA_POR_DEFECTO, cursor: Optional[str] = None, **kwargs) -> PaginaResultados:
+        """
+        Obtiene una página de las entidades que coinciden con los filtros especificados.
+        'cursor' es el valor devuelto en la página anterior (None para la primera).
+        Es opcional: sólo lo implementan los repositorios que necesitan listar por partes.
+        Ejemplo: obtener_pagina_por_filtro(20, estado="pendiente")
+        """
+        raise NotImplementedError
+
+    def iterar_por_filtro(self, tamano_pagina: int = TAMANO_PAGINA_POR_DEFECTO, **kwargs):
+        """
+        Recorre todas las entidades que coinciden con los filtros pidiendo una página por vez
+        (con obtener_pagina_por_filtro), así nunca hay más de 'tamano_pagina' cargadas a la vez.
+        Ejemplo: for reclamo in iterar_por_filtro(500, departamento="maestranza"): ...
+        """
+        cursor = None
+        while True:
+            pagina = self.obtener_pagina_por_filtro(tamano_pagina, cursor, **kwargs)
+            yield from pagina.elementos
+            if not pagina.hay_siguiente:
+                return
+            cursor = pagina.cursor_siguiente
+
+    def obtener_por_consulta(self, consulta: Consulta) -> list:
+        """
+        Obtiene todas las entidades que cumplen una Consulta (filtros, orden y límite).
+        Es opcional, como la paginación.
+        Ejemplo: obtener_por_consulta(Consulta().en("estado", ["pendiente", "en proceso"]))
+        """
+        raise NotImplementedError
@@ -1,16 +1,21 @@
 # modules/repositorio_concreto.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_, func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 import datetime
+import base64
+import json
 
 # Cambiamos el nombre de la interfaz para que coincida con los ejemplos
 from modules.repositorio_abstracto import IRepositorio as RepositorioAbstracto
+from modules.repositorio_abstracto import PaginaResultados, Consulta, TAMANO_PAGINA_POR_DEFECTO
 # Importamos nuestras clases de dominio específicas
 from modules.usuario import Usuario
 from modules.reclamo import Reclamo
 from modules.roles import JefeDepartamento, SecretarioTecnico
+from modules.trabajo_reporte import TrabajoReporte
 # Importamos nuestros modelos de BD específicos y la Base
-from modules.modelos_db import ModeloUsuario, ModeloReclamo, Base
+from modules.modelos_db import ModeloUsuario, ModeloReclamo, ModeloTrabajoReporte, ModeloVersionDatos, Base, asociacion_reclamos_adherentes
 # Ya no necesitamos importar 'engine', usaremos el 'bind' de la sesión
 from typing import Optional, List # Usamos Optional/List para claridad en los retornos
 
@@ -182,6 +187,18 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
         self.__repo_usuarios = RepositorioUsuariosSQLAlchemy(session)
 
 
+    def obtener_version_datos(self) -> int:
+        """
+        Contador de cambios de los reclamos y sus adherentes (lo mantienen los triggers que
+        crea inicializar_db.migrar_esquema). Se lee siempre de la BD: no queda guardado en la sesión.
+        """
+        return self.__session.execute(
+            select(ModeloVersionDatos.cambios).where(ModeloVersionDatos.id == 1)).scalar_one()
+
+    def cerrar(self):
+        """Cierra la sesión del repositorio (para los creados para una sola tarea, como un reporte)."""
+        self.__session.close()
+
     # --- Métodos de Mapeo (Reclamo) ---
 
     def __map_modelo_a_entidad(self, modelo: ModeloReclamo) -> Reclamo:
@@ -191,6 +208,43 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
         if not creador_entidad:
              raise Exception(f"Inconsistencia: No se encontró el usuario creador ID {modelo.id_usuario_creador}")
 
+        # Convertimos cada ModeloUsuario adherente a una entidad Usuario
+        # Usamos el mapeador interno del repo de usuarios para esto
+        adherentes = [
+            self.__repo_usuarios._RepositorioUsuariosSQLAlchemy__map_modelo_a_entidad(adherente_modelo)
+            for adherente_modelo in (modelo.adherentes or [])
+        ]
+        return self.__construir_entidad(modelo, creador_entidad, adherentes)
+
+    def __map_modelos_a_entidades(self, modelos: List[ModeloReclamo]) -> List[Reclamo]:
+        """
+        Convierte varios ModeloReclamo a entidades Reclamo de una sola vez.
+        Los modelos deben venir con 'creador' y 'adherentes' ya cargados
+        (ver __query_con_relaciones), así no se hace ninguna consulta extra.
+        Usa un mapa de identidad para que cada Usuario se construya una única vez
+        aunque aparezca en muchos reclamos.
+        """
+        mapa_usuarios = {} # id de BD -> entidad Usuario
+        mapear_usuario = self.__repo_usuarios._RepositorioUsuariosSQLAlchemy__map_modelo_a_entidad
+
+        def obtener_usuario(modelo_usuario: ModeloUsuario) -> Usuario:
+            usuario = mapa_usuarios.get(modelo_usuario.id)
+            if usuario is None:
+                usuario = mapear_usuario(modelo_usuario)
+                mapa_usuarios[modelo_usuario.id] = usuario
+            return usuario
+
+        entidades = []
+        for modelo in modelos:
+            if modelo.creador is None:
+                raise Exception(f"Inconsistencia: No se encontró el usuario creador ID {modelo.id_usuario_creador}")
+            creador_entidad = obtener_usuario(modelo.creador)
+            adherentes = [obtener_usuario(m) for m in modelo.adherentes]
+            entidades.append(self.__construir_entidad(modelo, creador_entidad, adherentes))
+        return entidades
+
+    def __construir_entidad(self, modelo: ModeloReclamo, creador_entidad: Usuario, adherentes: List[Usuario]) -> Reclamo:
+        """Arma la entidad Reclamo a partir del modelo y sus usuarios ya mapeados."""
         # Creamos la entidad Reclamo
         entidad = Reclamo(
              usuario_creador=creador_entidad,
@@ -202,17 +256,23 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
         entidad._Reclamo__timestamp = modelo.timestamp
         entidad._Reclamo__estado = modelo.estado
         entidad._Reclamo__tiempo_resolucion_asignado = modelo.tiempo_resolucion_asignado
-        
-        if modelo.adherentes:
-            for adherente_modelo in modelo.adherentes:
-                # Convertimos cada ModeloUsuario a una entidad Usuario
-                # Usamos el mapeador interno del repo de usuarios para esto
-                adherente_entidad = self.__repo_usuarios._RepositorioUsuariosSQLAlchemy__map_modelo_a_entidad(adherente_modelo)
-                # Usamos el método público de la entidad Reclamo para agregarlo
-                entidad.agregar_adherente(adherente_entidad)
+
+        for adherente_entidad in adherentes:
+            # Usamos el método público de la entidad Reclamo para agregarlo
+            entidad.agregar_adherente(adherente_entidad)
 
         return entidad
 
+    def __query_con_relaciones(self):
+        """
+        Devuelve un query de reclamos que trae al creador (JOIN) y a los adherentes
+        (una consulta IN extra) junto con los reclamos, evitando el problema N+1.
+        """
+        return self.__session.query(ModeloReclamo).options(
+            joinedload(ModeloReclamo.creador),
+            selectinload(ModeloReclamo.adherentes)
+        )
+
     def __map_entidad_a_modelo(self, entidad: Reclamo) -> ModeloReclamo:
         """Convierte un objeto Reclamo (dominio) a un ModeloReclamo (tabla)."""
         # Necesitamos el ID del ModeloUsuario creador
@@ -236,6 +296,54 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
             id_usuario_creador=modelo_creador.id
         )
 
+    # --- Traducción de Consultas (Reclamo) ---
+
+    def __columna(self, campo: str):
+        """Devuelve la columna de ModeloReclamo para un campo. Lanza ValueError si no existe."""
+        if campo not in ModeloReclamo.__table__.columns:
+            raise ValueError(f"El campo '{campo}' no existe en los reclamos.")
+        return getattr(ModeloReclamo, campo)
+
+    def __aplicar_filtros(self, query, consulta: Consulta):
+        """Traduce los filtros de una Consulta (igualdad, IN y rangos) a cláusulas WHERE."""
+        for campo, valor in consulta.igualdades.items():
+            query = query.filter(self.__columna(campo) == valor)
+        for campo, valores in consulta.valores_en.items():
+            query = query.filter(self.__columna(campo).in_(valores))
+        for campo, (desde, hasta) in consulta.rangos.items():
+            columna = self.__columna(campo)
+            if desde is not None:
+                query = query.filter(columna >= desde)
+            if hasta is not None:
+                query = query.filter(columna <= hasta)
+        return query
+
+    def __aplicar_orden_y_limite(self, query, consulta: Consulta):
+        """Traduce el orden y el límite/desplazamiento de una Consulta a ORDER BY / LIMIT / OFFSET."""
+        for campo, descendente in consulta.orden:
+            columna = self.__columna(campo)
+            query = query.order_by(columna.desc() if descendente else columna.asc())
+        if consulta.limite is not None:
+            query = query.limit(consulta.limite)
+        if consulta.desplazamiento:
+            query = query.offset(consulta.desplazamiento)
+        return query
+
+    # --- Cursores de Paginación (Reclamo) ---
+
+    def __codificar_cursor(self, modelo: ModeloReclamo) -> str:
+        """Arma el cursor opaco (estado, timestamp, id) a partir del último reclamo de una página."""
+        clave = [modelo.estado, modelo.timestamp.isoformat(), modelo.id]
+        return base64.urlsafe_b64encode(json.dumps(clave).encode("utf-8")).decode("ascii")
+
+    def __decodificar_cursor(self, cursor: str) -> tuple:
+        """Recupera la clave (estado, timestamp, id) de un cursor. Lanza ValueError si es inválido."""
+        try:
+            estado, timestamp, id_reclamo = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return estado, datetime.datetime.fromisoformat(timestamp), int(id_reclamo)
+        except Exception:
+            raise ValueError("El cursor de paginación no es válido.")
+
     # --- Implementación Métodos Repositorio (Reclamo) ---
 
     def guardar(self, entidad: Reclamo):
@@ -259,8 +367,8 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
         return self.__map_modelo_a_entidad(modelo) if modelo else None
 
     def obtener_todos(self) -> List[Reclamo]:
-        modelos = self.__session.query(ModeloReclamo).all()
-        return [self.__map_modelo_a_entidad(m) for m in modelos]
+        modelos = self.__query_con_relaciones().all()
+        return self.__map_modelos_a_entidades(modelos)
 
     def actualizar(self, entidad: Reclamo):
         if not entidad.id_reclamo: # Necesitamos el ID para saber cuál actualizar
@@ -291,5 +399,165 @@ class RepositorioReclamosSQLAlchemy(RepositorioAbstracto):
         return self.__map_modelo_a_entidad(modelo) if modelo else None
 
     def obtener_todos_por_filtro(self, **kwargs) -> List[Reclamo]:
-        modelos = self.__session.query(ModeloReclamo).filter_by(**kwargs).all()
-        return [self.__map_modelo_a_entidad(m) for m in modelos]
\ No newline at end of file
+        modelos = self.__query_con_relaciones().filter_by(**kwargs).all()
+        return self.__map_modelos_a_entidades(modelos)
+
+    def obtener_pagina_por_filtro(self, tamano_pagina: int = TAMANO_PAGINA_POR_DEFECTO, cursor: Optional[str] = None, consulta: Optional[Consulta] = None, **kwargs) -> PaginaResultados:
+        """
+        Paginación por clave (keyset) ordenada por (estado, timestamp, id).
+        En lugar de OFFSET se continúa desde la clave del último reclamo de la página
+        anterior, así cada página cuesta lo mismo y sólo se cargan 'tamano_pagina' filas.
+        Si se pasa una Consulta sólo se usan sus filtros: el orden y el límite los define la página.
+        """
+        if tamano_pagina < 1:
+            raise ValueError("El tamaño de página debe ser al menos 1.")
+
+        query = self.__query_con_relaciones().filter_by(**kwargs)
+        if consulta is not None:
+            query = self.__aplicar_filtros(query, consulta)
+        if cursor:
+            clave = self.__decodificar_cursor(cursor)
+            query = query.filter(tuple_(ModeloReclamo.estado, ModeloReclamo.timestamp, ModeloReclamo.id) > clave)
+
+        # Pedimos un elemento de más para saber si existe una página siguiente
+        modelos = query.order_by(
+            ModeloReclamo.estado, ModeloReclamo.timestamp, ModeloReclamo.id
+        ).limit(tamano_pagina + 1).all()
+
+        cursor_siguiente = None
+        if len(modelos) > tamano_pagina:
+            modelos = modelos[:tamano_pagina]
+            cursor_siguiente = self.__codificar_cursor(modelos[-1])
+
+        return PaginaResultados(self.__map_modelos_a_entidades(modelos), cursor_siguiente)
+
+    def obtener_por_consulta(self, consulta: Consulta) -> List[Reclamo]:
+        query = self.__aplicar_filtros(self.__query_con_relaciones(), consulta)
+        modelos = self.__aplicar_orden_y_limite(query, consulta).all()
+        return self.__map_modelos_a_entidades(modelos)
+
+    # --- Agregaciones (Reclamo) ---
+    # Para estadísticas: trabajan sobre columnas sueltas y nunca construyen entidades Reclamo.
+
+    def contar_por(self, campo: str, consulta: Optional[Consulta] = None) -> dict:
+        """Cuenta los reclamos agrupados por un campo (GROUP BY). Ej: contar_por("estado")."""
+        columna = self.__columna(campo)
+        query = self.__session.query(columna, func.count(ModeloReclamo.id))
+        if consulta is not None:
+            query = self.__aplicar_filtros(query, consulta)
+        return {valor: cantidad for valor, cantidad in query.group_by(columna).all()}
+
+    def contar_adherentes(self, consulta: Optional[Consulta] = None) -> dict:
+        """Cantidad de adherentes de cada reclamo que cumple la consulta: {id_reclamo: cantidad} (sin los que no tienen)."""
+        query = self.__session.query(
+            asociacion_reclamos_adherentes.c.reclamo_id, func.count()
+        ).join(ModeloReclamo, ModeloReclamo.id == asociacion_reclamos_adherentes.c.reclamo_id)
+        if consulta is not None:
+            query = self.__aplicar_filtros(query, consulta)
+        return {id_reclamo: cantidad for id_reclamo, cantidad in query.group_by(asociacion_reclamos_adherentes.c.reclamo_id).all()}
+
+    def iterar_columna(self, campo: str, consulta: Optional[Consulta] = None, tamano_lote: int = 1000):
+        """
+        Recorre los valores de una sola columna de los reclamos que cumplen la consulta.
+        Las filas se traen de a 'tamano_lote', así la memoria no depende del tamaño de la tabla.
+        """
+        for (valor,) in self.iterar_columnas([campo], consulta, tamano_lote):
+            yield valor
+
+    def iterar_columnas(self, campos: list, consulta: Optional[Consulta] = None, tamano_lote: int = 1000):
+        """
+        Como iterar_columna pero con varias columnas: devuelve una tupla por reclamo con
+        los valores de 'campos' en ese orden (sin creador ni adherentes).
+        """
+        query = self.__session.query(*[self.__columna(campo) for campo in campos])
+        if consulta is not None:
+            query = self.__aplicar_orden_y_limite(self.__aplicar_filtros(query, consulta), consulta)
+        for fila in query.yield_per(tamano_lote):
+            yield tuple(fila)
+
+
+# --- Repositorio para Trabajos de Reportes ---
+
+class RepositorioTrabajosReportesSQLAlchemy(RepositorioAbstracto):
+    """Implementación concreta para manejar la persistencia de los trabajos de reportes."""
+
+    def __init__(self, session: Session):
+        # Los trabajos los actualizan otros hilos (con otra sesión): por eso las lecturas
+        # usan populate_existing, para no devolver la copia que esta sesión ya tenía cargada
+        self.__session = session
+        # Asegura que la tabla de trabajos exista
+        Base.metadata.create_all(bind=self.__session.bind)
+
+    # --- Métodos de Mapeo (TrabajoReporte) ---
+
+    def __map_modelo_a_entidad(self, modelo: ModeloTrabajoReporte) -> TrabajoReporte:
+        """Convierte un ModeloTrabajoReporte (tabla) a un objeto TrabajoReporte (dominio)."""
+        entidad = TrabajoReporte(modelo.rol, modelo.departamento, modelo.formato, modelo.version_datos)
+        # Asignamos atributos que no están en el __init__ usando nombres "privados"
+        entidad._TrabajoReporte__id_trabajo = modelo.id
+        entidad._TrabajoReporte__estado = modelo.estado
+        entidad._TrabajoReporte__ruta_archivo = modelo.ruta_archivo
+        entidad._TrabajoReporte__mensaje_error = modelo.mensaje_error
+        entidad._TrabajoReporte__creado = modelo.creado
+        entidad._TrabajoReporte__terminado = modelo.terminado
+        entidad._TrabajoReporte__propietario = modelo.propietario
+        return entidad
+
+    def __copiar_entidad_a_modelo(self, entidad: TrabajoReporte, modelo: ModeloTrabajoReporte):
+        """Copia los campos que cambian durante la vida del trabajo."""
+        modelo.estado = entidad.estado
+        modelo.ruta_archivo = entidad.ruta_archivo
+        modelo.mensaje_error = entidad.mensaje_error
+        modelo.terminado = entidad.terminado
+
+    # --- Implementación Métodos Repositorio (TrabajoReporte) ---
+
+    def guardar(self, entidad: TrabajoReporte):
+        modelo = ModeloTrabajoReporte(
+            id=entidad.id_trabajo,
+            rol=entidad.rol,
+            departamento=entidad.departamento,
+            formato=entidad.formato,
+            version_datos=entidad.version_datos,
+            creado=entidad.creado,
+            propietario=entidad.propietario,
+        )
+        self.__copiar_entidad_a_modelo(entidad, modelo)
+        try:
+            self.__session.add(modelo)
+            self.__session.commit()
+        except Exception:
+            self.__session.rollback()
+            raise
+
+    def obtener_por_id(self, id: str) -> Optional[TrabajoReporte]:
+        modelo = self.__session.get(ModeloTrabajoReporte, id, populate_existing=True)
+        return self.__map_modelo_a_entidad(modelo) if modelo else None
+
+    def obtener_todos(self) -> List[TrabajoReporte]:
+        modelos = self.__session.query(ModeloTrabajoReporte).populate_existing().all()
+        return [self.__map_modelo_a_entidad(m) for m in modelos]
+
+    def actualizar(self, entidad: TrabajoReporte):
+        modelo_actualizar = self.__session.get(ModeloTrabajoReporte, entidad.id_trabajo)
+        if not modelo_actualizar:
+             raise ValueError("Trabajo de reporte no encontrado para actualizar.")
+        self.__copiar_entidad_a_modelo(entidad, modelo_actualizar)
+        self.__session.commit()
+
+    def eliminar(self, id: str):
+        modelo_eliminar = self.__session.get(ModeloTrabajoReporte, id)
+        if not modelo_eliminar:
+             raise ValueError("Trabajo de reporte no encontrado para eliminar.")
+        self.__session.delete(modelo_eliminar)
+        self.__session.commit()
+
+    def obtener_por_filtro(self, **kwargs) -> Optional[TrabajoReporte]:
+        # Si hay varios, el más reciente
+        modelo = self.__session.query(ModeloTrabajoReporte).populate_existing().filter_by(**kwargs) \
+            .order_by(ModeloTrabajoReporte.creado.desc()).first()
+        return self.__map_modelo_a_entidad(modelo) if modelo else None
+
+    def obtener_todos_por_filtro(self, **kwargs) -> List[TrabajoReporte]:
+        modelos = self.__session.query(ModeloTrabajoReporte).populate_existing().filter_by(**kwargs).all()
+        return [self.__map_modelo_a_entidad(m) for m in modelos]
@@ -3,19 +3,37 @@ from modules.reclamo import Reclamo
 from modules.excepciones import UsuarioExistenteError, UsuarioInexistenteError, InicializacionError, ReclamoInexistenteError
 from modules.roles import JefeDepartamento, SecretarioTecnico
 from modules.repositorio_abstracto import IRepositorio as RepositorioAbstracto
+from modules.repositorio_abstracto import PaginaResultados, Consulta, TAMANO_PAGINA_POR_DEFECTO
 from modules.repositorio_concreto import RepositorioUsuariosSQLAlchemy, RepositorioReclamosSQLAlchemy # Importamos los concretos
 from modules.modelos_db import ModeloUsuario, ModeloReclamo # Necesario para filtros
 from typing import Optional, List # Mantenemos Optional y List
 from modules.clasificador_reclamos import ClasificadorReclamo
+from modules.cola_clasificacion import ColaClasificacion, DEPARTAMENTO_PROVISIONAL
+from modules.estadisticas import InstantaneaEstadisticas
+from modules.triage import ColaTriage, prioridad_de
 
 class SubsistemaGestionReclamos:
-    def __init__(self, repo_usuarios: RepositorioAbstracto, repo_reclamos: RepositorioAbstracto):
+    def __init__(self, repo_usuarios: RepositorioAbstracto, repo_reclamos: RepositorioAbstracto,
+                 clasificacion_asincronica: bool = False,
+                 instantanea_estadisticas: Optional[InstantaneaEstadisticas] = None,
+                 triage: Optional[ColaTriage] = None, **opciones_cola):
         """
         Constructor que recibe los repositorios para usuarios y reclamos.
+        Con clasificacion_asincronica=True, crear_reclamo guarda el reclamo enseguida y lo
+        clasifica en segundo plano (ver ColaClasificacion, que recibe las opciones_cola).
+        La instantánea de estadísticas y la cola de triage (opcionales) se avisan de cada cambio.
         """
         self.__repo_usuarios = repo_usuarios
         self.__repo_reclamos = repo_reclamos
         self.__clasificador = ClasificadorReclamo() #Relación de composición
+        self.__instantanea = instantanea_estadisticas
+        self.__triage = triage
+        if clasificacion_asincronica:
+            if instantanea_estadisticas is not None or triage is not None:
+                opciones_cola.setdefault("al_actualizar", self.__notificar_cambio)
+            self.__cola_clasificacion = ColaClasificacion(self.__clasificador, **opciones_cola)
+        else:
+            self.__cola_clasificacion = None
         
 
     # --- Métodos de gestión de Usuarios ---
@@ -47,23 +65,70 @@ class SubsistemaGestionReclamos:
 
  # --- Métodos de gestión de Reclamos ---
 
-    def crear_reclamo(self, usuario_creador: Usuario, contenido: str) -> Reclamo:
+    @property
+    def clasificacion_asincronica(self) -> bool:
+        return self.__cola_clasificacion is not None
+
+    @property
+    def instantanea_estadisticas(self) -> Optional[InstantaneaEstadisticas]:
+        return self.__instantanea
+
+    @property
+    def triage(self) -> Optional[ColaTriage]:
+        return self.__triage
+
+    @property
+    def version_datos(self) -> str:
+        """
+        Identifica el estado de los reclamos: cambia con cada reclamo creado, modificado,
+        derivado o con un nuevo adherente. Dos reportes pedidos con la misma versión son iguales.
+        La lleva la BD (ver RepositorioReclamosSQLAlchemy.obtener_version_datos), así que la
+        comparten todos los procesos y se mantiene al reiniciar el servidor.
+        """
+        return str(self.__repo_reclamos.obtener_version_datos())
+
+    @property
+    def cola_clasificacion(self) -> Optional[ColaClasificacion]:
+        return self.__cola_clasificacion
+
+    def clasificar_reclamo(self, contenido: str) -> str:
+        """
+        Clasifica el contenido de un reclamo y devuelve el departamento que le corresponde.
+        Es el paso más caro de la creación: el resultado se puede pasar a
+        buscar_reclamos_similares y a crear_reclamo para no clasificar el mismo texto otra vez.
+        """
+        return self.__clasificador.clasificar(contenido)
+
+    def crear_reclamo(self, usuario_creador: Usuario, contenido: str, departamento: Optional[str] = None) -> Reclamo:
         """
         Crea un nuevo reclamo. El departamento se asigna automáticamente
-        usando el clasificador.
+        usando el clasificador, salvo que se pase el ya obtenido con clasificar_reclamo.
+        En modo asincrónico el reclamo se guarda con DEPARTAMENTO_PROVISIONAL y la cola
+        de clasificación le asigna el departamento después.
         """
         # Verificamos que el usuario creador exista en la BD
         usuario_existente = self.__repo_usuarios.obtener_por_filtro(nombre_usuario=usuario_creador.nombre_usuario)
         if not usuario_existente:
             raise UsuarioInexistenteError("No se puede crear un reclamo para un usuario que no está registrado.")
-        # 1. Clasificar el contenido
-        departamento_asignado = self.__clasificador.clasificar(contenido)
+        # 1. Clasificar el contenido (si no viene ya clasificado ni se clasifica en segundo plano)
+        encolar = departamento is None and self.__cola_clasificacion is not None
+        if departamento is not None:
+            departamento_asignado = departamento
+        elif encolar:
+            departamento_asignado = DEPARTAMENTO_PROVISIONAL
+        else:
+            departamento_asignado = self.clasificar_reclamo(contenido)
 
         # 2. Crear la entidad Reclamo con el departamento clasificado
         nuevo_reclamo = Reclamo(usuario_existente, contenido, departamento_asignado)
 
         # 3. Guardar el reclamo usando el repositorio
         self.__repo_reclamos.guardar(nuevo_reclamo)
+        self.__notificar_cambio(nuevo_reclamo)
+
+        # 4. En modo asincrónico, pedimos la clasificación (ya tiene ID de BD)
+        if encolar:
+            self.__cola_clasificacion.encolar(nuevo_reclamo.id_reclamo, contenido)
 
         return nuevo_reclamo
     
@@ -111,6 +176,9 @@ class SubsistemaGestionReclamos:
         except Exception as e:
             # Manejar error si la asociación falla
             raise Exception(f"Error al adherir al reclamo: {e}")
+        # Las estadísticas no cambian con una adhesión, la prioridad de triage sí
+        if self.__triage is not None:
+            self.__triage.actualizar(reclamo_a_adherir)
 
     def cambiar_estado_reclamo(self, jefe_departamento: JefeDepartamento, id_reclamo: int, nuevo_estado: str, dias_resolucion: Optional[int] = None):
         """
@@ -132,6 +200,7 @@ class SubsistemaGestionReclamos:
 
         # Actualizamos el reclamo en la base de datos usando el repositorio
         self.__repo_reclamos.actualizar(reclamo_a_modificar)
+        self.__notificar_cambio(reclamo_a_modificar)
 
     def listar_reclamos_usuario(self, usuario: Usuario) -> List[Reclamo]:
         """
@@ -179,6 +248,27 @@ class SubsistemaGestionReclamos:
         )
         return reclamos_encontrados 
 
+
+    def listar_reclamos_usuario_paginado(self, usuario: Usuario, tamano_pagina: int = TAMANO_PAGINA_POR_DEFECTO, cursor: Optional[str] = None) -> PaginaResultados:
+        """
+        Igual que listar_reclamos_usuario pero devuelve una sola página de resultados.
+        """
+        usuario_existente = self.__repo_usuarios.obtener_por_filtro(nombre_usuario=usuario.nombre_usuario)
+        if not usuario_existente:
+            raise UsuarioInexistenteError("El usuario no está registrado en el sistema.")
+
+        return self.__repo_reclamos.obtener_pagina_por_filtro(
+            tamano_pagina, cursor, id_usuario_creador=usuario_existente.id_bd
+        )
+
+    def buscar_reclamos_pendientes_paginado(self, departamento: Optional[str] = None, tamano_pagina: int = TAMANO_PAGINA_POR_DEFECTO, cursor: Optional[str] = None) -> PaginaResultados:
+        """
+        Devuelve una página de reclamos pendientes, opcionalmente filtrados por departamento.
+        """
+        filtros = {"estado": "pendiente"}
+        if departamento:
+            filtros["departamento"] = departamento
+        return self.__repo_reclamos.obtener_pagina_por_filtro(tamano_pagina, cursor, **filtros)
      
     def derivar_reclamo(self, usuario_secretario: Usuario, id_reclamo: int, nuevo_departamento: str):
         """
@@ -198,12 +288,77 @@ class SubsistemaGestionReclamos:
         reclamo_a_derivar.departamento = nuevo_departamento
 
         self.__repo_reclamos.actualizar(reclamo_a_derivar)
+        self.__notificar_cambio(reclamo_a_derivar)
+
+    def reconstruir_estadisticas(self):
+        """
+        Recalcula la instantánea de estadísticas desde la BD (al arrancar, o para corregirla
+        si la BD se modificó por fuera del sistema).
+        """
+        if self.__instantanea is None:
+            raise InicializacionError("El sistema no tiene una instantánea de estadísticas.")
+        self.__instantanea.reconstruir_desde_bd(self.__repo_reclamos)
+
+    def reconstruir_triage(self):
+        """
+        Arma la cola de triage con los reclamos pendientes de la BD. Lee sólo el id, el
+        departamento, el timestamp y la cantidad de adherentes: no construye los Reclamo.
+        """
+        if self.__triage is None:
+            raise InicializacionError("El sistema no tiene una cola de triage.")
+        pendientes = Consulta(estado="pendiente")
+        adherentes = self.__repo_reclamos.contar_adherentes(pendientes)
+        self.__triage.reconstruir_desde_filas(
+            (id_reclamo, departamento, prioridad_de(adherentes.get(id_reclamo, 0), timestamp, id_reclamo))
+            for id_reclamo, departamento, timestamp
+            in self.__repo_reclamos.iterar_columnas(["id", "departamento", "timestamp"], pendientes)
+        )
+
+    def listar_triage(self, departamento: str, cantidad: int = TAMANO_PAGINA_POR_DEFECTO) -> List[Reclamo]:
+        """
+        Devuelve los 'cantidad' reclamos pendientes del departamento con mayor prioridad
+        (ver prioridad_triage). Si la cola todavía no se construyó, se construye ahora.
+        La cola sólo tiene ids: los reclamos se leen de la BD, y los que otro proceso cambió
+        (ya no pendientes, de otro departamento o con otros adherentes) se corrigen en la
+        cola antes de devolverlos.
+        """
+        if self.__triage is None:
+            raise InicializacionError("El sistema no tiene una cola de triage.")
+        if not self.__triage.construida:
+            self.reconstruir_triage()
+        ids = self.__triage.primeros(departamento, cantidad)
+        while True:
+            reclamos = {reclamo.id_reclamo: reclamo
+                        for reclamo in self.__repo_reclamos.obtener_por_consulta(Consulta().en("id", ids))} if ids else {}
+            for id_reclamo in ids:
+                if id_reclamo in reclamos:
+                    self.__triage.actualizar(reclamos[id_reclamo])
+                else:
+                    self.__triage.quitar(id_reclamo)
+            ids_actuales = self.__triage.primeros(departamento, cantidad)
+            if ids_actuales == ids:
+                return [reclamos[id_reclamo] for id_reclamo in ids]
+            ids = ids_actuales
+
+    def __notificar_cambio(self, reclamo: Reclamo):
+        """Avisa a la instantánea de estadísticas y a la cola de triage (si las hay) que el reclamo cambió."""
+        if self.__instantanea is not None:
+            self.__instantanea.actualizar(reclamo)
+        if self.__triage is not None:
+            self.__triage.actualizar(reclamo)
 
 
-    def buscar_reclamos_similares(self, contenido_reclamo: str) -> List[Reclamo]:
-    # 1. Clasificar el texto para saber qué buscar
+    def buscar_reclamos_similares(self, contenido_reclamo: str, clasificacion: Optional[str] = None) -> List[Reclamo]:
+    # 1. Clasificar el texto para saber qué buscar, salvo que ya venga clasificado
     #    (Asumimos que self.__clasificador ya fue creado en el __init__)
-        clasificacion = self.__clasificador.clasificar(contenido_reclamo)
+        if clasificacion is None and self.__cola_clasificacion is not None:
+            # En modo asincrónico no se clasifica durante el pedido: sin departamento,
+            # se ofrecen los pendientes más recientes de todos (incluidos los aún sin
+            # derivar), con el mismo límite que una página para no cargar la tabla entera
+            consulta = Consulta(estado="pendiente").ordenar_por("timestamp", descendente=True)
+            return self.__repo_reclamos.obtener_por_consulta(consulta.limitar(TAMANO_PAGINA_POR_DEFECTO))
+        if clasificacion is None:
+            clasificacion = self.clasificar_reclamo(contenido_reclamo)
 
         if clasificacion == "indefinido":
             print("Advertencia: El clasificador no pudo determinar una categoría.")
@@ -1,52 +1,218 @@
+import threading
+from collections import OrderedDict
 import numpy as np
 import spacy
+from scipy.sparse import csr_matrix
 from sklearn.base import BaseEstimator, TransformerMixin
 
+# Componentes del pipeline de spaCy que el lematizador no necesita.
+# El lematizador de español usa tok2vec, morphologizer y attribute_ruler; el análisis
+# de dependencias y las entidades nombradas sólo agregan tiempo.
+COMPONENTES_INNECESARIOS = ("parser", "ner")
+# Cantidad de textos que spaCy procesa juntos en nlp.pipe
+TAMANO_LOTE_POR_DEFECTO = 256
+# Capacidad por defecto de las cachés de textos y de lemas. La de lemas viene desactivada:
+# reutiliza el lema de una palabra sin mirar su contexto, pero el lematizador de
+# es_core_news_sm depende de la categoría gramatical, así que el resultado de un texto
+# pasaría a depender de los textos vistos antes. La de textos es exacta.
+TAMANO_CACHE_TEXTOS = 10000
+TAMANO_CACHE_LEMAS = 0
+
+# Valor que devuelve CacheLRU cuando la clave no está (None es un valor válido)
+FALTANTE = object()
+
+
+class CacheLRU:
+    """
+    Caché acotada: al llenarse descarta el elemento usado hace más tiempo.
+    Cuenta aciertos y fallos. Se puede guardar con pickle (el lock se recrea al cargar).
+    Con capacidad 0 queda desactivada.
+    """
+    def __init__(self, capacidad: int):
+        self.__capacidad = capacidad
+        self.__datos = OrderedDict()
+        self.__lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_CacheLRU__lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__datos)
+
+    @property
+    def activa(self) -> bool:
+        return self.__capacidad > 0
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado para la clave, o FALTANTE si no está."""
+        with self.__lock:
+            valor = self.__datos.get(clave, FALTANTE)
+            if valor is FALTANTE:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+                self.__datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor):
+        if self.__capacidad <= 0:
+            return
+        with self.__lock:
+            self.__datos[clave] = valor
+            self.__datos.move_to_end(clave)
+            if len(self.__datos) > self.__capacidad:
+                self.__datos.popitem(last=False)
+
+    def estadisticas(self) -> dict:
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "tamano": len(self.__datos)}
+
 
 class TextVectorizer(BaseEstimator, TransformerMixin):
-    def __init__(self, p_language_model='es_core_news_sm'):
+    def __init__(self, p_language_model='es_core_news_sm', p_batch_size=TAMANO_LOTE_POR_DEFECTO, p_n_process=1, p_sparse=True,
+                 p_cache_textos=TAMANO_CACHE_TEXTOS, p_cache_lemas=TAMANO_CACHE_LEMAS):
         """
         Vectorizador de texto basado en spaCy (para español).
         - Tokeniza, lematiza y elimina stopwords y signos de puntuación.
+        - Procesa los textos por lotes con nlp.pipe (p_batch_size textos por lote,
+          repartidos en p_n_process procesos).
+        - Con p_sparse devuelve una matriz dispersa CSR: cada reclamo tiene unas pocas
+          palabras de un vocabulario de miles, así que casi todas las celdas son cero.
+        - Guarda en una caché los tokens de cada texto ya visto (p_cache_textos): los
+          reclamos repetidos no vuelven a pasar por el pipeline de spaCy.
+        - Con p_cache_lemas > 0 también reutiliza el lema de cada palabra ya vista, para
+          textos nuevos formados sólo por palabras conocidas. Es aproximado (ignora el
+          contexto de la palabra) y por eso viene desactivado.
         """
         self.__nlp = spacy.load(p_language_model)
         self.__word2idx = {}
         self.__vocabulary = None
+        self.__batch_size = p_batch_size
+        self.__n_process = p_n_process
+        self.__sparse = p_sparse
+        self.__cache_textos = CacheLRU(p_cache_textos)
+        self.__cache_lemas = CacheLRU(p_cache_lemas)
+
+    def __setstate__(self, state):
+        # Los clasificadores guardados con versiones anteriores (claims_clf.pkl)
+        # no tienen la configuración de lotes: usamos los valores por defecto.
+        state.setdefault('_TextVectorizer__batch_size', TAMANO_LOTE_POR_DEFECTO)
+        state.setdefault('_TextVectorizer__n_process', 1)
+        # Esos modelos se entrenaron con matrices densas (su StandardScaler centra
+        # los datos y no acepta matrices dispersas), así que siguen siendo densos.
+        state.setdefault('_TextVectorizer__sparse', False)
+        if '_TextVectorizer__cache_textos' not in state:
+            state['_TextVectorizer__cache_textos'] = CacheLRU(TAMANO_CACHE_TEXTOS)
+            state['_TextVectorizer__cache_lemas'] = CacheLRU(TAMANO_CACHE_LEMAS)
+        super().__setstate__(state)
+
+    def configurar_procesamiento(self, tamano_lote: int, n_procesos: int = 1):
+        """
+        Cambia el tamaño de lote y la cantidad de procesos de spaCy.
+        Útil para un clasificador ya entrenado (cargado desde el pickle) antes de
+        reentrenar o reclasificar muchos reclamos.
+        """
+        if tamano_lote < 1 or n_procesos < 1:
+            raise ValueError("El tamaño de lote y la cantidad de procesos deben ser al menos 1.")
+        self.__batch_size = tamano_lote
+        self.__n_process = n_procesos
+
+    def estadisticas_cache(self) -> dict:
+        """Aciertos, fallos y tamaño actual de las cachés de textos y de lemas."""
+        return {"textos": self.__cache_textos.estadisticas(), "lemas": self.__cache_lemas.estadisticas()}
+
+    def __componentes_a_desactivar(self):
+        return [nombre for nombre in COMPONENTES_INNECESARIOS if nombre in self.__nlp.pipe_names]
 
-    def __get_tokens(self, texto):
+    def __tokens_de_doc(self, doc):
         """
-        Procesa el texto: minúsculas, lematización, eliminación de stopwords y puntuación.
+        Lematiza un documento ya procesado y elimina stopwords, puntuación, espacios y números.
+        De paso guarda el lema de cada palabra en la caché de lemas (None si se descarta).
         """
-        doc = self.__nlp(texto.lower())
-        word_tokens = [
-            token.lemma_ for token in doc
-                if not token.is_stop and not token.is_punct and not token.is_space and not token.like_num
-        ]
+        word_tokens = []
+        for token in doc:
+            if not token.is_stop and not token.is_punct and not token.is_space and not token.like_num:
+                word_tokens.append(token.lemma_)
+                self.__cache_lemas.guardar(token.text, token.lemma_)
+            else:
+                self.__cache_lemas.guardar(token.text, None)
         return ' '.join(word_tokens)
 
-    def __text_to_vector(self, texto):
+    def __tokens_desde_cache_lemas(self, doc):
         """
-        Convierte un texto en un vector de frecuencia de palabras basado en el vocabulario aprendido.
+        Arma los tokens de un documento sólo tokenizado (sin lematizar) usando la caché de lemas.
+        Devuelve None si alguna palabra no está en la caché.
+        Los filtros (stopword, puntuación, número) no dependen del contexto, pero el lema
+        sí: sólo se usa si la caché de lemas se activó explícitamente (ver TAMANO_CACHE_LEMAS).
         """
-        word_vector = np.zeros(len(self.__vocabulary), dtype=np.int_)
-        texto = self.__get_tokens(texto)
-        for word in texto.split(" "):
-            idx = self.__word2idx.get(word)
-            if idx is not None:
-                word_vector[idx] += 1
-        return word_vector
+        word_tokens = []
+        for token in doc:
+            lema = self.__cache_lemas.obtener(token.text)
+            if lema is FALTANTE:
+                return None
+            if lema is not None:
+                word_tokens.append(lema)
+        return ' '.join(word_tokens)
+
+    def __get_tokens_lote(self, textos):
+        """
+        Procesa muchos textos a la vez: minúsculas, lematización, eliminación de stopwords
+        y puntuación. Devuelve un string de tokens por texto.
+        Primero busca cada texto en la caché de textos, después (si está activa) intenta
+        armarlo con la caché de lemas, sólo tokenizando, y lo que falta lo procesa con nlp.pipe.
+        """
+        normalizados = [' '.join(texto.lower().split()) for texto in textos]
+        resultado = {}
+        pendientes = {} # texto normalizado -> Doc sólo tokenizado (o el texto, sin caché de lemas)
+
+        for texto in normalizados:
+            if texto in resultado or texto in pendientes:
+                continue
+            tokens = self.__cache_textos.obtener(texto)
+            if tokens is FALTANTE:
+                if not self.__cache_lemas.activa:
+                    pendientes[texto] = texto
+                    continue
+                doc = self.__nlp.tokenizer(texto)
+                tokens = self.__tokens_desde_cache_lemas(doc)
+                if tokens is None:
+                    pendientes[texto] = doc
+                    continue
+                self.__cache_textos.guardar(texto, tokens)
+            resultado[texto] = tokens
+
+        if pendientes:
+            docs = self.__nlp.pipe(
+                pendientes.values(),
+                batch_size=self.__batch_size,
+                n_process=self.__n_process,
+                disable=self.__componentes_a_desactivar()
+            )
+            for texto, doc in zip(pendientes.keys(), docs):
+                tokens = self.__tokens_de_doc(doc)
+                self.__cache_textos.guardar(texto, tokens)
+                resultado[texto] = tokens
+
+        return [resultado[texto] for texto in normalizados]
 
     def fit(self, X, y=None):
         """
         Construye el vocabulario a partir del conjunto de textos de entrenamiento.
         """
-        X_processed = [self.__get_tokens(text) for text in X]
+        X_processed = self.__get_tokens_lote(X)
 
         words = set()
         for text in X_processed:
             for word in text.split(" "):
                 words.add(word)
-        
+
         self.__vocabulary = list(words)
         for i, word in enumerate(self.__vocabulary):
             self.__word2idx[word] = i
@@ -55,9 +221,29 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
 
     def transform(self, X, y=None):
         """
-        Transforma una lista de textos en una matriz de vectores.
+        Transforma una lista de textos en una matriz de frecuencias de palabras basada
+        en el vocabulario aprendido (una fila por texto).
+        Arma directamente los arreglos indptr/indices/data de la matriz CSR, sin pasar
+        por filas densas.
         """
-        word_vectors = np.zeros((len(X), len(self.__vocabulary)), dtype=np.int_)
-        for i, text in enumerate(X):
-            word_vectors[i] = self.__text_to_vector(text)
-        return word_vectors
\ No newline at end of file
+        indptr = [0]
+        indices = []
+        data = []
+        for tokens in self.__get_tokens_lote(X):
+            conteo = {}
+            for word in tokens.split(" "):
+                idx = self.__word2idx.get(word)
+                if idx is not None:
+                    conteo[idx] = conteo.get(idx, 0) + 1
+            for idx in sorted(conteo):
+                indices.append(idx)
+                data.append(conteo[idx])
+            indptr.append(len(indices))
+
+        word_vectors = csr_matrix(
+            (np.array(data, dtype=np.int_), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(X), len(self.__vocabulary))
+        )
+        if not self.__sparse:
+            return word_vectors.toarray()
+        return word_vectors
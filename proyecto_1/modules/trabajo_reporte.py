@@ -0,0 +1,103 @@
+import datetime
+import uuid
+from typing import Optional
+
+# Estados de un trabajo de reporte
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+TERMINADO = "terminado"
+ERROR = "error"
+
+
+class TrabajoReporte:
+    """
+    Modela el pedido de un reporte que se genera en segundo plano (ver ColaReportes).
+    Dos pedidos con el mismo rol, departamento, formato y versión de los datos producen
+    el mismo reporte, así que comparten el trabajo. El propietario identifica al proceso
+    que lo genera ("equipo:pid").
+    """
+
+    def __init__(self, rol: str, departamento: Optional[str], formato: str, version_datos: str,
+                 propietario: Optional[str] = None):
+        self.__id_trabajo: str = uuid.uuid4().hex
+        self.__rol: str = rol
+        self.__departamento: Optional[str] = departamento # None = todos los departamentos
+        self.__formato: str = formato
+        self.__version_datos: str = version_datos
+        self.__estado: str = PENDIENTE
+        self.__ruta_archivo: Optional[str] = None
+        self.__mensaje_error: Optional[str] = None
+        self.__creado: datetime.datetime = datetime.datetime.now()
+        self.__terminado: Optional[datetime.datetime] = None
+        self.__propietario: Optional[str] = propietario
+
+    @property
+    def id_trabajo(self) -> str:
+        return self.__id_trabajo
+
+    @property
+    def rol(self) -> str:
+        return self.__rol
+
+    @property
+    def departamento(self) -> Optional[str]:
+        return self.__departamento
+
+    @property
+    def formato(self) -> str:
+        return self.__formato
+
+    @property
+    def version_datos(self) -> str:
+        return self.__version_datos
+
+    @property
+    def clave_pedido(self) -> tuple:
+        """Lo que identifica al reporte pedido: pedidos con la misma clave comparten el trabajo."""
+        return self.__rol, self.__departamento, self.__formato, self.__version_datos
+
+    @property
+    def estado(self) -> str:
+        return self.__estado
+
+    @property
+    def ruta_archivo(self) -> Optional[str]:
+        return self.__ruta_archivo
+
+    @property
+    def mensaje_error(self) -> Optional[str]:
+        return self.__mensaje_error
+
+    @property
+    def creado(self) -> datetime.datetime:
+        return self.__creado
+
+    @property
+    def terminado(self) -> Optional[datetime.datetime]:
+        return self.__terminado
+
+    @property
+    def propietario(self) -> Optional[str]:
+        return self.__propietario
+
+    @property
+    def finalizado(self) -> bool:
+        return self.__estado in (TERMINADO, ERROR)
+
+    def iniciar(self):
+        if self.__estado != PENDIENTE:
+            raise ValueError(f"El trabajo está '{self.__estado}', no se puede iniciar.")
+        self.__estado = EN_PROCESO
+
+    def terminar(self, ruta_archivo: str):
+        self.__estado = TERMINADO
+        self.__ruta_archivo = ruta_archivo
+        self.__terminado = datetime.datetime.now()
+
+    def fallar(self, mensaje_error: str):
+        self.__estado = ERROR
+        self.__mensaje_error = mensaje_error[:1000]
+        self.__terminado = datetime.datetime.now()
+
+    def __str__(self):
+        return f"Trabajo {self.__id_trabajo} ({self.__formato}, {self.__estado})"
@@ -0,0 +1,116 @@
+import datetime
+import threading
+from typing import Optional, List
+
+from modules.reclamo import Reclamo
+from modules.monticulo import MonticuloIndexadoMaximos
+
+# Cuántos días de antigüedad "vale" cada adherente al ordenar los pendientes:
+# un reclamo con 2 adherentes va antes que uno sin adherentes creado hasta 6 días antes.
+DIAS_POR_ADHERENTE = 3
+SEGUNDOS_POR_DIA = 24 * 60 * 60
+
+
+def prioridad_triage(reclamo: Reclamo) -> tuple:
+    """
+    Prioridad de un reclamo pendiente: más adherentes y más antigüedad, más arriba.
+    La antigüedad se mide como (ahora - timestamp), y como 'ahora' es el mismo para todos
+    los reclamos, alcanza con restar el timestamp: así la prioridad no cambia con el paso
+    del tiempo y el montículo no hay que reordenarlo. A igual puntaje va primero el de menor id.
+    """
+    return prioridad_de(reclamo.numero_adherentes, reclamo.timestamp, reclamo.id_reclamo)
+
+
+def prioridad_de(numero_adherentes: int, timestamp: datetime.datetime, id_reclamo: Optional[int]) -> tuple:
+    """prioridad_triage a partir de los datos sueltos (por ejemplo, leídos de la BD sin armar el Reclamo)."""
+    puntaje = numero_adherentes * DIAS_POR_ADHERENTE * SEGUNDOS_POR_DIA - timestamp.timestamp()
+    return puntaje, -(id_reclamo or 0)
+
+
+class ColaTriage:
+    """
+    Ids de los reclamos pendientes de cada departamento ordenados por prioridad_triage, en
+    un montículo indexado por id_reclamo. Se construye una vez desde la BD (reconstruir) y
+    después se mantiene con actualizar(reclamo), que cuesta O(log n): los jefes ven los
+    más urgentes sin ordenar la lista completa en cada pedido.
+    Sólo guarda (id_reclamo, departamento, prioridad): los reclamos a mostrar se leen de la
+    BD con sus ids (ver SubsistemaGestionReclamos.listar_triage).
+    """
+    def __init__(self):
+        self.__lock = threading.Lock() # La cola de clasificación avisa desde otro hilo
+        self.__monticulos = {} # departamento -> MonticuloIndexadoMaximos de id_reclamo
+        self.__departamentos = {} # id_reclamo -> departamento en cuyo montículo está
+        self.__construida = False
+
+    @property
+    def construida(self) -> bool:
+        return self.__construida
+
+    def reconstruir(self, reclamos):
+        """Arma los montículos desde cero con los reclamos pendientes de 'reclamos'."""
+        self.reconstruir_desde_filas(
+            (reclamo.id_reclamo, reclamo.departamento, prioridad_triage(reclamo))
+            for reclamo in reclamos if reclamo.estado == "pendiente"
+        )
+
+    def reconstruir_desde_filas(self, filas):
+        """Arma los montículos desde cero con tuplas (id_reclamo, departamento, prioridad) de reclamos pendientes."""
+        pares_por_departamento = {}
+        departamentos = {}
+        for id_reclamo, departamento, prioridad in filas:
+            departamentos[id_reclamo] = departamento
+            pares_por_departamento.setdefault(departamento, []).append((id_reclamo, prioridad))
+        with self.__lock:
+            self.__monticulos = {
+                departamento: MonticuloIndexadoMaximos.desde_pares(pares)
+                for departamento, pares in pares_por_departamento.items()
+            }
+            self.__departamentos = departamentos
+            self.__construida = True
+
+    def actualizar(self, reclamo: Reclamo):
+        """
+        Refleja el estado actual de un reclamo (nuevo, con otro estado, derivado o con más
+        adherentes). No hace nada hasta que la cola se construya.
+        """
+        with self.__lock:
+            if not self.__construida:
+                return
+            departamento_anterior = self.__departamentos.get(reclamo.id_reclamo)
+            if departamento_anterior is not None and (reclamo.estado != "pendiente" or departamento_anterior != reclamo.departamento):
+                self.__quitar(departamento_anterior, reclamo.id_reclamo)
+            if reclamo.estado != "pendiente":
+                return
+            self.__departamentos[reclamo.id_reclamo] = reclamo.departamento
+            monticulo = self.__monticulos.setdefault(reclamo.departamento, MonticuloIndexadoMaximos())
+            if reclamo.id_reclamo in monticulo:
+                monticulo.actualizar_prioridad(reclamo.id_reclamo, prioridad_triage(reclamo))
+            else:
+                monticulo.insertar(reclamo.id_reclamo, prioridad_triage(reclamo))
+
+    def quitar(self, id_reclamo: int):
+        """Saca un reclamo de la cola (por ejemplo, si ya no está en la BD). Si no está, no hace nada."""
+        with self.__lock:
+            departamento = self.__departamentos.get(id_reclamo)
+            if departamento is not None:
+                self.__quitar(departamento, id_reclamo)
+
+    def primeros(self, departamento: str, cantidad: int) -> List[int]:
+        """Los ids de los 'cantidad' reclamos pendientes más prioritarios del departamento, en orden."""
+        with self.__lock:
+            monticulo = self.__monticulos.get(departamento)
+            if monticulo is None:
+                return []
+            return [id_reclamo for id_reclamo, _ in monticulo.primeros(cantidad)]
+
+    def tamano(self, departamento: Optional[str] = None) -> int:
+        """Cantidad de reclamos pendientes del departamento (o de todos, con None)."""
+        with self.__lock:
+            if departamento is None:
+                return len(self.__departamentos)
+            monticulo = self.__monticulos.get(departamento)
+            return monticulo.tamano() if monticulo is not None else 0
+
+    def __quitar(self, departamento: str, id_reclamo: int):
+        del self.__departamentos[id_reclamo]
+        self.__monticulos[departamento].eliminar(id_reclamo)
@@ -0,0 +1,56 @@
+import sys
+from collections import Counter
+
+from modules.factoria import crear_repositorio_reclamos
+from modules.estadisticas import InstantaneaEstadisticas, GeneradorEstadisticasSQL, _palabras_de
+from modules.repositorio_abstracto import Consulta
+
+
+def reconstruir_y_verificar(repo_reclamos=None) -> bool:
+    """
+    Reconstruye la instantánea de estadísticas desde la BD y la compara con las
+    estadísticas calculadas directamente con consultas (GeneradorEstadisticasSQL).
+    Devuelve True si coinciden para todos los departamentos.
+    """
+    if repo_reclamos is None:
+        repo_reclamos = crear_repositorio_reclamos()
+
+    print("Reconstruyendo la instantánea de estadísticas desde la BD...")
+    instantanea = InstantaneaEstadisticas()
+    instantanea.reconstruir_desde_bd(repo_reclamos)
+
+    consistente = True
+    departamentos = [None] + sorted(repo_reclamos.contar_por("departamento"))
+    for departamento in departamentos:
+        nombre = departamento or "todos los departamentos"
+        generador_sql = GeneradorEstadisticasSQL(repo_reclamos, departamento)
+        consulta = Consulta(departamento=departamento) if departamento else Consulta()
+        palabras_bd = Counter()
+        for contenido in repo_reclamos.iterar_columna("contenido", consulta):
+            palabras_bd.update(_palabras_de(contenido))
+
+        diferencias = []
+        if instantanea.porcentajes_estado(departamento) != generador_sql.calcular_porcentajes_estado():
+            diferencias.append("porcentajes por estado")
+        if instantanea.mediana_tiempos(departamento) != generador_sql.calcular_mediana_tiempos_resolucion():
+            diferencias.append("mediana de tiempos de resolución")
+        if instantanea.percentiles_tiempos(departamento=departamento) != generador_sql.calcular_percentiles_tiempos_resolucion():
+            diferencias.append("percentiles de tiempos de resolución")
+        if instantanea.contador_palabras(departamento) != palabras_bd:
+            diferencias.append("conteo de palabras")
+
+        if diferencias:
+            consistente = False
+            print(f"  > {nombre}: INCONSISTENTE ({', '.join(diferencias)})")
+        else:
+            total = instantanea.porcentajes_estado(departamento)["total"]
+            print(f"  > {nombre}: OK ({total} reclamos)")
+
+    return consistente
+
+
+# --- Punto de entrada para ejecutar el script ---
+if __name__ == "__main__":
+    # Uso (desde proyecto_1): python reconstruir_estadisticas.py
+    # Termina con código 1 si encuentra alguna inconsistencia.
+    sys.exit(0 if reconstruir_y_verificar() else 1)
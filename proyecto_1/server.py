@@ -1,6 +1,7 @@
 
 from modules.factoria import crear_repositorio_usuarios, crear_repositorio_reclamos
 from modules.sistema import SubsistemaGestionReclamos
+from modules.clasificador_reclamos import precargar_modelo
 from modules.inicializacion import DATOS_PERSONAL # Datos para inicializar personal
 from modules.roles import JefeDepartamento, SecretarioTecnico # Clases específicas
 from modules.excepciones import UsuarioExistenteError # Para manejar errores al inicializar
@@ -10,19 +11,89 @@ from modules.formularios import FormRegistro, FormLogin, FormCrearReclamo, FormE
 from modules.gestor_login import GestorDeLogin # Importamos el gestor
 from modules.excepciones import UsuarioInexistenteError, UsuarioExistenteError
 from modules.usuario import Usuario # Para el chequeo de contraseñas
-from modules.estadisticas import GeneradorEstadisticas
-from modules.graficador import Graficador
-from flask import send_from_directory
+from modules.estadisticas import crear_generador_estadisticas, InstantaneaEstadisticas, PERCENTILES_TIEMPOS
+from modules.triage import ColaTriage, DIAS_POR_ADHERENTE
+from modules.graficador import CacheGraficos, CacheGraficosMemoria
+from modules.renderizador_graficos import RenderizadorGraficos
+from flask import send_from_directory, jsonify, make_response
 from modules.generador_reportes import GeneradorReportes, ReporteHTML, ReportePDF, CARPETA_REPORTES
+from modules.cola_reportes import ColaReportes
+from modules.trabajo_reporte import TERMINADO, ERROR
+from modules.repositorio_abstracto import Consulta
+from modules.config_db import engine
+from inicializar_db import migrar_esquema
 import os
+import re
 import datetime
-
-repo_usuarios = crear_repositorio_usuarios()
-repo_reclamos = crear_repositorio_reclamos()
-sistema = SubsistemaGestionReclamos(repo_usuarios, repo_reclamos)
-
-#print("Creando gestor de login...")
-gestor_login = GestorDeLogin(login_manager, repo_usuarios)
+import threading
+
+# Cantidad de reclamos que se muestran por página en los listados
+TAMANO_PAGINA_RECLAMOS = 50
+# Cantidad de reclamos que se leen de la BD por vez al generar un reporte
+TAMANO_PAGINA_REPORTE = 500
+# Reportes que se generan a la vez en segundo plano
+HILOS_REPORTES = int(os.environ.get("HILOS_REPORTES", "1"))
+# Estrategia de cada formato de reporte y tipo MIME de cada archivo que se puede descargar
+ESTRATEGIAS_REPORTE = {"html": ReporteHTML, "pdf": ReportePDF}
+TIPOS_MIME_REPORTES = {".html": "text/html", ".pdf": "application/pdf", ".zip": "application/zip"}
+# Con CLASIFICACION_ASINCRONICA=1 los reclamos se guardan sin esperar al clasificador
+# (se clasifican en segundo plano y mientras tanto quedan en la secretaría técnica).
+# Como al crear el reclamo todavía no se conoce su departamento, los similares que se le
+# ofrecen para adherirse son los pendientes más recientes de todos los departamentos.
+CLASIFICACION_ASINCRONICA = os.environ.get("CLASIFICACION_ASINCRONICA") == "1"
+# Procesos que dibujan los gráficos fuera de los pedidos, y cuánto espera un reporte por su gráfico
+PROCESOS_GRAFICOS = int(os.environ.get("PROCESOS_GRAFICOS", "1"))
+ESPERA_MAXIMA_GRAFICO_REPORTE = 60
+# Con GRAFICOS_EN_MEMORIA=1 los gráficos de /analitica no se escriben en static/graficos:
+# quedan en memoria y se sirven desde /graficos/<nombre>, en el formato de FORMATO_GRAFICOS (png o svg)
+GRAFICOS_EN_MEMORIA = os.environ.get("GRAFICOS_EN_MEMORIA") == "1"
+FORMATO_GRAFICOS = os.environ.get("FORMATO_GRAFICOS", "png")
+# Nombres de los gráficos de la cache (tipo_huella.formato)
+PATRON_NOMBRE_GRAFICO = re.compile(r"(estados|wordcloud)_[0-9a-f]{32}\.(png|svg)")
+# Los nombres salen de los datos del gráfico, así que el navegador puede guardarlos sin revalidar
+SEGUNDOS_CACHE_NAVEGADOR_GRAFICOS = 365 * 24 * 60 * 60
+
+# Lo que usan las rutas se crea en crear_app(), no al importar el módulo: los procesos que
+# dibujan los gráficos (con "spawn") vuelven a importar este archivo como __mp_main__, y no
+# deben abrir la BD ni cargar el sistema.
+repo_usuarios = None
+repo_reclamos = None
+instantanea_estadisticas = None
+cache_graficos_analitica = None
+cache_graficos_reportes = None
+renderizador_graficos = None
+triage = None
+sistema = None
+
+# Los decoradores de las rutas lo necesitan al importar; el repositorio se le asigna en crear_app()
+gestor_login = GestorDeLogin(login_manager)
+
+def crear_app():
+    """
+    Crea los repositorios, el sistema, las caches de gráficos y la cola de triage que usan
+    las rutas, y devuelve la app lista para atender pedidos.
+    """
+    global repo_usuarios, repo_reclamos, instantanea_estadisticas, cache_graficos_analitica
+    global cache_graficos_reportes, renderizador_graficos, triage, sistema
+    repo_usuarios = crear_repositorio_usuarios()
+    repo_reclamos = crear_repositorio_reclamos()
+    # Estadísticas que se mantienen al día con cada cambio (se construyen al arrancar el servidor;
+    # mientras tanto /analitica las calcula con consultas a la BD)
+    instantanea_estadisticas = InstantaneaEstadisticas()
+    # Gráficos guardados según sus datos: un tablero que no cambió reutiliza la imagen
+    if GRAFICOS_EN_MEMORIA:
+        cache_graficos_analitica = CacheGraficosMemoria(formato=FORMATO_GRAFICOS)
+    else:
+        cache_graficos_analitica = CacheGraficos(os.path.join("static", "graficos"))
+    # Los reportes incrustan los bytes del gráfico, así que no hace falta guardarlo en el disco
+    cache_graficos_reportes = CacheGraficosMemoria()
+    renderizador_graficos = RenderizadorGraficos(PROCESOS_GRAFICOS)
+    # Pendientes de cada departamento ordenados por prioridad (se construye al arrancar o con el primer pedido)
+    triage = ColaTriage()
+    sistema = SubsistemaGestionReclamos(repo_usuarios, repo_reclamos, clasificacion_asincronica=CLASIFICACION_ASINCRONICA,
+                                       instantanea_estadisticas=instantanea_estadisticas, triage=triage)
+    gestor_login.asignar_repositorio(repo_usuarios)
+    return app
 
 @app.context_processor
 def inject_gestor_login():
@@ -186,8 +257,11 @@ def crear_reclamo():
         # El formulario es válido, procesamos el contenido
         contenido = form.contenido.data
 
-        # Usamos el método del sistema para clasificar y buscar
-        reclamos_similares = sistema.buscar_reclamos_similares(contenido)
+        # Clasificamos UNA sola vez y reutilizamos el departamento en todo el flujo.
+        # En modo asincrónico no se clasifica acá (None): los similares se buscan en todos
+        # los departamentos y el clasificador deriva el reclamo después de guardarlo.
+        departamento = None if sistema.clasificacion_asincronica else sistema.clasificar_reclamo(contenido)
+        reclamos_similares = sistema.buscar_reclamos_similares(contenido, departamento)
 
         if not reclamos_similares:
             # No se encontraron similares
@@ -195,17 +269,22 @@ def crear_reclamo():
                 # Creamos el reclamo directamente
                 nuevo_reclamo = sistema.crear_reclamo(
                     usuario_creador=gestor_login.usuario_actual.entidad,
-                    contenido=contenido
+                    contenido=contenido,
+                    departamento=departamento
                 )
-                flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente y derivado a '{nuevo_reclamo.departamento}'.", "success")
+                if departamento is None:
+                    flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente. En breve será derivado al departamento correspondiente.", "success")
+                else:
+                    flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente y derivado a '{nuevo_reclamo.departamento}'.", "success")
                 return redirect(url_for('panel_principal')) # Volvemos al panel
             except Exception as e:
                 flash(f"Error al crear el reclamo: {e}", "danger")
 
         else:
             # ¡Se encontraron reclamos similares!
-            # Guardamos el contenido temporalmente en la sesión
+            # Guardamos el contenido (y su clasificación) temporalmente en la sesión
             session['reclamo_temporal'] = contenido
+            session['departamento_temporal'] = departamento
 
             # Mostramos la página de "confirmación"
             return render_template("confirmar_reclamo.html", 
@@ -225,6 +304,8 @@ def crear_reclamo_confirmado():
     """
     # Recuperamos el contenido del reclamo que guardamos temporalmente en la sesión
     contenido = session.pop('reclamo_temporal', None) 
+    # y el departamento con el que ya se clasificó (None fuerza a clasificar de nuevo)
+    departamento = session.pop('departamento_temporal', None)
     
     if not contenido:
         flash("Error: No hay un reclamo temporal para crear. Por favor, intente de nuevo.", "danger")
@@ -234,10 +315,14 @@ def crear_reclamo_confirmado():
         # Usamos el método 'crear_reclamo' del sistema
         nuevo_reclamo = sistema.crear_reclamo(
             usuario_creador=gestor_login.usuario_actual.entidad,
-            contenido=contenido
+            contenido=contenido,
+            departamento=departamento
         )
         session['prueba_manual'] = 'ESTO ES UNA PRUEBA DE SESION'
-        flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente y derivado a '{nuevo_reclamo.departamento}'.", "success")
+        if departamento is None and sistema.clasificacion_asincronica:
+            flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente. En breve será derivado al departamento correspondiente.", "success")
+        else:
+            flash(f"Reclamo #{nuevo_reclamo.id_reclamo} creado exitosamente y derivado a '{nuevo_reclamo.departamento}'.", "success")
     except Exception as e:
         flash(f"Error al crear el reclamo: {e}", "danger")
 
@@ -253,6 +338,7 @@ def adherir_reclamo(id_reclamo):
     """
     # Borramos el reclamo temporal de la sesión, ya que no lo vamos a crear
     session.pop('reclamo_temporal', None) 
+    session.pop('departamento_temporal', None)
     
     try:
         # Obtenemos la entidad del usuario actual
@@ -277,22 +363,24 @@ def listar_reclamos():
     """
     # Obtenemos el departamento del filtro (si existe en la URL)
     filtro_depto = request.args.get('departamento', None)
+    # Cursor de la página a mostrar (None es la primera página)
+    cursor = request.args.get('cursor', None)
 
-    lista_reclamos = []
-    if filtro_depto:
-        # Si hay un filtro, buscamos por ese departamento
-        lista_reclamos = sistema.buscar_reclamos_pendientes_por_departamento(filtro_depto)
-    else:
-        # Si no hay filtro, traemos todos los pendientes
-        lista_reclamos = sistema.buscar_reclamos_pendientes_todos()
+    try:
+        pagina = sistema.buscar_reclamos_pendientes_paginado(filtro_depto, TAMANO_PAGINA_RECLAMOS, cursor)
+    except ValueError:
+        # Cursor inválido o manipulado: volvemos a la primera página
+        return redirect(url_for('listar_reclamos', departamento=filtro_depto))
 
     # Lista de departamentos para armar los botones de filtro
     departamentos_posibles = ["soporte informático", "secretaría técnica", "maestranza"]
 
     return render_template("listar_reclamos.html", 
-                           reclamos=lista_reclamos,
+                           reclamos=pagina.elementos,
                            departamentos=departamentos_posibles,
-                           filtro_actual=filtro_depto)
+                           filtro_actual=filtro_depto,
+                           cursor_actual=cursor,
+                           cursor_siguiente=pagina.cursor_siguiente)
 
 
 @app.route("/mis_reclamos")
@@ -302,12 +390,15 @@ def mis_reclamos():
         # 1. Obtenemos la entidad del usuario actual
         usuario_actual = gestor_login.usuario_actual.entidad
 
-        # 2. Usamos el método del sistema para buscar sus reclamos
-        reclamos_del_usuario = sistema.listar_reclamos_usuario(usuario_actual)
+        # 2. Usamos el método del sistema para buscar una página de sus reclamos
+        cursor = request.args.get('cursor', None)
+        pagina = sistema.listar_reclamos_usuario_paginado(usuario_actual, TAMANO_PAGINA_RECLAMOS, cursor)
 
         # 3. Renderizamos la nueva plantilla
         return render_template("mis_reclamos.html", 
-                               reclamos=reclamos_del_usuario)
+                               reclamos=pagina.elementos,
+                               cursor_actual=cursor,
+                               cursor_siguiente=pagina.cursor_siguiente)
     except Exception as e:
         flash(f"Error al cargar tus reclamos: {e}", "danger")
         return redirect(url_for('panel_principal'))
@@ -322,33 +413,66 @@ def manejar_reclamos():
     Muestra una lista de reclamos filtrada por rol.
     - Jefes: Solo ven reclamos de su departamento.
     - Secretarios: Ven todos los reclamos.
-
+    Opcionalmente se filtra por fecha de creación con los parámetros 'desde' y 'hasta' (AAAA-MM-DD).
     """
     usuario_actual = gestor_login.usuario_actual
-    lista_reclamos = []
+    cursor = request.args.get('cursor', None)
+    fecha_desde = request.args.get('desde', '')
+    fecha_hasta = request.args.get('hasta', '')
+    consulta = Consulta()
 
     try:
         if usuario_actual.rol == 'jefe':
             # Un Jefe solo ve los reclamos de su departamento asignado [cite: 602]
-            lista_reclamos = repo_reclamos.obtener_todos_por_filtro(
-                departamento=usuario_actual.departamento
-            )
-        elif usuario_actual.rol == 'secretario':
-            # El Secretario Técnico puede ver todos los reclamos
-            lista_reclamos = repo_reclamos.obtener_todos()
+            consulta.donde(departamento=usuario_actual.departamento)
+        # El Secretario Técnico puede ver todos los reclamos (sin filtros)
+
+        # Ventana de fechas: se resuelve en la BD, no en Python
+        if fecha_desde or fecha_hasta:
+            desde = datetime.datetime.strptime(fecha_desde, '%Y-%m-%d') if fecha_desde else None
+            hasta = datetime.datetime.combine(
+                datetime.datetime.strptime(fecha_hasta, '%Y-%m-%d').date(), datetime.time.max
+            ) if fecha_hasta else None
+            consulta.entre("timestamp", desde, hasta)
 
-        # Ordenamos la lista por estado (ej. pendientes primero)
-        lista_reclamos.sort(key=lambda r: r.estado)
+        # La página ya viene ordenada por estado desde la BD
+        pagina = repo_reclamos.obtener_pagina_por_filtro(TAMANO_PAGINA_RECLAMOS, cursor, consulta)
 
         return render_template("manejar_reclamos.html", 
-                               reclamos=lista_reclamos, 
-                               usuario=usuario_actual)
+                               reclamos=pagina.elementos, 
+                               usuario=usuario_actual,
+                               fecha_desde=fecha_desde,
+                               fecha_hasta=fecha_hasta,
+                               cursor_actual=cursor,
+                               cursor_siguiente=pagina.cursor_siguiente)
 
     except Exception as e:
         flash(f"Error al cargar los reclamos: {e}", "danger")
         return redirect(url_for('panel_principal'))
 
 
+@app.route("/triage_reclamos")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe'])
+def triage_reclamos():
+    """
+    Muestra los reclamos pendientes del departamento del jefe, de mayor a menor prioridad
+    (más adherentes y más antigüedad primero). El orden lo mantiene la cola de triage,
+    así que no se ordena la lista completa en cada pedido.
+    """
+    usuario_actual = gestor_login.usuario_actual
+    try:
+        reclamos = sistema.listar_triage(usuario_actual.departamento, TAMANO_PAGINA_RECLAMOS)
+        return render_template("triage_reclamos.html",
+                               reclamos=reclamos,
+                               usuario=usuario_actual,
+                               total_pendientes=triage.tamano(usuario_actual.departamento),
+                               dias_por_adherente=DIAS_POR_ADHERENTE)
+    except Exception as e:
+        flash(f"Error al cargar los reclamos: {e}", "danger")
+        return redirect(url_for('manejar_reclamos'))
+
+
 @app.route("/editar_estado/<int:id_reclamo>", methods=["GET", "POST"])
 @gestor_login.se_requiere_login
 @gestor_login.rol_requerido(roles_permitidos=['jefe'])
@@ -470,6 +594,54 @@ def derivar_reclamo(id_reclamo):
         
     return render_template("derivar_reclamo.html", reclamo=reclamo, form=form)
 
+def grafico_para_plantilla(pedido):
+    """
+    Convierte lo que devuelve RenderizadorGraficos.solicitar ((referencia, listo) o None) en
+    lo que usa analitica.html: la URL de la imagen, si ya está lista y dónde consultar su estado.
+    """
+    if pedido is None:
+        return None
+    referencia, listo = pedido
+    nombre = os.path.basename(referencia)
+    if isinstance(cache_graficos_analitica, CacheGraficosMemoria):
+        url = url_for('ver_grafico', nombre=nombre)
+    else:
+        url = url_for('static', filename=f"graficos/{nombre}")
+    return {
+        "listo": listo,
+        "url": url,
+        "url_estado": url_for('estado_grafico', nombre=nombre),
+    }
+
+
+@app.route("/graficos/<string:nombre>")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def ver_grafico(nombre):
+    """Sirve un gráfico de /analitica guardado en memoria (con GRAFICOS_EN_MEMORIA=1)."""
+    if not PATRON_NOMBRE_GRAFICO.fullmatch(nombre) or not isinstance(cache_graficos_analitica, CacheGraficosMemoria):
+        return "Gráfico no encontrado.", 404
+    contenido = cache_graficos_analitica.obtener_contenido(nombre)
+    if contenido is None:
+        return "Gráfico no encontrado.", 404
+    respuesta = make_response(contenido)
+    respuesta.mimetype = cache_graficos_analitica.tipo_mime
+    respuesta.cache_control.private = True
+    respuesta.cache_control.max_age = SEGUNDOS_CACHE_NAVEGADOR_GRAFICOS
+    return respuesta
+
+
+@app.route("/graficos/estado/<string:nombre>")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def estado_grafico(nombre):
+    """Indica si un gráfico de /analitica ya se terminó de dibujar ("listo", "pendiente" o "sin_grafico")."""
+    if not PATRON_NOMBRE_GRAFICO.fullmatch(nombre):
+        return jsonify({"error": "Nombre de gráfico inválido."}), 404
+    referencia = cache_graficos_analitica.referencia_de_nombre(nombre)
+    return jsonify({"estado": renderizador_graficos.estado(cache_graficos_analitica, referencia)})
+
+
 @app.route("/analitica")
 @gestor_login.se_requiere_login
 @gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
@@ -479,168 +651,235 @@ def analitica():
     Muestra estadísticas sobre los reclamos y genera el gráfico y la nube de palabras.
     """
     usuario_actual = gestor_login.usuario_actual
-    reclamos_a_procesar = []
+    departamento_filtro = None # None = todos los departamentos
     departamento_titulo = ""
-    ruta_web_grafico_final = None 
-    ruta_web_wordcloud_final = None # <-- NUEVA RUTA PARA WORDCLOUD
 
     try:
         # Filtramos los reclamos según el rol (código existente)
         if usuario_actual.rol == 'jefe':
             departamento_titulo = usuario_actual.departamento.title()
-            reclamos_a_procesar = repo_reclamos.obtener_todos_por_filtro(
-                departamento=usuario_actual.departamento
-            )
+            departamento_filtro = usuario_actual.departamento
         elif usuario_actual.rol == 'secretario':
             departamento_titulo = "Todos los Departamentos"
-            reclamos_a_procesar = repo_reclamos.obtener_todos()
+
+        # Calculamos las estadísticas (con consultas de agregación, sin cargar los reclamos)
+        generador_stats = crear_generador_estadisticas(repo_reclamos, departamento_filtro, instantanea_estadisticas)
+        stats_porcentaje = generador_stats.calcular_porcentajes_estado()
 
         # Si no hay reclamos, salimos pronto
-        if not reclamos_a_procesar:
+        if stats_porcentaje["total"] == 0:
             return render_template("analitica.html", 
                                    departamento=departamento_titulo, 
                                    stats_porcentaje={"total": 0}, 
                                    stats_mediana=0, 
                                    stats_palabras=[])
 
-        # Calculamos las estadísticas
-        generador_stats = GeneradorEstadisticas(reclamos_a_procesar)
-        stats_porcentaje = generador_stats.calcular_porcentajes_estado()
         stats_mediana = generador_stats.calcular_mediana_tiempos_resolucion()
+        stats_percentiles = generador_stats.calcular_percentiles_tiempos_resolucion(PERCENTILES_TIEMPOS)
         stats_palabras = generador_stats.calcular_palabras_frecuentes(50) # Top 50 para mejor nube
         
         # ----------------------------------------------------
-        # --- GENERACIÓN DEL GRÁFICO CIRCULAR (EXISTENTE) ---
+        # --- GRÁFICO CIRCULAR Y NUBE DE PALABRAS ---
         # ----------------------------------------------------
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        nombre_archivo_grafico = f"grafico_estados_{usuario_actual.rol}_{timestamp}.png"
-        ruta_guardado_grafico = os.path.join("static", "graficos", nombre_archivo_grafico)
-        
-        if Graficador.generar_grafico_estados(stats_porcentaje, ruta_guardado_grafico):
-            ruta_web_grafico_final = os.path.join("graficos", nombre_archivo_grafico).replace('\\', '/')
-        
-        # --------------------------------------------------------
-        # --- NUEVO: GENERACIÓN DE LA NUBE DE PALABRAS (WORD CLOUD) ---
-        # --------------------------------------------------------
-        nombre_archivo_wordcloud = f"wordcloud_{usuario_actual.rol}_{timestamp}.png"
-        ruta_guardado_wordcloud = os.path.join("static", "graficos", nombre_archivo_wordcloud)
-        
-        if stats_palabras and Graficador.generar_wordcloud(stats_palabras, ruta_guardado_wordcloud):
-            # La ruta que pasamos al template debe ser relativa a la carpeta 'static'
-            ruta_web_wordcloud_final = os.path.join("graficos", nombre_archivo_wordcloud).replace('\\', '/')
-        # --------------------------------------------------------
-
+        # Si los datos no cambiaron se reutiliza la imagen; si no, se dibuja en otro proceso
+        # y la página lo pide a /graficos/estado hasta que esté listo
+        grafico_estados = grafico_para_plantilla(
+            renderizador_graficos.solicitar(cache_graficos_analitica, "estados", stats_porcentaje))
+        grafico_wordcloud = grafico_para_plantilla(
+            renderizador_graficos.solicitar(cache_graficos_analitica, "wordcloud", stats_palabras))
 
         return render_template("analitica.html",
                                departamento=departamento_titulo,
                                stats_porcentaje=stats_porcentaje,
                                stats_mediana=stats_mediana,
+                               stats_percentiles=stats_percentiles,
+                               percentiles=PERCENTILES_TIEMPOS,
                                stats_palabras=stats_palabras,
-                               ruta_grafico=ruta_web_grafico_final,
-                               ruta_wordcloud=ruta_web_wordcloud_final) # <-- NUEVO PARÁMETRO
+                               grafico_estados=grafico_estados,
+                               grafico_wordcloud=grafico_wordcloud)
 
     except Exception as e:
         flash(f"Error al generar las estadísticas: {e}", "danger")
         return redirect(url_for('panel_principal'))
     
 
-@app.route("/generar_reporte/<string:formato>")
-@gestor_login.se_requiere_login
-@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
-def generar_reporte(formato):
+def generar_archivo_reporte(trabajo):
     """
-    Ruta para la Opción 3 del Admin: "Generar Reporte".
-    Genera un archivo HTML o PDF y lo ofrece para descargar.
+    Genera el archivo de un trabajo de reporte y devuelve su ruta. La llama ColaReportes
+    desde su propio hilo, así que usa un repositorio de reclamos (una sesión) propio.
     """
-    usuario_actual = gestor_login.usuario_actual
-    reclamos_a_procesar = []
-    departamento_titulo = ""
-    
-    # 1. Obtener los reclamos y calcular estadísticas
-    if usuario_actual.rol == 'jefe':
-        departamento_titulo = usuario_actual.departamento
-        reclamos_a_procesar = repo_reclamos.obtener_todos_por_filtro(
-            departamento=usuario_actual.departamento
-        )
-    elif usuario_actual.rol == 'secretario':
-        departamento_titulo = "Sistema Completo"
-        reclamos_a_procesar = repo_reclamos.obtener_todos()
-
-    # 2. Calcular las estadísticas 
-    stats_porcentaje = {"total": 0}
-    stats_mediana = 0
+    repo_reclamos_trabajo = crear_repositorio_reclamos()
+    try:
+        departamento_filtro = trabajo.departamento # None = todos los departamentos
+        departamento_titulo = departamento_filtro or "Sistema Completo"
+        filtros_reclamos = {"departamento": departamento_filtro} if departamento_filtro else {}
 
-    if reclamos_a_procesar:
-        generador_stats = GeneradorEstadisticas(reclamos_a_procesar)
+        # 1. Calcular las estadísticas (con consultas de agregación sobre la BD)
+        generador_stats = crear_generador_estadisticas(repo_reclamos_trabajo, departamento_filtro, instantanea_estadisticas)
         stats_porcentaje = generador_stats.calcular_porcentajes_estado()
-        stats_mediana = generador_stats.calcular_mediana_tiempos_resolucion()
+        stats_mediana = 0
+        stats_percentiles = {}
 
-    estadisticas_completas = {
-        **stats_porcentaje,
-        "mediana_tiempos": stats_mediana
-    }
+        if stats_porcentaje.get("total", 0) > 0:
+            stats_mediana = generador_stats.calcular_mediana_tiempos_resolucion()
+            stats_percentiles = generador_stats.calcular_percentiles_tiempos_resolucion(PERCENTILES_TIEMPOS)
 
-    # --- 3. GENERACIÓN Y ASIGNACIÓN DEL GRÁFICO PARA EL REPORTE ---
-    ruta_relativa_grafico = None 
+        estadisticas_completas = {
+            **stats_porcentaje,
+            "mediana_tiempos": stats_mediana,
+            "percentiles_tiempos": stats_percentiles
+        }
+
+        # --- 2. GENERACIÓN Y ASIGNACIÓN DEL GRÁFICO PARA EL REPORTE ---
+        bytes_grafico = None 
     
-    if estadisticas_completas.get('total', 0) > 0:
-        
-        # Las líneas que garantizan la carpeta (asumiendo importación de CARPETA_REPORTES)
-        CARPETA_GRAFICOS_REPORTES = os.path.join(CARPETA_REPORTES, "graficos")
-        os.makedirs(CARPETA_GRAFICOS_REPORTES, exist_ok=True)
-        
-        timestamp_reporte = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        nombre_archivo_grafico = f"grafico_estados_{usuario_actual.rol}_{timestamp_reporte}.png"
-        ruta_guardado_grafico = os.path.join(CARPETA_GRAFICOS_REPORTES, nombre_archivo_grafico) 
+        if estadisticas_completas.get('total', 0) > 0:
         
-        try:
-            # Intentamos generar el gráfico y capturamos su ruta de retorno (o None)
-            ruta_retorno = Graficador.generar_grafico_estados(stats_porcentaje, ruta_guardado_grafico)
+            try:
+                # Se reutiliza el gráfico si otro reporte ya lo dibujó con los mismos datos;
+                # si no, se dibuja en el proceso de gráficos y el reporte lo espera
+                bytes_grafico = renderizador_graficos.obtener_contenido(cache_graficos_reportes, "estados", stats_porcentaje,
+                                                                       ESPERA_MAXIMA_GRAFICO_REPORTE)
             
-            if ruta_retorno is not None:
-                # Si se generó, asignamos la ruta relativa
-                ruta_relativa_grafico = os.path.join("graficos", nombre_archivo_grafico).replace('\\', '/')
-                print(f"DIAGNÓSTICO: Gráfico guardado con éxito en: {ruta_guardado_grafico}")
-            else:
-                print("DIAGNÓSTICO: Graficador retornó None (posiblemente porque no había datos > 0).")
+                if bytes_grafico is None:
+                    print("DIAGNÓSTICO: Graficador retornó None (posiblemente porque no había datos > 0).")
 
-        except Exception as e:
-            # Si hay un error de Matplotlib o permisos, lo imprimimos
-            print(f"ERROR CRÍTICO AL GENERAR EL GRÁFICO: {e}")
-            ruta_relativa_grafico = None # Aseguramos que no se pase una ruta inválida
+            except Exception as e:
+                # Si hay un error de Matplotlib, lo imprimimos
+                print(f"ERROR CRÍTICO AL GENERAR EL GRÁFICO: {e}")
+                bytes_grafico = None # Aseguramos que no se pase un gráfico inválido
+
+        # El PNG va en memoria: el reporte lo incrusta sin leerlo del disco
+        estadisticas_completas["grafico_bytes"] = bytes_grafico
+
+        # 3. Generar el reporte con la estrategia del formato pedido. Los reclamos se leen de a
+        # páginas y las estrategias los escriben a medida que llegan.
+        generador = GeneradorReportes(ESTRATEGIAS_REPORTE[trabajo.formato]())
+        return generador.generar_reporte(
+            lista_reclamos=repo_reclamos_trabajo.iterar_por_filtro(TAMANO_PAGINA_REPORTE, **filtros_reclamos),
+            estadisticas=estadisticas_completas,
+            departamento=departamento_titulo,
+            identificador=trabajo.id_trabajo, # Un archivo por trabajo: dos reportes nunca comparten nombre
+        )
+    finally:
+        # Los hilos del pool viven mucho: la sesión no debe quedar abierta entre trabajos
+        repo_reclamos_trabajo.cerrar()
+
+
+# Los reportes se generan en segundo plano; los pedidos iguales comparten el trabajo.
+# La cola se crea con el primer pedido: importar este módulo (en las pruebas, en otra
+# herramienta) no debe tocar los trabajos de reportes.
+cola_reportes = None
+lock_cola_reportes = threading.Lock()
+
+
+def obtener_cola_reportes() -> ColaReportes:
+    """Devuelve la cola de reportes del servidor, creándola la primera vez."""
+    global cola_reportes
+    with lock_cola_reportes:
+        if cola_reportes is None:
+            cola_reportes = ColaReportes(generar_archivo_reporte, cantidad_hilos=HILOS_REPORTES)
+        return cola_reportes
+
+
+def datos_trabajo_reporte(trabajo) -> dict:
+    """Lo que devuelven las rutas de reportes en JSON sobre un trabajo."""
+    datos = {
+        "id_trabajo": trabajo.id_trabajo,
+        "estado": trabajo.estado,
+        "formato": trabajo.formato,
+        "url_estado": url_for('estado_trabajo_reporte', id_trabajo=trabajo.id_trabajo),
+    }
+    if trabajo.estado == TERMINADO:
+        datos["url_descarga"] = url_for('descargar_reporte', id_trabajo=trabajo.id_trabajo)
+    elif trabajo.estado == ERROR:
+        datos["error"] = trabajo.mensaje_error
+    return datos
 
-    # Asignamos la ruta (será la ruta relativa o None)
-    estadisticas_completas["ruta_grafico"] = ruta_relativa_grafico
-    
 
-    # 4. Elegir la Estrategia de Reporte
-    if formato.lower() == 'html':
-        estrategia = ReporteHTML()
-        mimetype = 'text/html'
-    elif formato.lower() == 'pdf':
-        estrategia = ReportePDF()
-        mimetype = 'application/pdf'
-    else:
+def obtener_trabajo_reporte_del_usuario(id_trabajo: str):
+    """
+    Devuelve el trabajo si el usuario actual puede verlo (es del mismo rol y departamento
+    que lo pidió), o None.
+    """
+    trabajo = obtener_cola_reportes().obtener(id_trabajo)
+    if trabajo is None:
+        return None
+    usuario_actual = gestor_login.usuario_actual
+    departamento = usuario_actual.departamento if usuario_actual.rol == 'jefe' else None
+    if (trabajo.rol, trabajo.departamento) != (usuario_actual.rol, departamento):
+        return None
+    return trabajo
+
+
+@app.route("/generar_reporte/<string:formato>")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def generar_reporte(formato):
+    """
+    Ruta para la Opción 3 del Admin: "Generar Reporte".
+    Encola la generación del reporte HTML o PDF y lleva a la página del trabajo, que ofrece
+    el archivo para descargar cuando está listo. Si se pide JSON, devuelve el id del trabajo.
+    """
+    formato = formato.lower()
+    if formato not in ESTRATEGIAS_REPORTE:
         flash("Formato de reporte no válido.", "danger")
         return redirect(url_for('panel_principal'))
 
-    # 5. Generar el reporte
-    generador = GeneradorReportes(estrategia)
-    ruta_archivo_generado = generador.generar_reporte(
-        lista_reclamos=reclamos_a_procesar,
-        estadisticas=estadisticas_completas,
-        departamento=departamento_titulo,
-    )
+    usuario_actual = gestor_login.usuario_actual
+    departamento = usuario_actual.departamento if usuario_actual.rol == 'jefe' else None
+    try:
+        trabajo = obtener_cola_reportes().solicitar(usuario_actual.rol, departamento, formato, sistema.version_datos)
+    except Exception as e:
+        flash(f"Error al pedir el reporte: {e}", "danger")
+        return redirect(url_for('panel_principal'))
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(datos_trabajo_reporte(trabajo)), 202
+    return redirect(url_for('estado_reporte', id_trabajo=trabajo.id_trabajo))
 
-    # 6. Ofrecer el archivo para descargar 
-    directorio = os.path.abspath("reportes")
-    nombre_archivo = os.path.basename(ruta_archivo_generado)
 
+@app.route("/reportes/<string:id_trabajo>")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def estado_reporte(id_trabajo):
+    """Página de un reporte pedido: muestra su estado y el enlace de descarga cuando está listo."""
+    trabajo = obtener_trabajo_reporte_del_usuario(id_trabajo)
+    if trabajo is None:
+        flash("El reporte no existe.", "danger")
+        return redirect(url_for('panel_principal'))
+    return render_template("estado_reporte.html", trabajo=trabajo, datos=datos_trabajo_reporte(trabajo))
+
+
+@app.route("/reportes/<string:id_trabajo>/estado")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def estado_trabajo_reporte(id_trabajo):
+    """Estado de un reporte pedido en JSON ("pendiente", "en_proceso", "terminado" o "error")."""
+    trabajo = obtener_trabajo_reporte_del_usuario(id_trabajo)
+    if trabajo is None:
+        return jsonify({"error": "El reporte no existe."}), 404
+    return jsonify(datos_trabajo_reporte(trabajo))
+
+
+@app.route("/reportes/<string:id_trabajo>/descargar")
+@gestor_login.se_requiere_login
+@gestor_login.rol_requerido(roles_permitidos=['jefe', 'secretario'])
+def descargar_reporte(id_trabajo):
+    """Ofrece para descargar el archivo de un reporte terminado."""
+    trabajo = obtener_trabajo_reporte_del_usuario(id_trabajo)
+    if trabajo is None or trabajo.estado != TERMINADO or not os.path.exists(trabajo.ruta_archivo):
+        flash("El reporte no está disponible para descargar.", "warning")
+        return redirect(url_for('estado_reporte', id_trabajo=id_trabajo) if trabajo else url_for('panel_principal'))
+
+    nombre_archivo = os.path.basename(trabajo.ruta_archivo)
+    _, extension = os.path.splitext(nombre_archivo)
     return send_from_directory(
-        directory=directorio,
+        directory=os.path.abspath(os.path.dirname(trabajo.ruta_archivo)),
         path=nombre_archivo,
         as_attachment=True,
-        mimetype=mimetype # Aseguramos el mimetype correcto para la descarga
+        # Un PDF muy grande se entrega en partes dentro de un .zip
+        mimetype=TIPOS_MIME_REPORTES.get(extension, 'application/octet-stream')
     )
 
 @app.route("/ayuda")
@@ -657,9 +896,23 @@ def ayuda():
 
 # --- Punto de entrada para ejecutar la aplicación ---
 if __name__ == "__main__":
-    print("Creando gestor de login...")
-
+    # Una BD creada con una versión anterior puede no tener los índices de los listados
+    # ni la versión de los datos: se crean acá, una vez por arranque (lo que existe se omite)
+    print("Verificando el esquema de la BD...")
+    migrar_esquema(engine)
+    print("Creando el sistema de gestión de reclamos...")
+    crear_app()
     inicializar_personal()
+    # Cargamos el clasificador (y spaCy) una sola vez, antes de atender pedidos
+    print("Cargando el clasificador de reclamos...")
+    precargar_modelo()
+    print("Calculando las estadísticas de los reclamos...")
+    sistema.reconstruir_estadisticas()
+    sistema.reconstruir_triage()
+    # Los reportes que dejó a medias un servidor anterior ya no los va a generar nadie
+    interrumpidos = obtener_cola_reportes().interrumpir_inconclusos()
+    if interrumpidos:
+        print(f"Se marcaron {interrumpidos} reportes inconclusos como fallidos.")
     # debug=True reinicia el servidor automáticamente con cada cambio
     # host='0.0.0.0' permite que sea accesible desde la red local
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False, threaded=False)
\ No newline at end of file
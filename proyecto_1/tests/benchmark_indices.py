@@ -0,0 +1,100 @@
+# Benchmark de los índices de la tabla de reclamos.
+# Arma una BD SQLite temporal con reclamos sintéticos y muestra el plan de consulta
+# (EXPLAIN QUERY PLAN) y el tiempo de las consultas de los listados, antes y después
+# de correr la migración de índices de inicializar_db.py.
+#
+# Uso (desde proyecto_1):  python -m tests.benchmark_indices [cantidad_reclamos]
+import sys
+import os
+import time
+import random
+import datetime
+import tempfile
+
+from sqlalchemy import create_engine, text, insert
+
+from modules.modelos_db import Base, ModeloUsuario, ModeloReclamo, asociacion_reclamos_adherentes
+from inicializar_db import migrar_indices
+
+DEPARTAMENTOS = ["secretaría técnica", "soporte informático", "maestranza"]
+ESTADOS = ["pendiente", "en proceso", "resuelto", "inválido"]
+
+# Consultas equivalentes a las que generan los listados de server.py (primera página de 50)
+CONSULTAS = {
+    "listar_reclamos (pendientes por depto)":
+        "SELECT id FROM reclamos WHERE estado = 'pendiente' AND departamento = 'maestranza' "
+        "ORDER BY estado, timestamp, id LIMIT 51",
+    "listar_reclamos (todos los pendientes)":
+        "SELECT id FROM reclamos WHERE estado = 'pendiente' ORDER BY estado, timestamp, id LIMIT 51",
+    "manejar_reclamos (jefe)":
+        "SELECT id FROM reclamos WHERE departamento = 'maestranza' ORDER BY estado, timestamp, id LIMIT 51",
+    "mis_reclamos":
+        "SELECT id FROM reclamos WHERE id_usuario_creador = 7 ORDER BY estado, timestamp, id LIMIT 51",
+    "adherentes de un reclamo":
+        "SELECT usuario_id FROM reclamos_adherentes WHERE reclamo_id = 1234",
+}
+
+
+def poblar(motor, cantidad_reclamos: int, cantidad_usuarios: int = 500):
+    """Inserta usuarios, reclamos y adherentes sintéticos."""
+    aleatorio = random.Random(42)
+    base = datetime.datetime(2024, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(ModeloUsuario), [
+            dict(id=i, nombre="N", apellido="A", email=f"u{i}@mail.com", nombre_usuario=f"u{i}",
+                 claustro="estudiante", contrasena="x", rol="final")
+            for i in range(1, cantidad_usuarios + 1)
+        ])
+        conexion.execute(insert(ModeloReclamo), [
+            dict(id=i, contenido=f"reclamo {i}", departamento=aleatorio.choice(DEPARTAMENTOS),
+                 timestamp=base + datetime.timedelta(minutes=i), estado=aleatorio.choice(ESTADOS),
+                 id_usuario_creador=aleatorio.randint(1, cantidad_usuarios))
+            for i in range(1, cantidad_reclamos + 1)
+        ])
+        conexion.execute(insert(asociacion_reclamos_adherentes), [
+            dict(usuario_id=u, reclamo_id=r)
+            for r, u in {(aleatorio.randint(1, cantidad_reclamos), aleatorio.randint(1, cantidad_usuarios))
+                         for _ in range(cantidad_reclamos)}
+        ])
+
+
+def medir(motor, titulo: str, repeticiones: int = 20):
+    print(f"\n=== {titulo} ===")
+    with motor.connect() as conexion:
+        for nombre, sql in CONSULTAS.items():
+            plan = [fila[-1] for fila in conexion.execute(text("EXPLAIN QUERY PLAN " + sql))]
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                conexion.execute(text(sql)).fetchall()
+            ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+            print(f"- {nombre}: {ms:.2f} ms")
+            for paso in plan:
+                print(f"    {paso}")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    ruta = os.path.join(tempfile.mkdtemp(), "benchmark_indices.db")
+    motor = create_engine(f"sqlite:///{ruta}")
+
+    # Simulamos una BD creada antes de los índices: creamos las tablas y los quitamos
+    Base.metadata.create_all(bind=motor)
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.drop(bind=motor)
+
+    print(f"Poblando {cantidad} reclamos en {ruta} ...")
+    poblar(motor, cantidad)
+    medir(motor, "ANTES de la migración")
+
+    migrar_indices(motor)
+    with motor.begin() as conexion:
+        conexion.execute(text("ANALYZE"))
+    medir(motor, "DESPUÉS de la migración")
+
+    motor.dispose()
+    os.remove(ruta)
+
+
+if __name__ == "__main__":
+    main()
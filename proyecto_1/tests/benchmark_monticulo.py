@@ -0,0 +1,89 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning) 
+warnings.filterwarnings("ignore", category=ResourceWarning) 
+warnings.filterwarnings("ignore", category=UserWarning)
+# Benchmark de los montículos: MonticuloBinario (Python puro, con _comparar) contra los
+# basados en heapq, insertando de a uno y construyendo con desde_lista.
+# Cada prueba verifica que las dos implementaciones den el mismo resultado y muestra los tiempos.
+#
+# Uso (desde proyecto_1):  python -m tests.benchmark_monticulo
+# (no empieza con test_, así que no se ejecuta junto con las pruebas unitarias)
+import time
+import random
+import unittest
+from modules.monticulo import MonticuloMinimos, MonticuloMaximos, MonticuloMinimosRapido, MonticuloMaximosRapido
+from modules.calculadora_mediana import MonticuloMediana
+
+CANTIDAD = 200_000
+
+
+def medir(funcion):
+    """Ejecuta la función y devuelve (resultado, milisegundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def insertar_y_vaciar(clase, valores):
+    monticulo = clase()
+    for valor in valores:
+        monticulo.insertar(valor)
+    return [monticulo.eliminar_raiz() for _ in valores]
+
+
+def construir_y_vaciar(clase, valores):
+    monticulo = clase.desde_lista(valores)
+    return [monticulo.eliminar_raiz() for _ in valores]
+
+
+class BenchmarkMonticulo(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        aleatorio = random.Random(42)
+        cls.valores = [aleatorio.randint(1, 1_000_000) for _ in range(CANTIDAD)]
+        print(f"\n{CANTIDAD} valores")
+
+    def comparar(self, nombre, funcion, lento, rapido):
+        resultado_lento, ms_lento = medir(lambda: funcion(lento, self.valores))
+        resultado_rapido, ms_rapido = medir(lambda: funcion(rapido, self.valores))
+        print(f"- {nombre}: {lento.__name__} {ms_lento:.0f} ms | {rapido.__name__} {ms_rapido:.0f} ms "
+              f"(x{ms_lento / ms_rapido:.1f})")
+        self.assertEqual(resultado_lento, resultado_rapido) #Ambas implementaciones deben coincidir
+
+    def test_insertar_y_vaciar_minimos(self):
+        """Inserta de a uno y vacía un montículo de mínimos."""
+        self.comparar("insertar + vaciar", insertar_y_vaciar, MonticuloMinimos, MonticuloMinimosRapido)
+
+    def test_insertar_y_vaciar_maximos(self):
+        """Inserta de a uno y vacía un montículo de máximos."""
+        self.comparar("insertar + vaciar", insertar_y_vaciar, MonticuloMaximos, MonticuloMaximosRapido)
+
+    def test_desde_lista_contra_insertar(self):
+        """Construcción en O(n) contra n inserciones, en el mismo MonticuloBinario."""
+        monticulo = MonticuloMinimos()
+        _, ms_insertar = medir(lambda: [monticulo.insertar(valor) for valor in self.valores])
+        construido, ms_desde_lista = medir(lambda: MonticuloMinimos.desde_lista(self.valores))
+        _, ms_heapify = medir(lambda: MonticuloMinimosRapido.desde_lista(self.valores))
+        print(f"- construir: {CANTIDAD} inserciones {ms_insertar:.0f} ms | desde_lista {ms_desde_lista:.0f} ms | "
+              f"heapify (heapq) {ms_heapify:.0f} ms")
+        self.assertEqual(construido.obtener_raiz(), min(self.valores))
+
+    def test_construir_y_vaciar(self):
+        """desde_lista y vaciado con ambas implementaciones."""
+        self.comparar("desde_lista + vaciar", construir_y_vaciar, MonticuloMinimos, MonticuloMinimosRapido)
+
+    def test_mediana(self):
+        """MonticuloMediana con los montículos de Python puro y con los de heapq."""
+        def mediana(rapido):
+            calculadora = MonticuloMediana(rapido=rapido)
+            for valor in self.valores:
+                calculadora.agregar_numero(valor)
+            return calculadora.obtener_mediana()
+        lenta, ms_lenta = medir(lambda: mediana(False))
+        rapida, ms_rapida = medir(lambda: mediana(True))
+        print(f"- MonticuloMediana: {ms_lenta:.0f} ms | rapido=True {ms_rapida:.0f} ms (x{ms_lenta / ms_rapida:.1f})")
+        self.assertEqual(lenta, rapida)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
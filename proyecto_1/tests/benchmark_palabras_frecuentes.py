@@ -0,0 +1,66 @@
+# Benchmark del conteo de palabras frecuentes (nube de palabras de /analitica).
+# Compara el algoritmo anterior (une todos los reclamos en un texto y lo recorre caracter
+# por caracter) con el actual (expresión regular, reclamo por reclamo) y verifica que
+# los dos den el mismo resultado.
+#
+# Uso (desde proyecto_1):  python -m tests.benchmark_palabras_frecuentes [cantidad_reclamos]
+import sys
+import time
+import random
+from collections import Counter
+
+from modules.estadisticas import _palabras_frecuentes, STOPWORDS
+
+PALABRAS = [
+    "computadora", "proyector", "aula", "baño", "luz", "enchufe", "lámpara", "rota", "sucio",
+    "pasillo", "señalización", "compañía", "internet", "lenta", "no", "funciona", "la", "el",
+    "del", "está", "hay", "muy", "desde", "ayer", "laboratorio", "ventana", "puerta", "¡urgente!",
+]
+
+
+def palabras_frecuentes_anterior(textos, cantidad: int):
+    """Algoritmo anterior, tal como estaba en estadisticas.py."""
+    lista_stopwords = list(STOPWORDS) # Antes STOPWORDS era una lista
+    texto_completo = " ".join(textos).lower()
+    caracteres_permitidos = "abcdefghijklmnopqrstuvwxyzáéíóúñ "
+    lista_caracteres_limpios = []
+    for caracter in texto_completo:
+        if caracter in caracteres_permitidos:
+            lista_caracteres_limpios.append(caracter)
+        else:
+            lista_caracteres_limpios.append(' ')
+    texto_limpio = "".join(lista_caracteres_limpios)
+    palabras = [
+        palabra for palabra in texto_limpio.split()
+        if palabra not in lista_stopwords and len(palabra) > 2
+    ]
+    return Counter(palabras).most_common(cantidad)
+
+
+def generar_reclamos(cantidad: int) -> list[str]:
+    aleatorio = random.Random(42)
+    return [
+        " ".join(aleatorio.choice(PALABRAS) for _ in range(aleatorio.randint(5, 25))) + f". Aula {i % 40}."
+        for i in range(cantidad)
+    ]
+
+
+def medir(nombre: str, funcion, textos):
+    inicio = time.perf_counter()
+    resultado = funcion(textos, 50)
+    print(f"- {nombre}: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    textos = generar_reclamos(cantidad)
+    print(f"Contando palabras de {cantidad} reclamos ...")
+    anterior = medir("anterior (caracter por caracter)", palabras_frecuentes_anterior, textos)
+    # El actual recibe un generador, como cuando lee los reclamos de la BD
+    actual = medir("actual (regex, reclamo por reclamo)", lambda t, c: _palabras_frecuentes(iter(t), c), textos)
+    print("Resultados iguales:", anterior == actual)
+
+
+if __name__ == "__main__":
+    main()
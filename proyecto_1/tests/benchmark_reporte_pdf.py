@@ -0,0 +1,84 @@
+# Benchmark del reporte PDF con muchos reclamos.
+# Compara el armado anterior de las filas (multi_cell + set_xy + celdas extra, con el salto
+# de página automático cortando filas) con ReportePDF, que calcula la altura de cada fila
+# antes de dibujarla y divide los reportes grandes en partes.
+#
+# Uso (desde proyecto_1):  python -m tests.benchmark_reporte_pdf [cantidad_reclamos]
+import os
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from unittest import mock
+
+from fpdf import FPDF
+
+from modules import generador_reportes
+from modules.generador_reportes import ReportePDF
+from modules.reclamo import Reclamo
+from modules.usuario import Usuario
+
+PALABRAS = ["computadora", "proyector", "aula", "baño", "luz", "enchufe", "rota", "sucio", "pasillo",
+            "internet", "lenta", "no", "funciona", "desde", "ayer", "laboratorio", "ventana", "puerta"]
+ESTADISTICAS = {"total": 0, "pendientes": 100.0, "en_proceso": 0.0, "resueltos": 0.0, "mediana_tiempos": 0}
+
+
+def generar_reclamos(cantidad: int):
+    """Genera los reclamos de a uno, como IRepositorio.iterar_por_filtro."""
+    aleatorio = random.Random(42)
+    usuario = Usuario("Ana", "Pérez", "ana@uner.edu.ar", "anaperez", "estudiante", "clave", id_bd=1)
+    for i in range(cantidad):
+        contenido = " ".join(aleatorio.choice(PALABRAS) for _ in range(aleatorio.randint(5, 60)))
+        reclamo = Reclamo(usuario, contenido, "maestranza")
+        reclamo.id_reclamo = i + 1
+        yield reclamo
+
+
+def pdf_anterior(reclamos, ruta: str):
+    """Filas del reporte tal como se armaban antes en ReportePDF.generar."""
+    pdf = FPDF(orientation='P', unit='mm', format='A4')
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Helvetica", '', 8)
+    ancho_celda, alto_celda = 190, 6
+    for reclamo in list(reclamos): # Antes se recibía la lista completa
+        contenido = reclamo.contenido.encode('latin-1', 'replace').decode('latin-1')
+        y_inicial_fila = pdf.get_y()
+        pdf.cell(10, alto_celda, str(reclamo.id_reclamo), border='LR')
+        x_actual = pdf.get_x()
+        pdf.cell(25, alto_celda, reclamo.estado, border='R')
+        x_actual += 25
+        pdf.multi_cell(95, alto_celda, contenido, border='R')
+        altura_fila_real = pdf.get_y() - y_inicial_fila
+        pdf.set_xy(x_actual + 95, y_inicial_fila)
+        pdf.cell(30, altura_fila_real, reclamo.usuario_creador.nombre_usuario, border='R')
+        pdf.cell(20, altura_fila_real, reclamo.timestamp.strftime('%Y-%m-%d'), border='R')
+        pdf.cell(10, altura_fila_real, str(reclamo.numero_adherentes), border='R', ln=True)
+        pdf.cell(ancho_celda, 0, '', border='T', ln=True)
+    pdf.output(ruta)
+
+
+def medir(nombre: str, funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"- {nombre}: {segundos:.1f} s, pico de memoria {pico / 1024 / 1024:.0f} MB")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    carpeta = tempfile.mkdtemp()
+    print(f"Generando un PDF de {cantidad} reclamos ...")
+    medir("anterior (multi_cell + set_xy)", lambda: pdf_anterior(generar_reclamos(cantidad), os.path.join(carpeta, "anterior.pdf")))
+    with mock.patch.object(generador_reportes, "CARPETA_REPORTES", carpeta):
+        medir("actual (altura precalculada, en partes)",
+              lambda: print(f"  -> {os.path.basename(ReportePDF().generar(generar_reclamos(cantidad), ESTADISTICAS, 'maestranza'))}"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import bisect
+import random
+import unittest
+from modules.bosquejo_cuantiles import BosquejoCuantiles
+from modules.calculadora_mediana import MonticuloMediana
+
+
+def rango_relativo(ordenados, valor):
+    """Proporción de los valores reales que son menores que 'valor'."""
+    return bisect.bisect_left(ordenados, valor) / len(ordenados)
+
+
+class TestBosquejoCuantiles(unittest.TestCase):
+
+    def test_exacto_con_pocos_valores(self):
+        """Mientras no compacta, la mediana coincide con la de MonticuloMediana."""
+        aleatorio = random.Random(3)
+        bosquejo = BosquejoCuantiles(k=50)
+        monticulo = MonticuloMediana()
+        for _ in range(50):
+            valor = aleatorio.randint(1, 15)
+            bosquejo.agregar_numero(valor)
+            monticulo.agregar_numero(valor)
+            self.assertEqual(bosquejo.obtener_mediana(), monticulo.obtener_mediana())
+
+    def test_error_y_memoria_acotados(self):
+        """Con muchos valores, el error de rango queda dentro del documentado y la memoria no crece."""
+        aleatorio = random.Random(7)
+        datos = [aleatorio.expovariate(1 / 5) for _ in range(50000)]
+        bosquejo = BosquejoCuantiles(k=200)
+        for valor in datos:
+            bosquejo.agregar_numero(valor)
+        ordenados = sorted(datos)
+        for q, estimado in zip((0.5, 0.9, 0.95), bosquejo.obtener_cuantiles((0.5, 0.9, 0.95))):
+            self.assertLess(abs(rango_relativo(ordenados, estimado) - q), 1.7 / 200)
+        self.assertEqual(bosquejo.tamano(), 50000)
+        self.assertLessEqual(bosquejo.retenidos(), 3 * 200)
+
+    def test_combinar(self):
+        """Combinar bosquejos parciales da el mismo error que un bosquejo con todos los valores."""
+        aleatorio = random.Random(9)
+        datos = [aleatorio.uniform(0, 100) for _ in range(20000)]
+        partes = [BosquejoCuantiles(semilla=i) for i in range(4)]
+        for i, valor in enumerate(datos):
+            partes[i % 4].agregar_numero(valor)
+        total = partes[0]
+        for parte in partes[1:]:
+            total.combinar(parte)
+        self.assertEqual(total.tamano(), 20000)
+        self.assertLess(abs(rango_relativo(sorted(datos), total.obtener_cuantil(0.9)) - 0.9), 1.7 / 200)
+        with self.assertRaises(ValueError):
+            total.combinar(BosquejoCuantiles(k=100))
+
+    def test_vacio_y_parametros_invalidos(self):
+        """Cubre el bosquejo vacío, un cuantil fuera de rango y un k inválido."""
+        bosquejo = BosquejoCuantiles()
+        self.assertIsNone(bosquejo.obtener_cuantil(0.9))
+        bosquejo.agregar_numero(4)
+        with self.assertRaises(ValueError):
+            bosquejo.obtener_cuantil(1.5)
+        with self.assertRaises(ValueError):
+            BosquejoCuantiles(k=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,11 @@ import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning) 
 warnings.filterwarnings("ignore", category=ResourceWarning) 
 warnings.filterwarnings("ignore", category=UserWarning)
+import random
+import datetime
+import statistics
 import unittest
-from modules.calculadora_mediana import MonticuloMediana
+from modules.calculadora_mediana import MonticuloMediana, MedianaVentanaTemporal, CalculadoraMedianaConteo, cuantil_de_conteos
 
 class TestMonticuloMediana(unittest.TestCase):
 
@@ -74,4 +77,155 @@ class TestMonticuloMediana(unittest.TestCase):
         # 30 > 10 (raíz del max-heap), va directo al min-heap (else)
         calc.agregar_numero(30)
         self.assertEqual(calc.obtener_mediana(), 20.0) #Se prueba que la mediana es correcta (raíz del montículo de máximos)
-        
\ No newline at end of file
+        
+
+
+    #Pruebas para eliminar_numero (borrado perezoso)
+
+    def test_eliminar_numero_recalcula_mediana(self):
+        """Prueba que eliminar números (de cualquier mitad) actualice la mediana."""
+        calc = MonticuloMediana()
+        for num in [5, 1, 9, 3, 7]:
+            calc.agregar_numero(num)
+        calc.eliminar_numero(9) #Estaba en la mitad superior
+        self.assertEqual(calc.obtener_mediana(), 4.0) #Quedan 1, 3, 5, 7
+        calc.eliminar_numero(1) #Estaba en la mitad inferior (no en la raíz)
+        self.assertEqual(calc.obtener_mediana(), 5.0)
+        self.assertEqual(calc.tamano(), 3)
+
+    def test_eliminar_todos_y_volver_a_agregar(self):
+        """Prueba que al vaciarse la mediana vuelva a ser None y que se pueda seguir usando."""
+        calc = MonticuloMediana()
+        calc.agregar_numero(2)
+        calc.agregar_numero(2)
+        calc.eliminar_numero(2)
+        calc.agregar_numero(3) #La mitad inferior quedó vacía: 3 debe ir a la superior
+        self.assertEqual(calc.obtener_mediana(), 2.5)
+        calc.eliminar_numero(2)
+        calc.eliminar_numero(3)
+        self.assertIsNone(calc.obtener_mediana())
+
+    def test_eliminar_numero_inexistente(self):
+        """Cubre el error al eliminar un número que no se agregó (o que ya se eliminó)."""
+        calc = MonticuloMediana()
+        calc.agregar_numero(4)
+        calc.eliminar_numero(4)
+        with self.assertRaises(ValueError):
+            calc.eliminar_numero(4)
+
+    def test_agregar_y_eliminar_al_azar(self):
+        """Compara con statistics.median después de cada inserción o eliminación al azar."""
+        aleatorio = random.Random(3)
+        for _ in range(100):
+            calc, numeros = MonticuloMediana(), []
+            for _ in range(60):
+                if numeros and aleatorio.random() < 0.45:
+                    num = aleatorio.choice(numeros)
+                    numeros.remove(num)
+                    calc.eliminar_numero(num)
+                else:
+                    num = aleatorio.randint(1, 8) #Rango chico para forzar repetidos
+                    numeros.append(num)
+                    calc.agregar_numero(num)
+                esperada = statistics.median(numeros) if numeros else None
+                self.assertEqual(calc.obtener_mediana(), esperada)
+
+
+class TestMedianaVentanaTemporal(unittest.TestCase):
+
+    def setUp(self):
+        self.inicio = datetime.datetime(2025, 3, 1)
+        self.ventana = MedianaVentanaTemporal(datetime.timedelta(days=30))
+
+    def dia(self, n):
+        return self.inicio + datetime.timedelta(days=n)
+
+    def test_expira_muestras_viejas(self):
+        """Prueba que sólo cuenten los números de los últimos 30 días."""
+        self.ventana.agregar_numero(15, self.dia(0))
+        self.ventana.agregar_numero(1, self.dia(10))
+        self.ventana.agregar_numero(3, self.dia(20))
+        self.assertEqual(self.ventana.obtener_mediana(self.dia(25)), 3.0) #15, 1 y 3
+        self.assertEqual(self.ventana.obtener_mediana(self.dia(35)), 2.0) #Expiró el 15
+        self.assertEqual(self.ventana.tamano(), 2)
+        self.assertIsNone(self.ventana.obtener_mediana(self.dia(60))) #Expiraron todos
+
+    def test_instantes_desordenados(self):
+        """Prueba que una muestra vieja que llega tarde también expire."""
+        self.ventana.agregar_numero(5, self.dia(40))
+        self.ventana.agregar_numero(9, self.dia(1)) #Llega después pero es más vieja
+        self.assertEqual(self.ventana.obtener_mediana(self.dia(40)), 5.0)
+
+    def test_ventana_invalida(self):
+        """Cubre el error con una ventana no positiva."""
+        with self.assertRaises(ValueError):
+            MedianaVentanaTemporal(datetime.timedelta(0))
+
+
+class TestCalculadoraMedianaConteo(unittest.TestCase):
+
+    def test_equivalente_a_monticulo_mediana(self):
+        """Compara, después de cada inserción, la mediana por conteo con la de MonticuloMediana."""
+        aleatorio = random.Random(7)
+        for _ in range(200):
+            conteo, monticulo = CalculadoraMedianaConteo(), MonticuloMediana()
+            for _ in range(aleatorio.randint(1, 40)):
+                dias = aleatorio.randint(1, 15)
+                conteo.agregar_numero(dias)
+                monticulo.agregar_numero(dias)
+                self.assertEqual(conteo.obtener_mediana(), monticulo.obtener_mediana()) #Deben coincidir en todo momento
+
+    def test_estado_inicial_none(self):
+        """Igual que MonticuloMediana, sin números la mediana es None."""
+        self.assertIsNone(CalculadoraMedianaConteo().obtener_mediana())
+
+    def test_cuantiles(self):
+        """Prueba cuantiles con interpolación lineal entre vecinos."""
+        calc = CalculadoraMedianaConteo()
+        for dias in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]:
+            calc.agregar_numero(dias)
+        self.assertEqual(calc.obtener_cuantil(0), 1.0)
+        self.assertEqual(calc.obtener_cuantil(1), 11.0)
+        self.assertEqual(calc.obtener_cuantil(0.9), 10.0)
+        self.assertAlmostEqual(calc.obtener_cuantil(0.95), 10.5)
+        with self.assertRaises(ValueError):
+            calc.obtener_cuantil(1.5)
+
+    def test_combinar_departamentos(self):
+        """Prueba que combinar dos calculadoras equivalga a agregar todos los números en una."""
+        soporte, maestranza, todos = CalculadoraMedianaConteo(), CalculadoraMedianaConteo(), CalculadoraMedianaConteo()
+        for dias in [3, 3, 9]:
+            soporte.agregar_numero(dias)
+            todos.agregar_numero(dias)
+        for dias in [1, 15]:
+            maestranza.agregar_numero(dias)
+            todos.agregar_numero(dias)
+        soporte.combinar(maestranza)
+        self.assertEqual(soporte.histograma(), todos.histograma())
+        self.assertEqual(soporte.tamano(), 5)
+        self.assertEqual(soporte.obtener_mediana(), 3.0)
+        with self.assertRaises(ValueError):
+            soporte.combinar(CalculadoraMedianaConteo(1, 30)) #Rangos distintos
+
+    def test_eliminar_numero(self):
+        """Prueba quitar valores y el error al quitar uno que no está."""
+        calc = CalculadoraMedianaConteo()
+        calc.agregar_numero(2, cantidad=2)
+        calc.agregar_numero(10)
+        calc.eliminar_numero(2)
+        self.assertEqual(calc.obtener_mediana(), 6.0)
+        with self.assertRaises(ValueError):
+            calc.eliminar_numero(5)
+
+    def test_valores_fuera_de_rango(self):
+        """Cubre los valores fuera del dominio acotado y los no enteros."""
+        calc = CalculadoraMedianaConteo()
+        for valor in [0, 16, 2.5]:
+            with self.assertRaises(ValueError):
+                calc.agregar_numero(valor)
+        with self.assertRaises(ValueError):
+            CalculadoraMedianaConteo(10, 1)
+
+    def test_cuantil_de_conteos_vacio(self):
+        """Sin elementos (o sólo con cantidades en cero) no hay cuantil."""
+        self.assertIsNone(cuantil_de_conteos([(3, 0)], 0.5))
@@ -0,0 +1,53 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+from modules import clasificador_reclamos
+from modules.clasificador_reclamos import ClasificadorReclamo, obtener_modelo, precargar_modelo, descargar_modelos
+
+
+class ModeloFalso:
+    """Reemplaza a ClaimsClassifier: clasifica todo como maestranza."""
+    def classify(self, textos):
+        return ["maestranza" for _ in textos]
+
+
+class TestClasificadorReclamo(unittest.TestCase):
+
+    def setUp(self):
+        carpeta = tempfile.mkdtemp()
+        self.ruta = os.path.join(carpeta, "clf.pkl")
+        with open(self.ruta, 'wb') as archivo:
+            pickle.dump(ModeloFalso(), archivo)
+        descargar_modelos()
+        self.addCleanup(descargar_modelos)
+
+    def test_el_modelo_se_carga_una_sola_vez_por_proceso(self):
+        """Prueba que varios clasificadores compartan el modelo y el pickle se lea una sola vez."""
+        with patch.object(clasificador_reclamos.pickle, 'load', wraps=pickle.load) as load:
+            primero = ClasificadorReclamo(self.ruta)
+            segundo = ClasificadorReclamo(self.ruta)
+            load.assert_not_called() #Construir el clasificador no carga el modelo
+            self.assertEqual(primero.clasificar("Se rompió una silla"), "maestranza")
+            self.assertEqual(segundo.clasificar("Se cortó la luz"), "maestranza")
+        load.assert_called_once()
+        self.assertIs(obtener_modelo(self.ruta), obtener_modelo(self.ruta))
+
+    def test_precargar_modelo(self):
+        """Prueba que la precarga deje el modelo en el registro."""
+        modelo = precargar_modelo(self.ruta)
+        self.assertIs(obtener_modelo(self.ruta), modelo)
+
+    def test_modelo_inexistente_devuelve_indefinido(self):
+        """Cubre el caso en que el pickle no existe: se informa 'indefinido'."""
+        clasificador = ClasificadorReclamo(self.ruta + ".inexistente")
+        with patch('sys.stdout'):
+            self.assertEqual(clasificador.clasificar("Reclamo"), "indefinido")
+
+if __name__ == '__main__':
+    unittest.main()
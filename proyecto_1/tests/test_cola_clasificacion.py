@@ -0,0 +1,100 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from modules.cola_clasificacion import ColaClasificacion, DEPARTAMENTO_PROVISIONAL
+from modules.reclamo import Reclamo
+from modules.usuario import Usuario
+
+usuario_final = Usuario("A", "B", "a@b.com", "user", "estudiante", "pass", id_bd=1)
+
+
+class ClasificadorLento:
+    """Clasificador de prueba: no responde hasta que se lo libera, y registra los lotes recibidos."""
+    def __init__(self):
+        self.lotes = []
+        self.liberar = threading.Event()
+
+    def clasificar_lote(self, textos):
+        self.liberar.wait(5)
+        self.lotes.append(list(textos))
+        return ["maestranza" if "basura" in texto else "indefinido" for texto in textos]
+
+
+class RepoEnMemoria:
+    """Repositorio mínimo con obtener_por_id y actualizar."""
+    def __init__(self, reclamos):
+        self.reclamos = {reclamo.id_reclamo: reclamo for reclamo in reclamos}
+        self.actualizar = MagicMock()
+
+    def obtener_por_id(self, id_reclamo):
+        return self.reclamos.get(id_reclamo)
+
+
+def crear_reclamo(id_reclamo, contenido, departamento=DEPARTAMENTO_PROVISIONAL):
+    reclamo = Reclamo(usuario_final, contenido, departamento)
+    reclamo.id_reclamo = id_reclamo
+    return reclamo
+
+
+class TestColaClasificacion(unittest.TestCase):
+
+    def setUp(self):
+        self.reclamos = [
+            crear_reclamo(1, "Hay basura en el patio"),
+            crear_reclamo(2, "Texto que no se puede clasificar"),
+            crear_reclamo(3, "Basura acumulada", departamento="soporte informático"), #Ya derivado a mano
+        ]
+        self.repo = RepoEnMemoria(self.reclamos)
+        self.clasificador = ClasificadorLento()
+        self.al_actualizar = MagicMock()
+        self.cola = ColaClasificacion(self.clasificador, crear_repositorio=lambda: self.repo, tamano_lote=10, espera_maxima=1,
+                                      al_actualizar=self.al_actualizar)
+        self.addCleanup(self.cola.detener, 5)
+
+    def test_clasifica_en_un_solo_lote_y_actualiza(self):
+        """Prueba que los reclamos encolados juntos se clasifiquen en un lote y se actualice sólo el provisional."""
+        for reclamo in self.reclamos:
+            self.cola.encolar(reclamo.id_reclamo, reclamo.contenido)
+        self.clasificador.liberar.set()
+        self.cola.esperar()
+
+        self.assertEqual(len(self.clasificador.lotes), 1)
+        self.assertEqual(len(self.clasificador.lotes[0]), 3)
+        self.assertEqual(self.reclamos[0].departamento, "maestranza")
+        self.assertEqual(self.reclamos[1].departamento, DEPARTAMENTO_PROVISIONAL) #"indefinido" no cambia nada
+        self.assertEqual(self.reclamos[2].departamento, "soporte informático") #Se respeta la derivación manual
+        self.repo.actualizar.assert_called_once_with(self.reclamos[0])
+        self.al_actualizar.assert_called_once_with(self.reclamos[0]) #Se avisa del cambio (p. ej. a las estadísticas)
+
+    def test_lote_limitado_por_tamano(self):
+        """Prueba que ningún lote supere el tamaño máximo."""
+        cola = ColaClasificacion(self.clasificador, crear_repositorio=lambda: self.repo, tamano_lote=2, espera_maxima=0.2)
+        for reclamo in self.reclamos:
+            cola.encolar(reclamo.id_reclamo, reclamo.contenido)
+        self.clasificador.liberar.set()
+        cola.esperar()
+        cola.detener(5)
+        self.assertEqual(sorted(len(lote) for lote in self.clasificador.lotes), [1, 2])
+
+    def test_error_del_clasificador_no_detiene_la_cola(self):
+        """Prueba que un error al clasificar se informe y la cola siga funcionando."""
+        self.clasificador.clasificar_lote = MagicMock(side_effect=[RuntimeError("falló"), ["maestranza"]])
+        with patch('builtins.print') as mock_print:
+            self.cola.encolar(1, "Hay basura")
+            self.cola.esperar()
+            mock_print.assert_called_once()
+        self.cola.encolar(1, "Hay basura")
+        self.cola.esperar()
+        self.assertEqual(self.reclamos[0].departamento, "maestranza")
+
+    def test_parametros_invalidos(self):
+        """Cubre el error con tamaño de lote no positivo."""
+        with self.assertRaises(ValueError):
+            ColaClasificacion(self.clasificador, crear_repositorio=lambda: self.repo, tamano_lote=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import copy
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from modules.cola_reportes import ColaReportes, propietario_actual, _proceso_activo
+from modules.trabajo_reporte import TrabajoReporte, PENDIENTE, EN_PROCESO, TERMINADO, ERROR
+
+
+class RepoEnMemoria:
+    """Repositorio mínimo de trabajos: guarda copias, como la BD, para que no se compartan objetos."""
+    def __init__(self, trabajos=()):
+        self.trabajos = {trabajo.id_trabajo: copy.copy(trabajo) for trabajo in trabajos}
+        self.lock = threading.Lock()
+
+    def guardar(self, trabajo):
+        with self.lock:
+            self.trabajos[trabajo.id_trabajo] = copy.copy(trabajo)
+
+    def actualizar(self, trabajo):
+        self.guardar(trabajo)
+
+    def obtener_por_id(self, id_trabajo):
+        with self.lock:
+            trabajo = self.trabajos.get(id_trabajo)
+            return copy.copy(trabajo) if trabajo else None
+
+    def obtener_todos_por_filtro(self, **kwargs):
+        with self.lock:
+            return [copy.copy(t) for t in self.trabajos.values()
+                    if all(getattr(t, campo) == valor for campo, valor in kwargs.items())]
+
+    def obtener_por_filtro(self, **kwargs):
+        trabajos = sorted(self.obtener_todos_por_filtro(**kwargs), key=lambda t: t.creado, reverse=True)
+        return trabajos[0] if trabajos else None
+
+
+class GeneradorLento:
+    """Genera el archivo del reporte cuando se lo libera, y cuenta cuántas veces lo llamaron."""
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.llamadas = 0
+        self.liberar = threading.Event()
+        self.error = None
+
+    def __call__(self, trabajo):
+        self.llamadas += 1
+        self.liberar.wait(5)
+        if self.error:
+            raise RuntimeError(self.error)
+        ruta = os.path.join(self.carpeta, f"{trabajo.id_trabajo}.{trabajo.formato}")
+        with open(ruta, "w") as archivo:
+            archivo.write("reporte")
+        return ruta
+
+
+class TestColaReportes(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta, True)
+        self.repo = RepoEnMemoria()
+        self.generador = GeneradorLento(self.carpeta)
+        self.cola = ColaReportes(self.generador, crear_repositorio=lambda: self.repo,
+                                 ejecutor=ThreadPoolExecutor(2))
+        self.addCleanup(self.cola.detener)
+        self.addCleanup(self.generador.liberar.set) # Para no dejar hilos esperando si una prueba falla
+
+    def esperar_fin(self, trabajo):
+        self.cola.detener() # Espera a que terminen los trabajos encolados
+        return self.cola.obtener(trabajo.id_trabajo)
+
+    def test_genera_el_reporte_en_segundo_plano(self):
+        """Prueba que solicitar vuelva sin esperar y que el trabajo termine con la ruta del archivo."""
+        trabajo = self.cola.solicitar("secretario", None, "html", "v1")
+        self.assertFalse(trabajo.finalizado)
+        self.assertIn(self.cola.obtener(trabajo.id_trabajo).estado, (PENDIENTE, EN_PROCESO))
+
+        self.generador.liberar.set()
+        terminado = self.esperar_fin(trabajo)
+        self.assertEqual(terminado.estado, TERMINADO)
+        self.assertTrue(os.path.exists(terminado.ruta_archivo))
+        self.assertIsNotNone(terminado.terminado)
+        self.assertEqual(self.cola.en_curso(), 0)
+
+    def test_pedidos_iguales_comparten_el_trabajo(self):
+        """Prueba que los pedidos con la misma clave mientras se genera den un único trabajo."""
+        primero = self.cola.solicitar("jefe", "maestranza", "pdf", "v1")
+        segundo = self.cola.solicitar("jefe", "maestranza", "pdf", "v1")
+        self.assertEqual(primero.id_trabajo, segundo.id_trabajo)
+        self.assertEqual(self.cola.en_curso(), 1)
+
+        # Cambia el departamento, el formato o la versión de los datos: es otro reporte
+        otros = [self.cola.solicitar("jefe", "soporte informático", "pdf", "v1"),
+                 self.cola.solicitar("jefe", "maestranza", "html", "v1"),
+                 self.cola.solicitar("jefe", "maestranza", "pdf", "v2")]
+        self.assertEqual(len({trabajo.id_trabajo for trabajo in [primero] + otros}), 4)
+
+        self.generador.liberar.set()
+        self.esperar_fin(primero)
+        self.assertEqual(self.generador.llamadas, 4)
+
+    def test_reutiliza_el_reporte_terminado_si_los_datos_no_cambiaron(self):
+        """Prueba que un pedido igual a uno terminado reciba ese trabajo mientras su archivo exista."""
+        self.generador.liberar.set()
+        trabajo = self.cola.solicitar("secretario", None, "html", "v1")
+        terminado = self.esperar_fin(trabajo)
+        self.cola = ColaReportes(self.generador, crear_repositorio=lambda: self.repo)
+        self.addCleanup(self.cola.detener)
+
+        reutilizado = self.cola.solicitar("secretario", None, "html", "v1")
+        self.assertEqual(reutilizado.id_trabajo, trabajo.id_trabajo)
+        self.assertEqual(self.generador.llamadas, 1)
+
+        # Si el archivo ya no está, se genera de nuevo
+        os.remove(terminado.ruta_archivo)
+        nuevo = self.cola.solicitar("secretario", None, "html", "v1")
+        self.assertNotEqual(nuevo.id_trabajo, trabajo.id_trabajo)
+
+    def test_un_error_al_generar_marca_el_trabajo(self):
+        """Prueba que si la generación falla el trabajo quede en error con el mensaje."""
+        self.generador.error = "Falló la BD"
+        self.generador.liberar.set()
+        trabajo = self.cola.solicitar("secretario", None, "pdf", "v1")
+        fallido = self.esperar_fin(trabajo)
+        self.assertEqual(fallido.estado, ERROR)
+        self.assertIn("Falló la BD", fallido.mensaje_error)
+        self.assertEqual(self.cola.en_curso(), 0)
+
+    def test_un_mensaje_en_lugar_de_ruta_es_un_error(self):
+        """Prueba que si la estrategia devuelve un mensaje de error (no un archivo) el trabajo falle."""
+        cola = ColaReportes(lambda trabajo: "Error al generar el PDF: sin fuente", crear_repositorio=lambda: self.repo)
+        trabajo = cola.solicitar("secretario", None, "pdf", "v1")
+        cola.detener()
+        fallido = cola.obtener(trabajo.id_trabajo)
+        self.assertEqual(fallido.estado, ERROR)
+        self.assertEqual(fallido.mensaje_error, "Error al generar el PDF: sin fuente")
+
+    def test_crear_la_cola_no_toca_los_trabajos(self):
+        """Prueba que crear la cola no lea ni modifique los trabajos (importar el servidor no debe hacerlo)."""
+        crear_repositorio = MagicMock()
+        ColaReportes(self.generador, crear_repositorio=crear_repositorio).detener()
+        crear_repositorio.assert_not_called()
+
+    @patch('modules.cola_reportes._proceso_activo', side_effect=lambda pid: pid == os.getpid())
+    def test_interrumpe_solo_los_inconclusos_de_procesos_terminados(self, _):
+        """Prueba que interrumpir_inconclusos marque los trabajos de procesos terminados y deje los de procesos vivos o de otros equipos."""
+        equipo = socket.gethostname()
+        pendiente = TrabajoReporte("secretario", None, "html", "v1", f"{equipo}:999999")
+        en_proceso = TrabajoReporte("jefe", "maestranza", "pdf", "v1", f"{equipo}:999999")
+        en_proceso.iniciar()
+        vivo = TrabajoReporte("jefe", "maestranza", "html", "v1", propietario_actual())
+        de_otro_equipo = TrabajoReporte("jefe", "maestranza", "html", "v2", "otro-equipo:1")
+        repo = RepoEnMemoria([pendiente, en_proceso, vivo, de_otro_equipo])
+        self.generador.liberar.set()
+
+        cola = ColaReportes(self.generador, crear_repositorio=lambda: repo)
+        self.addCleanup(cola.detener)
+        self.assertEqual(cola.interrumpir_inconclusos(), 2)
+        for trabajo in (pendiente, en_proceso):
+            self.assertEqual(cola.obtener(trabajo.id_trabajo).estado, ERROR)
+        self.assertEqual(cola.obtener(vivo.id_trabajo).estado, PENDIENTE)
+        self.assertEqual(cola.obtener(de_otro_equipo.id_trabajo).estado, PENDIENTE)
+
+        # Y no se reutilizan: un pedido igual crea un trabajo nuevo, de este proceso
+        nuevo = cola.solicitar("secretario", None, "html", "v1")
+        self.assertNotEqual(nuevo.id_trabajo, pendiente.id_trabajo)
+        self.assertEqual(nuevo.propietario, propietario_actual())
+
+    def test_proceso_activo(self):
+        """Prueba la detección de procesos vivos con este proceso y con uno que ya terminó."""
+        hijo = subprocess.Popen([sys.executable, "-c", "pass"])
+        hijo.wait()
+        self.assertTrue(_proceso_activo(os.getpid()))
+        self.assertFalse(_proceso_activo(hijo.pid))
+
+    def test_obtener_un_trabajo_inexistente(self):
+        """Prueba que obtener devuelva None para un id desconocido."""
+        self.assertIsNone(self.cola.obtener("no-existe"))
+
+
+if __name__ == "__main__":
+    unittest.main()
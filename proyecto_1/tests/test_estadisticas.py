@@ -2,8 +2,12 @@ import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning) 
 warnings.filterwarnings("ignore", category=ResourceWarning) 
 warnings.filterwarnings("ignore", category=UserWarning)
+import random
 import unittest
-from modules.estadisticas import GeneradorEstadisticas
+from modules.estadisticas import GeneradorEstadisticas, GeneradorEstadisticasSQL, crear_generador_estadisticas
+from modules.estadisticas import InstantaneaEstadisticas, GeneradorEstadisticasInstantanea
+from modules.reclamo import Reclamo
+from modules.usuario import Usuario
 from unittest.mock import MagicMock
 
 #MOCK DE DEPENDENCIA (Reclamo)  (Mock: objeto simulado que reemplaza una dependencia real, sirve para aislar y probar de manera unitaria una sección específica de código)
@@ -100,6 +104,16 @@ class TestGeneradorEstadisticas(unittest.TestCase):
         frecuencias = generador.calcular_palabras_frecuentes(cantidad=10)
         self.assertEqual(frecuencias, [])
 
+    def test_palabras_frecuentes_separadores_y_empates(self):
+        """Prueba que números y símbolos separen palabras y que los empates respeten el orden de aparición."""
+        reclamos = [
+            MockReclamo("p", "AULA3pasillo_baño"),
+            MockReclamo("p", "pasillo; AULA"), #Cada reclamo se procesa por separado: no se pegan palabras
+        ]
+        generador = GeneradorEstadisticas(reclamos)
+        frecuencias = generador.calcular_palabras_frecuentes(cantidad=10)
+        self.assertEqual(frecuencias, [("aula", 2), ("pasillo", 2), ("baño", 1)])
+
     #Pruebas para calcular_mediana_tiempos_resolucion
 
     def test_mediana_tiempos_normal_par(self):
@@ -165,4 +179,213 @@ class TestGeneradorEstadisticas(unittest.TestCase):
         generador = GeneradorEstadisticas(reclamos)
         frecuencias = generador.calcular_palabras_frecuentes(cantidad=1)
         self.assertEqual(frecuencias, [('palabra', 1)])
-        self.assertEqual(len(frecuencias), 1)
\ No newline at end of file
+        self.assertEqual(len(frecuencias), 1)
+
+class MockRepoAgregaciones:
+    """Repositorio simulado que responde las agregaciones a partir de una lista de MockReclamo."""
+    def __init__(self, reclamos):
+        self.reclamos = reclamos
+        self.consultas = []
+
+    def _filtrar(self, consulta):
+        self.consultas.append(consulta)
+        return [r for r in self.reclamos
+                if all(getattr(r, c, None) == v for c, v in consulta.igualdades.items())
+                and all(getattr(r, c) in vs for c, vs in consulta.valores_en.items())]
+
+    def contar_por(self, campo, consulta):
+        conteo = {}
+        for r in self._filtrar(consulta):
+            conteo[getattr(r, campo)] = conteo.get(getattr(r, campo), 0) + 1
+        return conteo
+
+    def iterar_columna(self, campo, consulta):
+        return iter([getattr(r, campo) for r in self._filtrar(consulta)])
+
+    def iterar_columnas(self, campos, consulta=None):
+        reclamos = self._filtrar(consulta) if consulta is not None else self.reclamos
+        # Las entidades Reclamo llaman 'id_reclamo' a la columna 'id'
+        return iter([tuple(getattr(r, "id_reclamo" if c == "id" else c) for c in campos) for r in reclamos])
+
+
+class TestGeneradorEstadisticasSQL(unittest.TestCase):
+
+    def setUp(self):
+        self.reclamos = [
+            MockReclamo("pendiente", "La impresora no imprime"), MockReclamo("en proceso", "Impresora trabada", 4),
+            MockReclamo("resuelto", "Aula sucia", 10), MockReclamo("en proceso", "Proyector roto", 7),
+            MockReclamo("inválido", "Nada", 2),
+        ]
+        self.repo = MockRepoAgregaciones(self.reclamos)
+
+    def test_equivalente_al_generador_en_memoria(self):
+        """Prueba que ambos generadores den los mismos resultados para los mismos reclamos."""
+        en_memoria = GeneradorEstadisticas(self.reclamos)
+        sql = GeneradorEstadisticasSQL(self.repo)
+        self.assertEqual(sql.calcular_porcentajes_estado(), en_memoria.calcular_porcentajes_estado())
+        self.assertEqual(sql.calcular_mediana_tiempos_resolucion(), en_memoria.calcular_mediana_tiempos_resolucion())
+        self.assertEqual(sql.calcular_palabras_frecuentes(5), en_memoria.calcular_palabras_frecuentes(5))
+
+    def test_motor_de_mediana_por_conteo(self):
+        """Prueba que el motor por conteo dé la misma mediana y que un motor desconocido falle."""
+        for generador in [GeneradorEstadisticas(self.reclamos, "conteo"), GeneradorEstadisticas(self.reclamos, "monticulo_rapido"), GeneradorEstadisticasSQL(self.repo, motor_mediana="conteo"),
+                          crear_generador_estadisticas(self.repo, motor_mediana="conteo")]:
+            self.assertEqual(generador.calcular_mediana_tiempos_resolucion(),
+                             GeneradorEstadisticas(self.reclamos).calcular_mediana_tiempos_resolucion())
+        with self.assertRaises(ValueError):
+            GeneradorEstadisticas(self.reclamos, "otro")
+
+    def test_filtra_por_departamento(self):
+        """Prueba que el departamento se envíe como filtro en cada consulta."""
+        sql = GeneradorEstadisticasSQL(self.repo, "maestranza")
+        sql.calcular_porcentajes_estado()
+        sql.calcular_mediana_tiempos_resolucion()
+        self.assertTrue(all(c.igualdades == {"departamento": "maestranza"} for c in self.repo.consultas))
+        self.assertEqual(self.repo.consultas[1].valores_en, {"estado": ["en proceso", "resuelto"]})
+
+    def test_sin_reclamos(self):
+        """Cubre el caso sin reclamos."""
+        sql = GeneradorEstadisticasSQL(MockRepoAgregaciones([]))
+        self.assertEqual(sql.calcular_porcentajes_estado()["total"], 0)
+        self.assertEqual(sql.calcular_mediana_tiempos_resolucion(), 0.0)
+
+    def test_crear_generador_con_y_sin_agregaciones(self):
+        """Prueba que la fábrica use la versión SQL si el repo agrega y la de memoria si no."""
+        self.assertIsInstance(crear_generador_estadisticas(self.repo), GeneradorEstadisticasSQL)
+
+        repo_simple = MagicMock(spec=["obtener_todos", "obtener_todos_por_filtro"])
+        repo_simple.obtener_todos_por_filtro.return_value = self.reclamos
+        generador = crear_generador_estadisticas(repo_simple, "maestranza")
+        self.assertIsInstance(generador, GeneradorEstadisticas)
+        repo_simple.obtener_todos_por_filtro.assert_called_once_with(departamento="maestranza")
+
+
+def crear_reclamo(id_reclamo, contenido, departamento, estado="pendiente", dias=None):
+    """Crea una entidad Reclamo real con el estado (y días de resolución) indicados."""
+    reclamo = Reclamo(Usuario("A", "B", "a@b.com", "user", "estudiante", "pass", id_bd=1), contenido, departamento)
+    reclamo.id_reclamo = id_reclamo
+    if estado != "pendiente":
+        reclamo.cambiar_estado(estado, dias)
+    return reclamo
+
+
+class TestInstantaneaEstadisticas(unittest.TestCase):
+
+    def setUp(self):
+        self.reclamos = [
+            crear_reclamo(1, "La impresora no imprime", "soporte informático"),
+            crear_reclamo(2, "Impresora trabada", "soporte informático", "en proceso", 4),
+            crear_reclamo(3, "Aula sucia", "maestranza", "en proceso", 10),
+            crear_reclamo(4, "Proyector roto en el aula", "soporte informático", "en proceso", 7),
+        ]
+        self.instantanea = InstantaneaEstadisticas()
+        self.instantanea.reconstruir(self.reclamos)
+
+    def assertIgualAReconstruir(self, reclamos):
+        """Compara la instantánea actualizada con una reconstruida de cero y con el generador en memoria."""
+        reconstruida = InstantaneaEstadisticas()
+        reconstruida.reconstruir(reclamos)
+        for departamento in [None, "soporte informático", "maestranza"]:
+            self.assertEqual(self.instantanea.conteo_estados(departamento), reconstruida.conteo_estados(departamento))
+            self.assertEqual(self.instantanea.contador_palabras(departamento), reconstruida.contador_palabras(departamento))
+            self.assertEqual(self.instantanea.histograma_tiempos(departamento), reconstruida.histograma_tiempos(departamento))
+            del_departamento = [r for r in reclamos if departamento in (None, r.departamento)]
+            en_memoria = GeneradorEstadisticas(del_departamento)
+            generador = GeneradorEstadisticasInstantanea(self.instantanea, departamento)
+            self.assertEqual(generador.calcular_porcentajes_estado(), en_memoria.calcular_porcentajes_estado())
+            self.assertEqual(generador.calcular_mediana_tiempos_resolucion(), en_memoria.calcular_mediana_tiempos_resolucion())
+            self.assertEqual(dict(generador.calcular_palabras_frecuentes(50)), dict(en_memoria.calcular_palabras_frecuentes(50)))
+            self.assertEqual(generador.calcular_percentiles_tiempos_resolucion(), en_memoria.calcular_percentiles_tiempos_resolucion())
+
+    def test_reconstruir_equivale_al_generador_en_memoria(self):
+        """Prueba que la instantánea recién construida dé las mismas estadísticas que calcularlas de cero."""
+        self.assertIgualAReconstruir(self.reclamos)
+        self.assertEqual(self.instantanea.mediana_tiempos(), 7.0)
+
+    def test_actualizaciones_incrementales(self):
+        """Prueba crear, cambiar de estado y derivar: el resultado debe ser igual a reconstruir."""
+        nuevo = crear_reclamo(5, "Baño sucio", "maestranza")
+        self.instantanea.registrar(nuevo)
+        self.reclamos.append(nuevo)
+
+        self.reclamos[0].cambiar_estado("en proceso", 2)
+        self.instantanea.actualizar(self.reclamos[0])
+        self.reclamos[1].cambiar_estado("resuelto")
+        self.instantanea.actualizar(self.reclamos[1])
+
+        self.reclamos[3].departamento = "maestranza" #Derivación
+        self.instantanea.actualizar(self.reclamos[3])
+
+        self.assertIgualAReconstruir(self.reclamos)
+        self.assertNotIn("proyector", self.instantanea.contador_palabras("soporte informático")) #Las palabras se mueven de departamento
+        self.assertEqual(self.instantanea.contador_palabras("maestranza")["sucio"], 1)
+
+    def test_reconstruir_desde_bd_lee_solo_columnas(self):
+        """Prueba que la reconstrucción desde el repositorio use las columnas sueltas y equivalga a reconstruir con entidades."""
+        repo = MockRepoAgregaciones(self.reclamos)
+        repo.obtener_todos = MagicMock()
+        desde_bd = InstantaneaEstadisticas()
+        desde_bd.reconstruir_desde_bd(repo)
+        repo.obtener_todos.assert_not_called()
+        self.assertTrue(desde_bd.construida)
+        for departamento in [None, "soporte informático", "maestranza"]:
+            self.assertEqual(desde_bd.conteo_estados(departamento), self.instantanea.conteo_estados(departamento))
+            self.assertEqual(desde_bd.contador_palabras(departamento), self.instantanea.contador_palabras(departamento))
+            self.assertEqual(desde_bd.histograma_tiempos(departamento), self.instantanea.histograma_tiempos(departamento))
+
+        # Los aportes quedan registrados: un cambio posterior se descuenta bien
+        self.reclamos[0].cambiar_estado("en proceso", 2)
+        desde_bd.actualizar(self.reclamos[0])
+        reconstruida = InstantaneaEstadisticas()
+        reconstruida.reconstruir(self.reclamos)
+        self.assertEqual(desde_bd.conteo_estados(), reconstruida.conteo_estados())
+        self.assertEqual(desde_bd.histograma_tiempos(), reconstruida.histograma_tiempos())
+
+    def test_percentiles_iguales_en_todos_los_generadores(self):
+        """Prueba que con muchos tiempos (el bosquejo ya compacta) los tres generadores den los mismos percentiles."""
+        aleatorio = random.Random(7)
+        reclamos = [crear_reclamo(i, "Reclamo", aleatorio.choice(["maestranza", "soporte informático"]), "en proceso", aleatorio.randint(1, 15))
+                    for i in range(1, 1501)]
+        instantanea = InstantaneaEstadisticas()
+        instantanea.reconstruir(reversed(reclamos)) #El orden de lectura no debe importar
+        esperado = GeneradorEstadisticas(reclamos).calcular_percentiles_tiempos_resolucion()
+        self.assertEqual(GeneradorEstadisticasSQL(MockRepoAgregaciones(reclamos)).calcular_percentiles_tiempos_resolucion(), esperado)
+        self.assertEqual(GeneradorEstadisticasInstantanea(instantanea).calcular_percentiles_tiempos_resolucion(), esperado)
+        self.assertEqual(GeneradorEstadisticasInstantanea(instantanea, "maestranza").calcular_percentiles_tiempos_resolucion(),
+                         GeneradorEstadisticasSQL(MockRepoAgregaciones(reclamos), "maestranza").calcular_percentiles_tiempos_resolucion())
+
+    def test_ignora_avisos_antes_de_construirse(self):
+        """Prueba que sin reconstruir() la instantánea no acumule cambios sueltos ni se use para leer."""
+        instantanea = InstantaneaEstadisticas()
+        instantanea.registrar(self.reclamos[0])
+        self.assertFalse(instantanea.construida)
+        self.assertEqual(instantanea.conteo_estados(), {})
+        repo = MockRepoAgregaciones([])
+        self.assertIsInstance(crear_generador_estadisticas(repo, instantanea=instantanea), GeneradorEstadisticasSQL)
+        self.assertIsInstance(crear_generador_estadisticas(repo, instantanea=self.instantanea), GeneradorEstadisticasInstantanea)
+
+    def test_mediana_histograma_par_e_impar(self):
+        """Prueba la mediana leída del histograma con cantidad par e impar de tiempos."""
+        self.assertEqual(self.instantanea.mediana_tiempos("soporte informático"), 5.5)
+        self.assertEqual(self.instantanea.mediana_tiempos("maestranza"), 10.0)
+        self.assertEqual(self.instantanea.mediana_tiempos("secretaría técnica"), 0.0)
+
+    def test_percentiles_por_departamento(self):
+        """Prueba los percentiles por departamento y el total, en memoria, con consultas y en la instantánea."""
+        esperado = {
+            "maestranza": {90: 10.0, 95: 10.0},
+            "soporte informático": {90: 6.7, 95: 6.85},
+            "todos los departamentos": {90: 9.4, 95: 9.7},
+        }
+        for generador in [GeneradorEstadisticas(self.reclamos), GeneradorEstadisticasSQL(MockRepoAgregaciones(self.reclamos)),
+                          GeneradorEstadisticasInstantanea(self.instantanea)]:
+            percentiles = generador.calcular_percentiles_tiempos_resolucion()
+            self.assertEqual(percentiles.keys(), esperado.keys())
+            for departamento, valores in esperado.items():
+                for percentil, valor in valores.items():
+                    self.assertAlmostEqual(percentiles[departamento][percentil], valor)
+        #Un solo departamento: no se agrega el total
+        self.assertEqual(GeneradorEstadisticasSQL(MockRepoAgregaciones(self.reclamos), "maestranza").calcular_percentiles_tiempos_resolucion(),
+                         {"maestranza": {90: 10.0, 95: 10.0}})
+        self.assertEqual(self.instantanea.percentiles_tiempos(departamento="secretaría técnica"), {})
+
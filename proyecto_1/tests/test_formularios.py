@@ -113,5 +113,12 @@ class TestFormularios(unittest.TestCase):
         form = simular_form(FormEditarEstado, data)
         self.assertTrue(form.validate())
 
+    def test_importar_el_servidor_no_crea_el_sistema(self):
+        """Prueba que importar server (como hacen los procesos de gráficos) no abra la BD ni cree el sistema."""
+        import server
+        self.assertIsNone(server.sistema)
+        self.assertIsNone(server.repo_usuarios)
+        self.assertIsNone(server.renderizador_graficos)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from fpdf import FPDF
+from modules import generador_reportes
+from modules.generador_reportes import GeneradorReportes, ReporteHTML, ReportePDF, _partir_en_renglones
+from modules.reclamo import Reclamo
+from modules.usuario import Usuario
+
+usuario_final = Usuario("A", "B", "a@b.com", "user", "estudiante", "pass", id_bd=1)
+ESTADISTICAS = {"total": 3, "pendientes": 100.0, "en_proceso": 0.0, "resueltos": 0.0, "mediana_tiempos": 0}
+
+
+def generar_reclamos(cantidad, leidos):
+    """Genera reclamos de a uno y anota cuántos se pidieron (para ver que no se lean todos de antemano)."""
+    for i in range(cantidad):
+        reclamo = Reclamo(usuario_final, f"Reclamo <{i}>", "maestranza")
+        reclamo.id_reclamo = i + 1
+        leidos.append(i)
+        yield reclamo
+
+
+def reclamos_que_fallan(cantidad):
+    """Genera 'cantidad' reclamos y después falla, como una lectura de la BD que se corta."""
+    yield from generar_reclamos(cantidad, [])
+    raise RuntimeError("Se cortó la conexión")
+
+
+class TestReporteHTML(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        patcher = mock.patch.object(generador_reportes, "CARPETA_REPORTES", self.carpeta)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_escribe_los_reclamos_de_un_iterador_por_partes(self):
+        """Prueba que el HTML tenga todas las filas (escritas de a partes) y que los reclamos se lean de un iterador."""
+        leidos = []
+        with mock.patch('modules.generador_reportes.FILAS_POR_PARTE_HTML', 2):
+            ruta = GeneradorReportes(ReporteHTML()).generar_reporte(generar_reclamos(5, leidos), ESTADISTICAS, "maestranza")
+        self.assertTrue(ruta.endswith(".html"))
+        self.assertEqual(len(leidos), 5)
+        with open(ruta, encoding="utf-8") as archivo:
+            contenido = archivo.read()
+        self.assertIn("<h1>Reporte de Reclamos - Departamento: maestranza</h1>", contenido)
+        self.assertEqual(contenido.count("<tr><td>"), 5)
+        self.assertIn("Reclamo &lt;0&gt;", contenido) #El contenido se escapa
+        self.assertTrue(contenido.endswith("</table></body></html>"))
+
+    def test_percentiles_escapan_el_departamento(self):
+        """Prueba que el nombre de departamento de la tabla de percentiles se escape como las demás celdas."""
+        estadisticas = {**ESTADISTICAS, "percentiles_tiempos": {"<b>maestranza</b>": {50: 1.0, 90: 2.0}}}
+        ruta = ReporteHTML().generar([], estadisticas, "maestranza")
+        with open(ruta, encoding="utf-8") as archivo:
+            contenido = archivo.read()
+        self.assertIn("<tr><td>&lt;b&gt;maestranza&lt;/b&gt;</td><td>1.00</td><td>2.00</td></tr>", contenido)
+
+    def test_nombre_por_identificador(self):
+        """Prueba que el identificador vaya en el nombre, y que sin él dos reportes seguidos no compartan archivo."""
+        ruta = ReporteHTML().generar([], ESTADISTICAS, "soporte informático", identificador="abc123")
+        self.assertEqual(os.path.basename(ruta), "reporte_soporte_informático_abc123.html")
+        self.assertNotEqual(ReporteHTML().generar([], ESTADISTICAS, "maestranza"),
+                            ReporteHTML().generar([], ESTADISTICAS, "maestranza"))
+
+    def test_un_error_se_lanza_y_no_deja_el_archivo(self):
+        """Prueba que si la generación falla se lance la excepción (no un mensaje como ruta) y se borre el archivo."""
+        with self.assertRaisesRegex(RuntimeError, "Se cortó la conexión"):
+            ReporteHTML().generar(reclamos_que_fallan(3), ESTADISTICAS, "maestranza")
+        self.assertEqual(os.listdir(self.carpeta), [])
+
+
+class TestReportePDF(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        patcher = mock.patch.object(generador_reportes, "CARPETA_REPORTES", self.carpeta)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_un_solo_archivo(self):
+        """Prueba que un reporte chico sea un PDF y que los reclamos se lean de un iterador."""
+        leidos = []
+        ruta = ReportePDF().generar(generar_reclamos(30, leidos), ESTADISTICAS, "maestranza")
+        self.assertTrue(ruta.endswith(".pdf"))
+        with open(ruta, "rb") as archivo:
+            self.assertEqual(archivo.read(4), b"%PDF")
+        self.assertEqual(len(leidos), 30)
+        self.assertEqual(os.listdir(self.carpeta), [os.path.basename(ruta)]) #Sin partes sueltas
+
+    def test_reporte_grande_en_partes_dentro_de_un_zip(self):
+        """Prueba que al superar el máximo de filas el reporte se divida en PDFs dentro de un .zip."""
+        ruta = ReportePDF(maximo_filas_por_parte=4).generar(generar_reclamos(10, []), ESTADISTICAS, "maestranza")
+        self.assertTrue(ruta.endswith(".zip"))
+        with zipfile.ZipFile(ruta) as archivo_zip:
+            nombres = archivo_zip.namelist()
+            self.assertTrue(all(archivo_zip.read(nombre).startswith(b"%PDF") for nombre in nombres))
+        self.assertEqual([nombre[-10:] for nombre in nombres], ["parte1.pdf", "parte2.pdf", "parte3.pdf"])
+        self.assertEqual(os.listdir(self.carpeta), [os.path.basename(ruta)]) #Las partes se borran
+        with self.assertRaises(ValueError):
+            ReportePDF(maximo_filas_por_parte=0)
+
+    def test_un_error_se_lanza_y_no_deja_partes(self):
+        """Prueba que si falla la lectura de los reclamos se lance la excepción y no queden partes sueltas."""
+        with self.assertRaisesRegex(RuntimeError, "Se cortó la conexión"):
+            ReportePDF(maximo_filas_por_parte=2).generar(reclamos_que_fallan(5), ESTADISTICAS, "maestranza", "trabajo1")
+        self.assertEqual(os.listdir(self.carpeta), [])
+
+    def test_renglones_como_multi_cell(self):
+        """Prueba que el corte en renglones coincida con el de multi_cell de fpdf."""
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font("Helvetica", '', 8)
+        textos = ["El proyector del aula 3 no funciona desde ayer y el enchufe está roto " * 3,
+                  "corto", "x" * 150 + " fin", "primer párrafo\nsegundo párrafo"]
+        for texto in textos:
+            esperado = [renglon.strip() for renglon in pdf.multi_cell(95, 6, texto, dry_run=True, output="LINES")]
+            self.assertEqual(_partir_en_renglones(texto, 95 - 2 * pdf.c_margin, pdf.get_string_width), esperado)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,10 +3,11 @@
 import unittest
 from unittest import mock
 import os
+import tempfile
 
 # ⚠️ NOTA: Asumo que la importación correcta de tu módulo es 'from modules.graficador import Graficador'
 # Si tu módulo 'graficador.py' está en la misma carpeta que 'tests', usa: from graficador import Graficador
-from modules.graficador import Graficador 
+from modules.graficador import Graficador, CacheGraficos, CacheGraficosMemoria, huella_grafico, grafico_en_memoria
 
 # La ruta de guardado ficticia para los tests
 RUTA_TEST = "/tmp/mock/ruta/guardado/test.png" 
@@ -16,22 +17,20 @@ class TestGraficador(unittest.TestCase):
     def setUp(self):
         # 1. Definir los patchers
         self.patcher_os_makedirs = mock.patch('os.makedirs')
-        self.patcher_plt_savefig = mock.patch('matplotlib.pyplot.savefig')
-        self.patcher_plt_close = mock.patch('matplotlib.pyplot.close')
-        self.patcher_plt_subplots = mock.patch('matplotlib.pyplot.subplots')
+        # El Graficador usa Figure (sin pyplot): la figura y sus ejes son mocks
+        self.patcher_figure = mock.patch('modules.graficador.Figure')
         
         # ❌ Los patchers de WordCloud NO se definen para evitar fallos de importación y mocking.
 
         # 2. Iniciar y obtener referencias a los mocks
         self.mock_makedirs = self.patcher_os_makedirs.start()
-        self.mock_savefig = self.patcher_plt_savefig.start()
-        self.mock_close = self.patcher_plt_close.start()
+        self.mock_figure = self.patcher_figure.start()
         
-        # Mocks para subplots (retorna fig, ax)
-        self.mock_fig = mock.MagicMock() 
+        # Mocks para la figura y sus ejes (fig.subplots() retorna ax)
+        self.mock_fig = self.mock_figure.return_value
         self.mock_ax = mock.MagicMock()
-        self.mock_subplots = self.patcher_plt_subplots.start()
-        self.mock_subplots.return_value = (self.mock_fig, self.mock_ax)
+        self.mock_fig.subplots.return_value = self.mock_ax
+        self.mock_savefig = self.mock_fig.savefig
         
         # ✅ Corrección para evitar el ValueError en la desestructuración de ax.pie()
         self.mock_ax.pie.return_value = (mock.MagicMock(), mock.MagicMock(), mock.MagicMock())
@@ -40,9 +39,7 @@ class TestGraficador(unittest.TestCase):
     def tearDown(self):
         # Detener solo los patchers que se iniciaron
         self.patcher_os_makedirs.stop()
-        self.patcher_plt_savefig.stop()
-        self.patcher_plt_close.stop()
-        self.patcher_plt_subplots.stop()
+        self.patcher_figure.stop()
         # WordCloud related patchers NO se detienen.
 
     # ----------------------------------------------------
@@ -60,9 +57,8 @@ class TestGraficador(unittest.TestCase):
         
         # ASSERT
         self.mock_makedirs.assert_called_once_with(os.path.dirname(RUTA_TEST), exist_ok=True)
-        self.mock_subplots.assert_called_once()
+        self.mock_figure.assert_called_once_with(figsize=(6, 6))
         self.mock_savefig.assert_called_once_with(RUTA_TEST, bbox_inches='tight', dpi=100)
-        self.mock_close.assert_called_once_with(self.mock_fig)
         self.assertEqual(resultado, RUTA_TEST)
 
     def test_grafico_estados_solo_un_estado_presente(self):
@@ -93,13 +89,115 @@ class TestGraficador(unittest.TestCase):
         
         # ASSERT
         self.mock_makedirs.assert_not_called()
-        self.mock_savefig.assert_not_called()
-        self.mock_close.assert_not_called()
+        self.mock_figure.assert_not_called()
         self.assertIsNone(resultado)
 
     # ----------------------------------------------------
     # ## ☁️ Tests de WordCloud ELIMINADOS
     # ----------------------------------------------------
 
+
+class TestCacheGraficos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.dibujados = []
+
+    def generar(self):
+        """Reemplaza al Graficador: devuelve un PNG falso de 10 bytes y registra la llamada."""
+        self.dibujados.append(True)
+        return b"0" * 10
+
+    def escribir(self, destino):
+        """Como generar, pero escribe en el destino que recibe el Graficador."""
+        destino.write(self.generar())
+        return destino
+
+    def test_mismos_datos_reutilizan_el_archivo(self):
+        cache = CacheGraficos(self.carpeta)
+        primera = cache.obtener_o_generar("estados", {"total": 3, "pendientes": 100.0}, self.generar)
+        segunda = cache.obtener_o_generar("estados", {"pendientes": 100.0, "total": 3}, self.generar) #El orden de las claves no importa
+        otra = cache.obtener_o_generar("estados", {"total": 4, "pendientes": 100.0}, self.generar)
+
+        self.assertEqual(primera, segunda)
+        self.assertNotEqual(primera, otra)
+        self.assertEqual(len(self.dibujados), 2)
+        self.assertEqual(cache.estadisticas(), {"aciertos": 1, "fallos": 2})
+        self.assertTrue(os.path.basename(primera).startswith("estados_"))
+        self.assertEqual(sorted(os.listdir(self.carpeta)), sorted(os.path.basename(r) for r in [primera, otra])) #Sin temporales
+        self.assertEqual(cache.obtener_contenido(primera), b"0" * 10)
+
+    def test_desaloja_los_menos_usados(self):
+        cache = CacheGraficos(self.carpeta, maximo_archivos=2)
+        rutas = [cache.obtener_o_generar("estados", {"total": i}, self.generar) for i in range(2)]
+        os.utime(rutas[0], (1, 1)) #El primero quedó sin usar hace mucho
+        os.utime(rutas[1], (2, 2))
+        cache.obtener_o_generar("estados", {"total": 0}, self.generar) #Usarlo lo vuelve el más reciente
+        tercera = cache.obtener_o_generar("estados", {"total": 2}, self.generar)
+
+        self.assertEqual(sorted(os.listdir(self.carpeta)), sorted(os.path.basename(r) for r in [rutas[0], tercera]))
+
+        por_bytes = CacheGraficos(self.carpeta, maximo_bytes=15) #Entra un solo archivo de 10 bytes
+        ultima = por_bytes.obtener_o_generar("estados", {"total": 9}, self.generar)
+        self.assertEqual(os.listdir(self.carpeta), [os.path.basename(ultima)])
+
+    def test_sin_grafico_no_deja_archivos(self):
+        cache = CacheGraficos(self.carpeta)
+        self.assertIsNone(cache.obtener_o_generar("estados", {"total": 0}, lambda: None))
+        self.assertIsNone(cache.wordcloud([]))
+        self.assertEqual(os.listdir(self.carpeta), [])
+        with self.assertRaises(ValueError):
+            CacheGraficos(self.carpeta, maximo_archivos=0)
+
+    def test_grafico_estados_usa_el_graficador(self):
+        cache = CacheGraficos(self.carpeta)
+        stats = {'pendientes': 40.0, 'en_proceso': 35.0, 'resueltos': 25.0, 'total': 100}
+        with mock.patch.object(Graficador, 'generar_grafico_estados', side_effect=lambda _, destino, formato: self.escribir(destino)) as generar:
+            ruta = cache.grafico_estados(stats)
+            self.assertEqual(cache.grafico_estados(dict(stats, ruta_grafico="otra")), ruta) #Sólo cuentan los datos del gráfico
+        generar.assert_called_once()
+        self.assertIn(huella_grafico("estados", stats), ruta)
+
+
+class TestGraficosEnMemoria(unittest.TestCase):
+
+    def test_png_y_svg_sin_tocar_el_disco(self):
+        """Dibuja de verdad en memoria: PNG y SVG, sin crear carpetas."""
+        stats = {'pendientes': 40.0, 'en_proceso': 35.0, 'resueltos': 25.0}
+        with mock.patch('os.makedirs') as mock_makedirs:
+            png = grafico_en_memoria("estados", stats)
+            svg = grafico_en_memoria("estados", stats, "svg")
+            nube_svg = grafico_en_memoria("wordcloud", [["luz", 3], ["agua", 2]], "svg")
+        mock_makedirs.assert_not_called()
+        self.assertEqual(png[:4], b"\x89PNG")
+        self.assertIn(b"<svg", svg)
+        self.assertIn(b"<svg", nube_svg)
+        self.assertIsNone(grafico_en_memoria("estados", {'pendientes': 0, 'en_proceso': 0, 'resueltos': 0}))
+        with self.assertRaises(ValueError):
+            grafico_en_memoria("estados", stats, "gif")
+
+    def test_cache_en_memoria_lru(self):
+        """Prueba que la cache en memoria reutilice los bytes y descarte los menos usados al llenarse."""
+        cache = CacheGraficosMemoria(maximo_bytes=25, formato="svg")
+        dibujados = []
+        def generar():
+            dibujados.append(True)
+            return b"0" * 10
+        primera = cache.obtener_o_generar("estados", {"total": 1}, generar)
+        self.assertEqual(cache.obtener_o_generar("estados", {"total": 1}, generar), primera)
+        self.assertTrue(primera.startswith("estados_") and primera.endswith(".svg"))
+        self.assertEqual(cache.tipo_mime, "image/svg+xml")
+
+        segunda = cache.obtener_o_generar("estados", {"total": 2}, generar)
+        cache.obtener_contenido(primera) #Leerla la vuelve la más reciente
+        tercera = cache.obtener_o_generar("estados", {"total": 3}, generar) #Ya no entran las tres
+        self.assertTrue(cache.existe(primera) and cache.existe(tercera))
+        self.assertFalse(cache.existe(segunda))
+        self.assertIsNone(cache.obtener_contenido(segunda))
+        self.assertEqual(len(dibujados), 3)
+        self.assertEqual(cache.estadisticas(), {"aciertos": 1, "fallos": 3, "bytes": 20})
+        with self.assertRaises(ValueError):
+            CacheGraficosMemoria(formato="gif")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
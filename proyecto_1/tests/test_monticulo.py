@@ -3,7 +3,9 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=ResourceWarning) 
 warnings.filterwarnings("ignore", category=UserWarning)
 import unittest
-from modules.monticulo import MonticuloMinimos, MonticuloMaximos
+import random
+from modules.monticulo import MonticuloMinimos, MonticuloMaximos, MonticuloMinimosRapido, MonticuloMaximosRapido
+from modules.monticulo import MonticuloIndexadoMaximos, MonticuloIndexadoMinimos
 
 class TestMonticulo(unittest.TestCase):
     
@@ -123,4 +125,116 @@ class TestMonticulo(unittest.TestCase):
         # 10 > 5 -> Verdadero
         self.assertTrue(max_heap._comparar(10, 5)) #Se prueba que devuelve el booleano correcto
         # 5 > 10 -> False (No es un MontículoMaximos)
-        self.assertFalse(max_heap._comparar(5, 10)) #Se prueba que devuelve el booleano correcto
\ No newline at end of file
+        self.assertFalse(max_heap._comparar(5, 10)) #Se prueba que devuelve el booleano correcto
+
+    #Pruebas para desde_lista (construcción en O(n))
+
+    def test_desde_lista_minimos_y_maximos(self):
+        """Prueba que construir de una vez deje un montículo válido en ambos tipos."""
+        valores = [7, 3, 9, 1, 4, 8, 2, 6, 5]
+        min_heap = MonticuloMinimos.desde_lista(valores)
+        max_heap = MonticuloMaximos.desde_lista(valores)
+        self.assertEqual(min_heap.tamano(), 9) #Se prueba que estén todos los valores
+        self.assertEqual([min_heap.eliminar_raiz() for _ in valores], sorted(valores)) #Salen en orden creciente
+        self.assertEqual([max_heap.eliminar_raiz() for _ in valores], sorted(valores, reverse=True)) #Salen en orden decreciente
+
+    def test_desde_lista_vacia_y_luego_insertar(self):
+        """Prueba que un montículo construido vacío funcione como uno nuevo."""
+        min_heap = MonticuloMinimos.desde_lista([])
+        self.assertTrue(min_heap.esta_vacio())
+        min_heap.insertar(3)
+        self.assertEqual(min_heap.obtener_raiz(), 3)
+
+
+class TestMonticuloRapido(unittest.TestCase):
+
+    def test_misma_secuencia_que_monticulo_binario(self):
+        """Prueba que, con las mismas operaciones al azar, los montículos rápidos devuelvan lo mismo."""
+        aleatorio = random.Random(11)
+        for lento, rapido in [(MonticuloMinimos(), MonticuloMinimosRapido()), (MonticuloMaximos(), MonticuloMaximosRapido())]:
+            for _ in range(500):
+                if aleatorio.random() < 0.6:
+                    valor = aleatorio.randint(-50, 50)
+                    lento.insertar(valor)
+                    rapido.insertar(valor)
+                else:
+                    self.assertEqual(rapido.eliminar_raiz(), lento.eliminar_raiz())
+                self.assertEqual(rapido.obtener_raiz(), lento.obtener_raiz())
+                self.assertEqual(rapido.tamano(), lento.tamano())
+
+    def test_desde_lista_rapido(self):
+        """Prueba la construcción con heapify en ambos tipos."""
+        valores = [5, 1, 4, 2, 3]
+        self.assertEqual(MonticuloMinimosRapido.desde_lista(valores).obtener_raiz(), 1)
+        max_heap = MonticuloMaximosRapido.desde_lista(valores)
+        self.assertEqual([max_heap.eliminar_raiz() for _ in valores], [5, 4, 3, 2, 1])
+
+    def test_vacio_rapido(self):
+        """Prueba las operaciones en un montículo rápido vacío."""
+        max_heap = MonticuloMaximosRapido()
+        self.assertTrue(max_heap.esta_vacio())
+        self.assertIsNone(max_heap.obtener_raiz())
+        self.assertIsNone(max_heap.eliminar_raiz())
+
+    def test_minimos_rapido_acepta_tuplas(self):
+        """El montículo de mínimos rápido acepta cualquier valor comparable (p. ej. (instante, valor))."""
+        min_heap = MonticuloMinimosRapido.desde_lista([(2, "b"), (1, "a")])
+        self.assertEqual(min_heap.eliminar_raiz(), (1, "a"))
+
+
+class TestMonticuloIndexado(unittest.TestCase):
+
+    def test_actualizar_y_eliminar_al_azar(self):
+        """Prueba que, con inserciones, cambios de prioridad y eliminaciones al azar, la raíz sea siempre la máxima."""
+        aleatorio = random.Random(5)
+        heap = MonticuloIndexadoMaximos()
+        prioridades = {} #Referencia: clave -> prioridad
+        for paso in range(1000):
+            operacion = aleatorio.random()
+            if operacion < 0.4 or not prioridades:
+                prioridades[paso] = aleatorio.randint(0, 100)
+                heap.insertar(paso, prioridades[paso])
+            elif operacion < 0.7:
+                clave = aleatorio.choice(list(prioridades))
+                prioridades[clave] = aleatorio.randint(0, 100)
+                heap.actualizar_prioridad(clave, prioridades[clave])
+            else:
+                clave = aleatorio.choice(list(prioridades))
+                self.assertEqual(heap.eliminar(clave), prioridades.pop(clave))
+            self.assertEqual(heap.tamano(), len(prioridades))
+            if prioridades:
+                self.assertEqual(heap.obtener_raiz()[1], max(prioridades.values()))
+
+    def test_desde_pares_y_primeros(self):
+        """Prueba la construcción en O(n) y que primeros no modifique el montículo."""
+        heap = MonticuloIndexadoMaximos.desde_pares([("a", 3), ("b", 9), ("c", 1), ("d", 7), ("e", 5)])
+        self.assertEqual(heap.primeros(3), [("b", 9), ("d", 7), ("e", 5)])
+        self.assertEqual(heap.tamano(), 5)
+        self.assertEqual([heap.eliminar_raiz()[0] for _ in range(5)], ["b", "d", "e", "a", "c"])
+        self.assertIsNone(heap.eliminar_raiz())
+        self.assertIsNone(heap.obtener_raiz())
+
+    def test_minimos_y_contiene(self):
+        """Prueba el montículo indexado de mínimos, 'in' y la prioridad de una clave."""
+        heap = MonticuloIndexadoMinimos()
+        heap.insertar(1, 10)
+        heap.insertar(2, 20)
+        heap.actualizar_prioridad(2, 5) #Baja la prioridad: pasa a la raíz
+        self.assertEqual(heap.obtener_raiz(), (2, 5))
+        self.assertIn(1, heap)
+        self.assertEqual(heap.prioridad(1), 10)
+        heap.eliminar(1)
+        self.assertNotIn(1, heap)
+
+    def test_errores_de_clave(self):
+        """Cubre las claves repetidas y las claves inexistentes."""
+        heap = MonticuloIndexadoMaximos()
+        heap.insertar(1, 1)
+        with self.assertRaises(ValueError):
+            heap.insertar(1, 2)
+        with self.assertRaises(ValueError):
+            MonticuloIndexadoMaximos.desde_pares([(1, 1), (1, 2)])
+        with self.assertRaises(KeyError):
+            heap.actualizar_prioridad(2, 5)
+        with self.assertRaises(KeyError):
+            heap.eliminar(2)
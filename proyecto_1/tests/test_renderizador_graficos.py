@@ -0,0 +1,95 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from modules.graficador import Graficador, CacheGraficos, CacheGraficosMemoria
+from modules.renderizador_graficos import RenderizadorGraficos, LISTO, PENDIENTE, SIN_GRAFICO
+
+STATS = {'pendientes': 40.0, 'en_proceso': 35.0, 'resueltos': 25.0, 'total': 100}
+
+
+class TestRenderizadorGraficos(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = CacheGraficos(tempfile.mkdtemp())
+        self.liberar = threading.Event()
+        self.llamadas = []
+        self.ejecutor = ThreadPoolExecutor(2)
+        self.addCleanup(self.ejecutor.shutdown)
+        self.renderizador = RenderizadorGraficos(ejecutor=self.ejecutor)
+
+    def dibujar_lento(self, datos, destino, formato):
+        """Reemplaza al Graficador: espera a que se lo libere y escribe un PNG falso."""
+        self.llamadas.append(datos)
+        self.liberar.wait(5)
+        destino.write(b"png")
+        return destino
+
+    def test_dibuja_fuera_del_pedido_una_sola_vez(self):
+        """Prueba que el primer pedido no espere, que los repetidos no encolen otro dibujo y que después se use la cache."""
+        with mock.patch.object(Graficador, 'generar_grafico_estados', side_effect=self.dibujar_lento):
+            ruta, listo = self.renderizador.solicitar(self.cache, "estados", STATS)
+            self.assertFalse(listo)
+            self.assertEqual(self.renderizador.estado(self.cache, ruta), PENDIENTE)
+            self.assertEqual(self.renderizador.solicitar(self.cache, "estados", STATS), (ruta, False))
+
+            self.liberar.set()
+            self.assertEqual(self.renderizador.obtener(self.cache, "estados", STATS, timeout=5), ruta)
+            self.assertEqual(self.renderizador.estado(self.cache, ruta), LISTO)
+            self.assertEqual(self.renderizador.solicitar(self.cache, "estados", STATS), (ruta, True))
+        self.assertEqual(len(self.llamadas), 1)
+        self.assertEqual([n for n in os.listdir(self.cache.carpeta) if n.startswith(".")], []) #No quedan temporales
+
+    def test_cache_en_memoria(self):
+        """Prueba que con CacheGraficosMemoria el gráfico quede sólo en memoria y se puedan pedir sus bytes."""
+        cache = CacheGraficosMemoria()
+        with mock.patch.object(Graficador, 'generar_grafico_estados', side_effect=self.dibujar_lento):
+            self.liberar.set()
+            self.assertEqual(self.renderizador.obtener_contenido(cache, "estados", STATS, timeout=5), b"png")
+            nombre, listo = self.renderizador.solicitar(cache, "estados", STATS)
+        self.assertTrue(listo)
+        self.assertEqual(self.renderizador.estado(cache, nombre), LISTO)
+        self.assertEqual(self.renderizador.estado(cache, "estados_otro.png"), SIN_GRAFICO)
+
+    def test_sin_datos_y_errores(self):
+        """Cubre los gráficos sin datos, un dibujo que falla y una ruta desconocida."""
+        self.assertIsNone(self.renderizador.solicitar(self.cache, "estados", {'total': 0}))
+        self.assertIsNone(self.renderizador.solicitar(self.cache, "wordcloud", []))
+
+        with mock.patch.object(Graficador, 'generar_wordcloud', side_effect=RuntimeError("falló")), mock.patch('builtins.print'):
+            self.assertIsNone(self.renderizador.obtener(self.cache, "wordcloud", [("luz", 2)], timeout=5))
+        ruta = self.cache.ruta_para("wordcloud", [["luz", 2]])
+        self.assertEqual(self.renderizador.estado(self.cache, ruta), SIN_GRAFICO)
+        self.assertEqual(self.renderizador.estado(self.cache, os.path.join(self.cache.carpeta, "otro.png")), SIN_GRAFICO)
+
+    def test_referencias_sin_grafico_acotadas(self):
+        """Prueba que sólo se recuerden las últimas referencias sin gráfico, y que olvidarlas no cambie su estado."""
+        renderizador = RenderizadorGraficos(ejecutor=self.ejecutor, maximo_sin_grafico=2)
+        referencias = []
+        with mock.patch.object(Graficador, 'generar_wordcloud', side_effect=RuntimeError("falló")), mock.patch('builtins.print'):
+            for palabra in ["luz", "agua", "gas"]:
+                self.assertIsNone(renderizador.obtener(self.cache, "wordcloud", [(palabra, 2)], timeout=5))
+                referencias.append(self.cache.ruta_para("wordcloud", [[palabra, 2]]))
+        self.assertEqual(len(renderizador._RenderizadorGraficos__sin_grafico), 2)
+        self.assertNotIn(referencias[0], renderizador._RenderizadorGraficos__sin_grafico)
+        for referencia in referencias:
+            self.assertEqual(renderizador.estado(self.cache, referencia), SIN_GRAFICO)
+        with self.assertRaises(ValueError):
+            RenderizadorGraficos(ejecutor=self.ejecutor, maximo_sin_grafico=0)
+
+    def test_pool_de_procesos_real(self):
+        """Dibuja de verdad en un proceso aparte (con la API Figure, sin pyplot)."""
+        renderizador = RenderizadorGraficos(cantidad_procesos=1)
+        self.addCleanup(renderizador.detener)
+        ruta = renderizador.obtener(self.cache, "estados", STATS, timeout=60)
+        with open(ruta, "rb") as archivo:
+            self.assertEqual(archivo.read(4), b"\x89PNG")
+
+if __name__ == '__main__':
+    unittest.main()
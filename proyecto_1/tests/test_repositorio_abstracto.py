@@ -78,6 +78,11 @@ class TestIRepositorio(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             self.repo.obtener_todos_por_filtro(nombre="test")
 
+    def test_obtener_pagina_por_filtro_no_implementado(self):
+        """Verifica que IRepositorio.obtener_pagina_por_filtro lance NotImplementedError si no se sobrescribe."""
+        with self.assertRaises(NotImplementedError):
+            self.repo.obtener_pagina_por_filtro(10, nombre="test")
+
 if __name__ == '__main__':
     unittest.main()
 
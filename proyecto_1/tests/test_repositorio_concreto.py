@@ -5,12 +5,17 @@ warnings.filterwarnings("ignore", category=UserWarning)
 
 import unittest
 from unittest.mock import MagicMock, patch
-from modules.repositorio_concreto import RepositorioUsuariosSQLAlchemy, RepositorioReclamosSQLAlchemy
+from modules.repositorio_concreto import RepositorioUsuariosSQLAlchemy, RepositorioReclamosSQLAlchemy, RepositorioTrabajosReportesSQLAlchemy
+from modules.trabajo_reporte import TrabajoReporte, TERMINADO
 from modules.usuario import Usuario
 from modules.reclamo import Reclamo
 from modules.roles import JefeDepartamento, SecretarioTecnico
 from modules.modelos_db import ModeloUsuario, ModeloReclamo, Base
 from modules.config_db import engine
+from modules.repositorio_abstracto import Consulta
+from inicializar_db import migrar_esquema
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
 import datetime
 from typing import Optional, List 
 
@@ -224,6 +229,259 @@ class TestRepositorioReclamosSQLAlchemy(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Reclamo no encontrado para eliminar"):
             self.repo.eliminar(99)
 
+    # --- Pruebas de Carga Masiva (sin N+1) ---
+
+    def test_obtener_todos_comparte_usuarios_entre_reclamos(self):
+        """Prueba que un mismo usuario se mapee una sola vez aunque aparezca en varios reclamos."""
+        creador = mock_modelo_usuario(id=1)
+        adherente = mock_modelo_usuario(id=2)
+        modelo_1 = mock_modelo_reclamo(id=1, id_creador=1)
+        modelo_2 = mock_modelo_reclamo(id=2, id_creador=1)
+        modelo_1.creador = creador
+        modelo_2.creador = creador
+        modelo_1.adherentes = [adherente]
+        modelo_2.adherentes = [adherente]
+        self.mock_query.options.return_value.all.return_value = [modelo_1, modelo_2]
+
+        reclamos = self.repo.obtener_todos()
+
+        self.assertEqual(len(reclamos), 2)
+        self.assertIs(reclamos[0].usuario_creador, reclamos[1].usuario_creador) #Mapa de identidad
+        self.assertIs(reclamos[0].adherentes[0], reclamos[1].adherentes[0])
+        self.mock_repo_usuarios.obtener_por_id.assert_not_called() #No hay consultas por cada reclamo
+
+    def test_obtener_todos_por_filtro_inconsistencia_usuario(self):
+        """Cubre la excepción de la carga masiva si el reclamo no tiene creador."""
+        modelo = mock_modelo_reclamo(id=1, id_creador=99)
+        self.mock_query.options.return_value.filter_by.return_value.all.return_value = [modelo]
+        with self.assertRaisesRegex(Exception, "Inconsistencia: No se encontró el usuario creador"):
+            self.repo.obtener_todos_por_filtro(estado="pendiente")
+
+    # --- Pruebas de Paginación ---
+
+    def __configurar_pagina(self, modelos):
+        query_pagina = self.mock_query.options.return_value.filter_by.return_value
+        query_pagina.filter.return_value = query_pagina
+        query_pagina.order_by.return_value.limit.return_value.all.return_value = modelos
+        return query_pagina
+
+    def __modelo_con_creador(self, id):
+        modelo = mock_modelo_reclamo(id=id, id_creador=1)
+        modelo.creador = mock_modelo_usuario(id=1)
+        return modelo
+
+    def test_obtener_pagina_con_siguiente(self):
+        """Prueba que se devuelva cursor cuando hay más elementos que el tamaño de página."""
+        query_pagina = self.__configurar_pagina([self.__modelo_con_creador(i) for i in (1, 2, 3)])
+        pagina = self.repo.obtener_pagina_por_filtro(2, estado="pendiente")
+        self.assertEqual([r.id_reclamo for r in pagina.elementos], [1, 2])
+        self.assertTrue(pagina.hay_siguiente)
+        query_pagina.order_by.return_value.limit.assert_called_once_with(3) #Se pide un elemento de más
+
+        # El cursor devuelto se puede usar para pedir la página siguiente
+        self.repo.obtener_pagina_por_filtro(2, pagina.cursor_siguiente, estado="pendiente")
+        query_pagina.filter.assert_called_once()
+
+    def test_obtener_pagina_ultima(self):
+        """Prueba que la última página no tenga cursor siguiente."""
+        self.__configurar_pagina([self.__modelo_con_creador(1)])
+        pagina = self.repo.obtener_pagina_por_filtro(2)
+        self.assertEqual(len(pagina.elementos), 1)
+        self.assertIsNone(pagina.cursor_siguiente)
+
+    def test_iterar_por_filtro_recorre_todas_las_paginas(self):
+        """Prueba que iterar_por_filtro pida página por página siguiendo el cursor."""
+        query_pagina = self.__configurar_pagina([])
+        query_pagina.order_by.return_value.limit.return_value.all.side_effect = [
+            [self.__modelo_con_creador(i) for i in (1, 2, 3)], #Primera página (con uno de más)
+            [self.__modelo_con_creador(3)], #Última página
+        ]
+        reclamos = self.repo.iterar_por_filtro(2, departamento="maestranza")
+        self.assertEqual([r.id_reclamo for r in reclamos], [1, 2, 3])
+        self.assertEqual(query_pagina.order_by.return_value.limit.return_value.all.call_count, 2)
+        query_pagina.filter.assert_called_once() #La segunda página continúa desde el cursor
+
+    def test_obtener_pagina_cursor_invalido(self):
+        """Cubre el error si el cursor fue manipulado."""
+        self.__configurar_pagina([])
+        with self.assertRaisesRegex(ValueError, "cursor de paginación no es válido"):
+            self.repo.obtener_pagina_por_filtro(2, "no-es-un-cursor")
+
+    def test_obtener_pagina_tamano_invalido(self):
+        """Cubre el error si el tamaño de página no es positivo."""
+        with self.assertRaises(ValueError):
+            self.repo.obtener_pagina_por_filtro(0)
+
     @classmethod
     def tearDownClass(cls):
-        return super().tearDownClass()
\ No newline at end of file
+        return super().tearDownClass()
+
+
+class TestConsultaReclamosSQLite(unittest.TestCase):
+    """Pruebas de la traducción de Consulta a SQL sobre una BD SQLite en memoria."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        migrar_esquema(self.engine) # Como al arrancar el servidor: crea version_datos y sus triggers
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo_usuarios = RepositorioUsuariosSQLAlchemy(self.session)
+        self.repo = RepositorioReclamosSQLAlchemy(self.session)
+        creador = Usuario("C", "R", "c@r.com", "creador", "estudiante", "pass")
+        self.repo_usuarios.guardar(creador)
+
+        base = datetime.datetime(2025, 3, 1, 10, 0)
+        datos = [("maestranza", "pendiente", None), ("maestranza", "en proceso", 3),
+                 ("soporte informático", "en proceso", 10), ("soporte informático", "resuelto", 7)]
+        for dia, (depto, estado, dias) in enumerate(datos):
+            reclamo = Reclamo(creador, f"Reclamo {dia}", depto)
+            reclamo._Reclamo__timestamp = base + datetime.timedelta(days=dia)
+            if dias is not None:
+                reclamo.cambiar_estado("en proceso", dias)
+            reclamo.cambiar_estado(estado, dias)
+            self.repo.guardar(reclamo)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_version_datos_cambia_con_cada_modificacion(self):
+        """Prueba que los triggers sumen a la versión al crear, modificar y adherir, y no al consultar."""
+        version = self.repo.obtener_version_datos()
+        self.assertGreater(version, 0) #Los reclamos del setUp ya la cambiaron
+        self.repo.obtener_todos()
+        self.assertEqual(self.repo.obtener_version_datos(), version)
+
+        reclamo = self.repo.obtener_por_filtro(estado="pendiente")
+        reclamo.cambiar_estado("en proceso", 2)
+        self.repo.actualizar(reclamo)
+        self.assertGreater(self.repo.obtener_version_datos(), version)
+
+        version = self.repo.obtener_version_datos()
+        adherente = Usuario("D", "E", "d@e.com", "adherente", "estudiante", "pass")
+        self.repo_usuarios.guardar(adherente)
+        self.repo_usuarios.asociar_reclamo_a_usuario(adherente.id_bd, reclamo.id_reclamo)
+        self.assertGreater(self.repo.obtener_version_datos(), version)
+
+    def test_version_datos_compartida_entre_sesiones(self):
+        """Prueba que otra sesión (otro proceso) vea la misma versión y sus cambios."""
+        otro_repo = RepositorioReclamosSQLAlchemy(sessionmaker(bind=self.engine)())
+        self.assertEqual(otro_repo.obtener_version_datos(), self.repo.obtener_version_datos())
+        creador = self.repo_usuarios.obtener_por_filtro(nombre_usuario="creador")
+        otro_repo.guardar(Reclamo(creador, "Otro reclamo", "maestranza"))
+        self.assertEqual(self.repo.obtener_version_datos(), otro_repo.obtener_version_datos())
+        otro_repo.cerrar()
+
+    def test_el_repositorio_no_crea_los_triggers(self):
+        """Prueba que los triggers y la fila de version_datos los cree migrar_esquema, y que repetirla no los duplique."""
+        motor = create_engine("sqlite://")
+        RepositorioReclamosSQLAlchemy(sessionmaker(bind=motor)()).cerrar()
+        triggers = "SELECT count(*) FROM sqlite_master WHERE type = 'trigger'"
+        with motor.connect() as conexion:
+            self.assertEqual(conexion.execute(text(triggers)).scalar(), 0)
+        migrar_esquema(motor)
+        migrar_esquema(motor)
+        with motor.connect() as conexion:
+            self.assertEqual(conexion.execute(text(triggers)).scalar(), 6)
+            self.assertEqual(conexion.execute(text("SELECT count(*) FROM version_datos")).scalar(), 1)
+        motor.dispose()
+
+    def test_filtro_en_y_orden_descendente(self):
+        """Prueba el filtro IN combinado con orden descendente."""
+        consulta = Consulta().en("estado", ["en proceso", "resuelto"]).ordenar_por("tiempo_resolucion_asignado", descendente=True)
+        resultado = self.repo.obtener_por_consulta(consulta)
+        self.assertEqual([r.tiempo_resolucion_asignado for r in resultado], [10, 7, 3])
+
+    def test_rango_de_fechas(self):
+        """Prueba la ventana de fechas inclusiva sobre timestamp."""
+        consulta = Consulta().entre("timestamp", datetime.datetime(2025, 3, 2), datetime.datetime(2025, 3, 3, 23, 59))
+        resultado = self.repo.obtener_por_consulta(consulta.ordenar_por("timestamp"))
+        self.assertEqual([r.contenido for r in resultado], ["Reclamo 1", "Reclamo 2"])
+
+    def test_rango_abierto_y_limite(self):
+        """Prueba un rango con un solo extremo junto con límite y desplazamiento."""
+        consulta = Consulta(departamento="soporte informático").entre("tiempo_resolucion_asignado", desde=5)
+        resultado = self.repo.obtener_por_consulta(consulta.ordenar_por("id").limitar(1, desplazamiento=1))
+        self.assertEqual([r.contenido for r in resultado], ["Reclamo 3"])
+
+    def test_pagina_con_consulta(self):
+        """Prueba que la paginación respete los filtros de la consulta."""
+        pagina = self.repo.obtener_pagina_por_filtro(1, None, Consulta().en("departamento", ["maestranza"]))
+        self.assertEqual(len(pagina.elementos), 1)
+        siguiente = self.repo.obtener_pagina_por_filtro(1, pagina.cursor_siguiente, Consulta().en("departamento", ["maestranza"]))
+        self.assertEqual(len(siguiente.elementos), 1)
+        self.assertIsNone(siguiente.cursor_siguiente)
+
+    def test_campo_inexistente(self):
+        """Cubre el error si la consulta usa un campo que no existe."""
+        with self.assertRaisesRegex(ValueError, "no existe en los reclamos"):
+            self.repo.obtener_por_consulta(Consulta().ordenar_por("prioridad"))
+
+    def test_contar_por_estado(self):
+        """Prueba el conteo agrupado (GROUP BY) con y sin filtro."""
+        self.assertEqual(self.repo.contar_por("estado"), {"pendiente": 1, "en proceso": 2, "resuelto": 1})
+        self.assertEqual(self.repo.contar_por("estado", Consulta(departamento="maestranza")), {"pendiente": 1, "en proceso": 1})
+
+    def test_iterar_columna(self):
+        """Prueba que se recorran sólo los valores de la columna pedida."""
+        consulta = Consulta().en("estado", ["en proceso", "resuelto"]).ordenar_por("tiempo_resolucion_asignado")
+        self.assertEqual(list(self.repo.iterar_columna("tiempo_resolucion_asignado", consulta, tamano_lote=1)), [3, 7, 10])
+
+    def test_iterar_columnas(self):
+        """Prueba que se devuelva una tupla por reclamo con las columnas pedidas, en ese orden."""
+        filas = list(self.repo.iterar_columnas(["estado", "tiempo_resolucion_asignado"], Consulta(departamento="maestranza").ordenar_por("id")))
+        self.assertEqual(len(filas), 2)
+        self.assertTrue(all(isinstance(fila, tuple) and len(fila) == 2 for fila in filas))
+        self.assertEqual(sorted(fila[0] for fila in filas), ["en proceso", "pendiente"])
+        self.assertEqual(len(list(self.repo.iterar_columnas(["id"]))), 4)
+
+
+    def test_contar_adherentes(self):
+        """Prueba que se cuenten los adherentes por reclamo, sólo de los reclamos que cumplen la consulta."""
+        pendiente = self.repo.obtener_por_filtro(estado="pendiente")
+        resuelto = self.repo.obtener_por_filtro(estado="resuelto")
+        for i in range(2):
+            adherente = Usuario("D", "E", f"d{i}@e.com", f"adherente{i}", "estudiante", "pass")
+            self.repo_usuarios.guardar(adherente)
+            self.repo_usuarios.asociar_reclamo_a_usuario(adherente.id_bd, pendiente.id_reclamo)
+        self.repo_usuarios.asociar_reclamo_a_usuario(adherente.id_bd, resuelto.id_reclamo)
+        self.assertEqual(self.repo.contar_adherentes(Consulta(estado="pendiente")), {pendiente.id_reclamo: 2})
+        self.assertEqual(self.repo.contar_adherentes(), {pendiente.id_reclamo: 2, resuelto.id_reclamo: 1})
+
+class TestRepositorioTrabajosReportesSQLite(unittest.TestCase):
+    """Pruebas del repositorio de trabajos de reportes sobre una BD SQLite en memoria."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.session = sessionmaker(bind=self.engine)()
+        self.repo = RepositorioTrabajosReportesSQLAlchemy(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_guardar_actualizar_y_obtener(self):
+        """Prueba que el estado de un trabajo se guarde y se lea de la BD."""
+        trabajo = TrabajoReporte("jefe", "maestranza", "pdf", "v1", "equipo:123")
+        self.repo.guardar(trabajo)
+        trabajo.iniciar()
+        trabajo.terminar("reportes/reporte.pdf")
+        self.repo.actualizar(trabajo)
+
+        leido = self.repo.obtener_por_id(trabajo.id_trabajo)
+        self.assertEqual(leido.clave_pedido, ("jefe", "maestranza", "pdf", "v1"))
+        self.assertEqual(leido.estado, TERMINADO)
+        self.assertEqual(leido.ruta_archivo, "reportes/reporte.pdf")
+        self.assertEqual(leido.propietario, "equipo:123")
+        self.assertIsNone(self.repo.obtener_por_id("no-existe"))
+
+    def test_obtener_por_filtro_sin_departamento_devuelve_el_mas_reciente(self):
+        """Prueba que el filtro con departamento None busque los reportes de todo el sistema."""
+        viejo = TrabajoReporte("secretario", None, "html", "v1")
+        nuevo = TrabajoReporte("secretario", None, "html", "v1")
+        nuevo._TrabajoReporte__creado = viejo.creado + datetime.timedelta(seconds=1)
+        for trabajo in (viejo, nuevo, TrabajoReporte("jefe", "maestranza", "html", "v1")):
+            self.repo.guardar(trabajo)
+
+        encontrado = self.repo.obtener_por_filtro(rol="secretario", departamento=None, formato="html", version_datos="v1")
+        self.assertEqual(encontrado.id_trabajo, nuevo.id_trabajo)
+        self.assertEqual(len(self.repo.obtener_todos_por_filtro(departamento=None)), 2)
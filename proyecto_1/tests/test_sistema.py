@@ -3,13 +3,16 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=ResourceWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
+import datetime
 import unittest
 from unittest.mock import MagicMock, patch
 from modules.sistema import SubsistemaGestionReclamos
+from modules.triage import ColaTriage
+from modules.repositorio_abstracto import TAMANO_PAGINA_POR_DEFECTO
 from modules.usuario import Usuario
 from modules.reclamo import Reclamo
 from modules.roles import JefeDepartamento, SecretarioTecnico
-from modules.excepciones import UsuarioExistenteError, UsuarioInexistenteError, ReclamoInexistenteError
+from modules.excepciones import UsuarioExistenteError, UsuarioInexistenteError, ReclamoInexistenteError, InicializacionError
 from io import StringIO
 from modules.config_db import engine
 
@@ -23,6 +26,8 @@ class MockRepo:
         self.obtener_por_id = MagicMock()
         self.actualizar = MagicMock()
         self.obtener_todos_por_filtro = MagicMock()
+        self.obtener_pagina_por_filtro = MagicMock()
+        self.obtener_por_consulta = MagicMock()
         self.asociar_reclamo_a_usuario = MagicMock()
         #Mock de un atributo interno usado por listar_reclamos_usuario
         self.session_mock = MagicMock()
@@ -228,6 +233,140 @@ class TestSubsistemaGestionReclamos(unittest.TestCase):
         
         self.repo_reclamos.obtener_todos_por_filtro.assert_called_once_with(estado="pendiente", departamento="soporte informático")
 
+    def test_buscar_reclamos_pendientes_paginado(self, mock_print):
+        """Prueba que la página pida estado pendiente, departamento y cursor al repositorio."""
+        self.sistema.buscar_reclamos_pendientes_paginado("maestranza", 10, "cursor")
+        self.repo_reclamos.obtener_pagina_por_filtro.assert_called_once_with(10, "cursor", estado="pendiente", departamento="maestranza")
+
+    def test_listar_reclamos_usuario_paginado(self, mock_print):
+        """Prueba que la página de un usuario se filtre por su ID de BD."""
+        self.repo_usuarios.obtener_por_filtro.return_value = usuario_final
+        self.sistema.listar_reclamos_usuario_paginado(usuario_final, 5)
+        self.repo_reclamos.obtener_pagina_por_filtro.assert_called_once_with(5, None, id_usuario_creador=1)
+
+    def test_listar_reclamos_usuario_paginado_inexistente(self, mock_print):
+        """Prueba que falle si el usuario no existe."""
+        self.repo_usuarios.obtener_por_filtro.return_value = None
+        with self.assertRaises(UsuarioInexistenteError):
+            self.sistema.listar_reclamos_usuario_paginado(usuario_final)
+
+    def test_crear_reclamo_ya_clasificado(self, mock_print):
+        """Prueba que no se vuelva a clasificar si el departamento ya viene dado."""
+        self.repo_usuarios.obtener_por_filtro.return_value = usuario_final
+        reclamo = self.sistema.crear_reclamo(usuario_final, "Hay basura", departamento="maestranza")
+        self.assertEqual(reclamo.departamento, "maestranza")
+        self.mock_clasificador.clasificar.assert_not_called()
+
+    def test_flujo_creacion_clasifica_una_sola_vez(self, mock_print):
+        """Prueba el flujo clasificar -> buscar similares -> crear con una única clasificación."""
+        self.repo_usuarios.obtener_por_filtro.return_value = usuario_final
+        self.repo_reclamos.obtener_todos_por_filtro.return_value = []
+        departamento = self.sistema.clasificar_reclamo("Red lenta")
+        self.sistema.buscar_reclamos_similares("Red lenta", departamento)
+        self.sistema.crear_reclamo(usuario_final, "Red lenta", departamento)
+        self.mock_clasificador.clasificar.assert_called_once_with("Red lenta")
+        self.repo_reclamos.obtener_todos_por_filtro.assert_called_once_with(estado="pendiente", departamento="soporte informático")
+
+    @patch('modules.sistema.ColaClasificacion')
+    def test_crear_reclamo_asincronico(self, MockCola, mock_print):
+        """Prueba que en modo asincrónico el reclamo se guarde con el departamento provisional y se encole."""
+        sistema = SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, clasificacion_asincronica=True, tamano_lote=8)
+        MockCola.assert_called_once_with(self.mock_clasificador, tamano_lote=8)
+        self.repo_usuarios.obtener_por_filtro.return_value = usuario_final
+        self.repo_reclamos.guardar.side_effect = lambda reclamo: setattr(reclamo, "id_reclamo", 99) #Simula el ID asignado por la BD
+
+        reclamo = sistema.crear_reclamo(usuario_final, "Hay basura")
+
+        self.assertTrue(sistema.clasificacion_asincronica)
+        self.assertEqual(reclamo.departamento, "secretaría técnica")
+        self.mock_clasificador.clasificar.assert_not_called() #No se espera al clasificador
+        MockCola.return_value.encolar.assert_called_once_with(99, "Hay basura")
+
+    def test_instantanea_recibe_cada_cambio(self, mock_print):
+        """Prueba que crear, cambiar de estado y derivar avisen a la instantánea de estadísticas."""
+        instantanea = MagicMock()
+        sistema = SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, instantanea_estadisticas=instantanea)
+        self.repo_usuarios.obtener_por_filtro.return_value = usuario_final
+        nuevo = sistema.crear_reclamo(usuario_final, "Hay basura", departamento="maestranza")
+        reclamo = Reclamo(usuario_final, "Red lenta", "soporte informático")
+        reclamo.id_reclamo = 7
+        self.repo_reclamos.obtener_por_id.return_value = reclamo
+        sistema.cambiar_estado_reclamo(jefe_soporte, 7, "en proceso", 3)
+        sistema.derivar_reclamo(secretario, 7, "maestranza")
+        self.assertEqual([c.args[0] for c in instantanea.actualizar.call_args_list], [nuevo, reclamo, reclamo])
+
+    def test_version_datos_viene_de_la_bd(self, mock_print):
+        """Prueba que version_datos sea el contador de cambios que lleva el repositorio de reclamos."""
+        self.repo_reclamos.obtener_version_datos = MagicMock(return_value=41)
+        self.assertEqual(self.sistema.version_datos, "41")
+
+    def test_reconstruir_estadisticas(self, mock_print):
+        """Prueba la reconstrucción desde la BD y el error si no hay instantánea."""
+        instantanea = MagicMock()
+        self.repo_reclamos.obtener_todos = MagicMock()
+        SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, instantanea_estadisticas=instantanea).reconstruir_estadisticas()
+        instantanea.reconstruir_desde_bd.assert_called_once_with(self.repo_reclamos)
+        self.repo_reclamos.obtener_todos.assert_not_called() #No se cargan las entidades
+        with self.assertRaises(InicializacionError):
+            self.sistema.reconstruir_estadisticas()
+
+    def test_triage_recibe_cambios_y_adhesiones(self, mock_print):
+        """Prueba que la cola de triage se avise al cambiar de estado y al adherir."""
+        triage = MagicMock(construida=True)
+        sistema = SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, triage=triage)
+        reclamo = Reclamo(usuario_final, "Red lenta", "soporte informático")
+        reclamo.id_reclamo = 7
+        self.repo_reclamos.obtener_por_id.return_value = reclamo
+        sistema.cambiar_estado_reclamo(jefe_soporte, 7, "en proceso", 3)
+        sistema.adherir_a_reclamo(usuario_final, 7)
+        self.assertEqual([c.args[0] for c in triage.actualizar.call_args_list], [reclamo, reclamo])
+        with self.assertRaises(InicializacionError):
+            self.sistema.listar_triage("soporte informático")
+
+    def test_listar_triage_lee_columnas_y_corrige_la_cola(self, mock_print):
+        """
+        Prueba que la cola se construya con el primer listado leyendo sólo columnas, y que los
+        reclamos que otro proceso cambió o borró se corrijan en la cola al listar.
+        """
+        ahora = datetime.datetime(2024, 6, 1, 12, 0)
+        reclamos = {}
+        for id_reclamo, dias in [(1, 3), (2, 2), (3, 1)]:
+            reclamo = Reclamo(usuario_final, f"Reclamo {id_reclamo}", "maestranza")
+            reclamo.id_reclamo = id_reclamo
+            reclamo._Reclamo__timestamp = ahora - datetime.timedelta(days=dias)
+            reclamos[id_reclamo] = reclamo
+        self.repo_reclamos.contar_adherentes = MagicMock(return_value={})
+        self.repo_reclamos.iterar_columnas = MagicMock(return_value=iter(
+            [(r.id_reclamo, r.departamento, r.timestamp) for r in reclamos.values()]))
+        # En la BD el 1 ya está en proceso (lo cambió otro proceso) y el 2 no existe más
+        reclamos[1]._Reclamo__estado = "en proceso"
+        del reclamos[2]
+        self.repo_reclamos.obtener_por_consulta.side_effect = lambda consulta: [
+            reclamos[i] for i in consulta.valores_en["id"] if i in reclamos]
+
+        triage = ColaTriage()
+        sistema = SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, triage=triage)
+        self.assertEqual(sistema.listar_triage("maestranza", 2), [reclamos[3]])
+        self.assertEqual(self.repo_reclamos.iterar_columnas.call_args.args[0], ["id", "departamento", "timestamp"])
+        self.repo_reclamos.obtener_todos_por_filtro.assert_not_called()
+        self.assertEqual(triage.tamano(), 1)
+
+    @patch('modules.sistema.ColaClasificacion')
+    def test_buscar_reclamos_similares_asincronico_no_clasifica(self, MockCola, mock_print):
+        """Prueba que en modo asincrónico se ofrezcan los pendientes más recientes de todos los departamentos, sin clasificar."""
+        sistema = SubsistemaGestionReclamos(self.repo_usuarios, self.repo_reclamos, clasificacion_asincronica=True)
+        self.repo_reclamos.obtener_por_consulta.return_value = ["reclamo pendiente"]
+        resultado = sistema.buscar_reclamos_similares("Red lenta")
+        self.assertEqual(resultado, ["reclamo pendiente"])
+        self.repo_reclamos.obtener_todos_por_filtro.assert_not_called()
+        self.mock_clasificador.clasificar.assert_not_called()
+
+        # La consulta está acotada: sólo pendientes, los más nuevos primero y como mucho una página
+        consulta = self.repo_reclamos.obtener_por_consulta.call_args.args[0]
+        self.assertEqual(consulta.igualdades, {"estado": "pendiente"})
+        self.assertEqual(consulta.orden, [("timestamp", True)])
+        self.assertEqual(consulta.limite, TAMANO_PAGINA_POR_DEFECTO)
+
     def test_buscar_reclamos_similares_clasificacion_indefinida(self, mock_print):
         """Cubre el caso donde la clasificación falla."""
         self.mock_clasificador.clasificar.return_value = "indefinido"
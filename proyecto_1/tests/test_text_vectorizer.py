@@ -0,0 +1,137 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning) 
+warnings.filterwarnings("ignore", category=ResourceWarning) 
+warnings.filterwarnings("ignore", category=UserWarning)
+import pickle
+import unittest
+from unittest.mock import patch
+import spacy
+from spacy.language import Language
+from scipy.sparse import issparse
+from modules.text_vectorizer import TextVectorizer, CacheLRU, FALTANTE, TAMANO_LOTE_POR_DEFECTO
+from modules.classifier import ClaimsClassifier
+
+
+@Language.component("lema_minuscula")
+def lema_minuscula(doc):
+    """Lematizador de prueba: usa la palabra en minúsculas como lema."""
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+def crear_nlp_prueba(*args, **kwargs):
+    """Pipeline liviano que reemplaza a es_core_news_sm (no está disponible en los tests)."""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("lema_minuscula")
+    return nlp
+
+
+TEXTOS = [
+    "La computadora del laboratorio 3 no enciende",
+    "El proyector del aula no proyecta, está roto.",
+    "La computadora del aula 5 no enciende",
+]
+
+
+class TestTextVectorizer(unittest.TestCase):
+
+    def setUp(self):
+        self.patcher = patch('modules.text_vectorizer.spacy.load', side_effect=crear_nlp_prueba)
+        self.patcher.start()
+        self.addCleanup(self.patcher.stop)
+        self.vectorizer = TextVectorizer(p_batch_size=2).fit(TEXTOS)
+
+    def test_transform_cuenta_lemas_sin_stopwords_ni_numeros(self):
+        """Prueba que la matriz cuente los lemas de cada texto, ignorando stopwords, números y puntuación."""
+        matriz = self.vectorizer.transform(["La computadora 3 no enciende. La computadora!"])
+        vocabulario = self.vectorizer._TextVectorizer__word2idx
+        self.assertTrue(issparse(matriz))
+        self.assertEqual(matriz.shape, (1, len(vocabulario)))
+        self.assertEqual(matriz.nnz, 2) #Sólo se guardan las celdas distintas de cero
+        self.assertEqual(matriz[0, vocabulario["computadora"]], 2)
+        self.assertEqual(matriz[0, vocabulario["enciende"]], 1)
+        self.assertNotIn("3", vocabulario)
+        self.assertNotIn("la", vocabulario)
+
+    def test_resultado_independiente_del_tamano_de_lote(self):
+        """Prueba que procesar por lotes dé lo mismo que procesar de a un texto."""
+        en_lote = self.vectorizer.transform(TEXTOS)
+        self.vectorizer.configurar_procesamiento(tamano_lote=1)
+        de_a_uno = self.vectorizer.transform(TEXTOS)
+        self.assertEqual(en_lote.toarray().tolist(), de_a_uno.toarray().tolist())
+
+    def test_configurar_procesamiento_invalido(self):
+        """Cubre el error con tamaño de lote o procesos no positivos."""
+        with self.assertRaises(ValueError):
+            self.vectorizer.configurar_procesamiento(tamano_lote=0)
+
+    def test_pickle_anterior_sin_configuracion_de_lotes(self):
+        """Prueba que un vectorizador guardado antes de existir los lotes use los valores por defecto."""
+        estado = dict(self.vectorizer.__getstate__())
+        del estado['_TextVectorizer__batch_size']
+        del estado['_TextVectorizer__n_process']
+        del estado['_TextVectorizer__sparse']
+        del estado['_TextVectorizer__cache_textos']
+        del estado['_TextVectorizer__cache_lemas']
+        restaurado = TextVectorizer.__new__(TextVectorizer)
+        restaurado.__setstate__(estado)
+        self.assertEqual(restaurado._TextVectorizer__batch_size, TAMANO_LOTE_POR_DEFECTO)
+        self.assertEqual(len(restaurado._TextVectorizer__cache_textos), 0)
+        # Los modelos viejos siguen recibiendo matrices densas
+        denso = restaurado.transform(TEXTOS)
+        self.assertFalse(issparse(denso))
+        self.assertEqual(denso.tolist(), self.vectorizer.transform(TEXTOS).toarray().tolist())
+
+    def test_texto_repetido_no_pasa_por_el_pipeline(self):
+        """Prueba que un texto ya visto (aunque cambien mayúsculas y espacios) salga de la caché de textos."""
+        with patch.object(self.vectorizer._TextVectorizer__nlp, 'pipe', wraps=self.vectorizer._TextVectorizer__nlp.pipe) as pipe:
+            matriz = self.vectorizer.transform(["LA computadora   del laboratorio 3 no enciende"])
+        pipe.assert_not_called()
+        self.assertEqual(matriz.toarray().tolist(), self.vectorizer.transform(TEXTOS[:1]).toarray().tolist())
+        self.assertGreater(self.vectorizer.estadisticas_cache()["textos"]["aciertos"], 0)
+
+    def test_texto_nuevo_pasa_por_el_pipeline_sin_cache_de_lemas(self):
+        """Prueba que, por defecto, un texto nuevo se lematice con spaCy aunque sus palabras sean conocidas."""
+        with patch.object(self.vectorizer._TextVectorizer__nlp, 'pipe', wraps=self.vectorizer._TextVectorizer__nlp.pipe) as pipe:
+            self.vectorizer.transform(["El proyector del laboratorio no enciende"])
+        pipe.assert_called_once()
+        self.assertEqual(self.vectorizer.estadisticas_cache()["lemas"]["tamano"], 0)
+
+    def test_texto_nuevo_con_palabras_conocidas_usa_la_cache_de_lemas(self):
+        """Prueba que, con la caché de lemas activada, un texto nuevo de palabras ya lematizadas no pase por el pipeline."""
+        vectorizer = TextVectorizer(p_batch_size=2, p_cache_lemas=100).fit(TEXTOS)
+        with patch.object(vectorizer._TextVectorizer__nlp, 'pipe') as pipe:
+            matriz = vectorizer.transform(["El proyector del laboratorio no enciende"])
+        pipe.assert_not_called()
+        vocabulario = vectorizer._TextVectorizer__word2idx
+        self.assertEqual(matriz[0, vocabulario["proyector"]], 1)
+        self.assertEqual(matriz.nnz, 3) #proyector, laboratorio, enciende
+
+    def test_cache_lru_descarta_el_menos_usado(self):
+        """Prueba el descarte por antigüedad y los contadores de aciertos y fallos."""
+        cache = CacheLRU(2)
+        cache.guardar("a", 1)
+        cache.guardar("b", None)
+        self.assertEqual(cache.obtener("a"), 1) #"a" pasa a ser el más reciente
+        cache.guardar("c", 3)
+        self.assertIs(cache.obtener("b"), FALTANTE)
+        self.assertEqual(cache.obtener("c"), 3)
+        self.assertEqual(cache.estadisticas(), {"aciertos": 2, "fallos": 1, "tamano": 2})
+
+    def test_caches_sobreviven_al_pickle(self):
+        """Prueba que las cachés se guarden con el vectorizador y sigan funcionando al cargarlo."""
+        restaurado = pickle.loads(pickle.dumps(self.vectorizer))
+        self.assertEqual(len(restaurado._TextVectorizer__cache_textos), len(TEXTOS))
+        restaurado.transform(TEXTOS)
+        self.assertEqual(restaurado.estadisticas_cache()["textos"]["aciertos"], len(TEXTOS))
+
+    def test_clasificador_entrena_y_clasifica_con_matriz_dispersa(self):
+        """Prueba que el pipeline de ClaimsClassifier acepte la salida dispersa del vectorizador."""
+        clf = ClaimsClassifier().fit(TEXTOS * 4, ["soporte informático", "maestranza", "soporte informático"] * 4)
+        resultado = clf.classify(["La computadora no enciende"])
+        self.assertEqual(len(resultado), 1)
+        self.assertIn(resultado[0], ["soporte informático", "maestranza"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import warnings
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", category=ResourceWarning)
+warnings.filterwarnings("ignore", category=UserWarning)
+import datetime
+import unittest
+from modules.triage import ColaTriage, prioridad_triage, prioridad_de, DIAS_POR_ADHERENTE
+from modules.reclamo import Reclamo
+from modules.usuario import Usuario
+
+usuario_final = Usuario("A", "B", "a@b.com", "user", "estudiante", "pass", id_bd=1)
+AHORA = datetime.datetime(2024, 6, 1, 12, 0)
+
+
+def crear_reclamo(id_reclamo, dias_antiguedad, adherentes=0, departamento="maestranza", estado="pendiente"):
+    reclamo = Reclamo(usuario_final, f"Reclamo {id_reclamo}", departamento)
+    reclamo.id_reclamo = id_reclamo
+    reclamo._Reclamo__timestamp = AHORA - datetime.timedelta(days=dias_antiguedad)
+    reclamo._Reclamo__estado = estado
+    for i in range(adherentes):
+        reclamo.agregar_adherente(Usuario("N", "A", f"{i}@a.com", f"adh{i}", "docente", "pass", id_bd=100 + i))
+    return reclamo
+
+
+class TestColaTriage(unittest.TestCase):
+
+    def setUp(self):
+        self.reclamos = [
+            crear_reclamo(1, dias_antiguedad=1),
+            crear_reclamo(2, dias_antiguedad=5),
+            crear_reclamo(3, dias_antiguedad=0, adherentes=2), #2 adherentes "valen" 6 días
+            crear_reclamo(4, dias_antiguedad=9, estado="resuelto"), #No es pendiente: no entra
+            crear_reclamo(5, dias_antiguedad=2, departamento="soporte informático"),
+        ]
+        self.triage = ColaTriage()
+        self.triage.reconstruir(self.reclamos)
+
+    def ids(self, departamento, cantidad=10):
+        return self.triage.primeros(departamento, cantidad)
+
+    def test_orden_por_adherentes_y_antiguedad(self):
+        """Prueba el orden inicial y que sólo se incluyan los pendientes."""
+        self.assertEqual(self.ids("maestranza"), [3, 2, 1])
+        self.assertEqual(self.ids("maestranza", 2), [3, 2])
+        self.assertEqual(self.triage.tamano(), 4)
+        self.assertEqual(self.triage.tamano("soporte informático"), 1)
+        self.assertEqual(self.ids("secretaría técnica"), [])
+
+    def test_adhesion_sube_la_prioridad(self):
+        """Prueba que un reclamo con nuevos adherentes suba en la cola."""
+        reclamo = self.reclamos[0]
+        for i in range(3):
+            reclamo.agregar_adherente(Usuario("N", "A", f"x{i}@a.com", f"x{i}", "docente", "pass", id_bd=200 + i))
+        self.triage.actualizar(reclamo)
+        self.assertEqual(self.ids("maestranza"), [1, 3, 2])
+
+    def test_cambio_de_estado_y_derivacion(self):
+        """Prueba que un reclamo que deja de estar pendiente salga, y que uno derivado cambie de departamento."""
+        self.reclamos[1].cambiar_estado("en proceso", 3)
+        self.triage.actualizar(self.reclamos[1])
+        self.reclamos[0].departamento = "soporte informático" #Mismo objeto, ya modificado
+        self.triage.actualizar(self.reclamos[0])
+        self.assertEqual(self.ids("maestranza"), [3])
+        self.assertEqual(self.ids("soporte informático"), [5, 1])
+
+    def test_reclamo_nuevo_y_cola_sin_construir(self):
+        """Prueba que un reclamo nuevo se agregue, y que antes de construirse la cola se ignoren los cambios."""
+        self.triage.actualizar(crear_reclamo(6, dias_antiguedad=30))
+        self.assertEqual(self.ids("maestranza"), [6, 3, 2, 1])
+        sin_construir = ColaTriage()
+        sin_construir.actualizar(crear_reclamo(7, dias_antiguedad=1))
+        self.assertFalse(sin_construir.construida)
+        self.assertEqual(sin_construir.tamano(), 0)
+
+    def test_prioridad_no_depende_del_momento(self):
+        """Un adherente equivale a DIAS_POR_ADHERENTE días de antigüedad; a igual puntaje gana el menor id."""
+        con_adherente = crear_reclamo(8, dias_antiguedad=0, adherentes=1)
+        mas_antiguo = crear_reclamo(9, dias_antiguedad=DIAS_POR_ADHERENTE)
+        self.assertEqual(prioridad_triage(con_adherente)[0], prioridad_triage(mas_antiguo)[0])
+        self.assertGreater(prioridad_triage(con_adherente), prioridad_triage(mas_antiguo))
+
+    def test_reconstruir_desde_filas_y_quitar(self):
+        """Prueba armar la cola con (id, departamento, prioridad) sin entidades, y quitar un id."""
+        triage = ColaTriage()
+        triage.reconstruir_desde_filas(
+            (r.id_reclamo, r.departamento, prioridad_de(r.numero_adherentes, r.timestamp, r.id_reclamo))
+            for r in self.reclamos if r.estado == "pendiente"
+        )
+        self.assertEqual(triage.primeros("maestranza", 10), [3, 2, 1])
+        triage.quitar(2)
+        triage.quitar(99) #No está: no hace nada
+        self.assertEqual(triage.primeros("maestranza", 10), [3, 1])
+        self.assertEqual(triage.tamano(), 3)
+
+if __name__ == '__main__':
+    unittest.main()